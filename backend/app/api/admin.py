@@ -0,0 +1,22 @@
+"""Administrative API endpoints."""
+
+from fastapi import APIRouter, HTTPException, status
+
+from ..core.logging import get_logger
+from ..ml.resources import resource_scheduler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+logger = get_logger(__name__)
+
+
+@router.get("/resources", response_model=dict)
+async def get_resource_allocation():
+    """Get the current CPU core allocation across training jobs."""
+    try:
+        return resource_scheduler.get_allocation_summary()
+    except Exception as e:
+        logger.error(f"Error getting resource allocation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve resource allocation"
+        )
@@ -1,29 +1,44 @@
 """Dataset management API endpoints."""
 
+import hashlib
 import os
 import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+import aiofiles
+import aiofiles.os
+import pandas as pd
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db, Dataset
 from ..core.logging import get_logger
 from ..core.config import settings
-from ..ml.preprocessing import DataPreprocessor
+from ..ml.preprocessing import DataPreprocessor, format_preview_rows
 from ..ml.persistence import DatasetPersistence
+from ..ml.preview import DatasetPreviewer
+from ..ml.profiling import DatasetProfiler, merge_appended_rows
+from ..ml.row_index import RowIndexBuilder, row_index_store
+from ..ml.columnar import columnar_store
+from ..ml.excel import excel_ingestor
+from ..ml.stats import dataset_stats
 from ..schemas.dataset import (
     Dataset as DatasetSchema,
     DatasetUploadResponse,
     DatasetUpdate,
-    DatasetInfo
+    DatasetInfo,
+    DatasetPreview,
+    DatasetRows
 )
 from ..schemas.common import ErrorResponse, SuccessResponse
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 logger = get_logger(__name__)
 preprocessor = DataPreprocessor()
+previewer = DatasetPreviewer()
 dataset_persistence = DatasetPersistence()
 
 
@@ -71,12 +86,21 @@ async def get_dataset(
 
 @router.post("/upload", response_model=DatasetUploadResponse)
 async def upload_dataset(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     name: Optional[str] = Form(None),
     target_column: Optional[str] = Form(None),
+    exact_profile: bool = Form(False),
     db: Session = Depends(get_db)
 ):
-    """Upload a new dataset."""
+    """Upload a new dataset.
+    
+    Returns as soon as the file is stored and readable, with status
+    ``profiling``; statistics are computed by a background job (see
+    ``run_profiling_job``) and land in the dataset metadata. A file
+    identical to an earlier, profiled upload shares its stored file and
+    takes over its profile, and is ``ready`` straight away.
+    """
     try:
         # Validate file type
         file_extension = Path(file.filename).suffix.lower()
@@ -86,72 +110,286 @@ async def upload_dataset(
                 detail=f"Unsupported file type. Supported types: {settings.supported_file_types}"
             )
         
-        # Check file size
-        file_content = await file.read()
-        if len(file_content) > settings.max_file_size:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Maximum size: {settings.max_file_size} bytes"
-            )
+        # Reject uploads whose declared size is already over the limit
+        if file.size is not None and file.size > settings.max_file_size:
+            raise _file_too_large()
         
-        # Generate unique filename and path
+        # Stream the file to a staging path, hashing and indexing CSV rows
+        # on the way, then store it under its content hash
         dataset_id = dataset_persistence.generate_dataset_id()
-        filename = f"{dataset_id}_{file.filename}"
-        file_path = Path(settings.upload_dir) / filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        # Load and validate dataset
-        df = preprocessor.load_dataset(str(file_path))
-        dataset_info = preprocessor.validate_dataset(df)
-        
-        # Generate dataset name if not provided
-        if not name:
-            name = Path(file.filename).stem
-        
-        # Save dataset metadata
-        dataset = dataset_persistence.save_dataset_metadata(
-            db=db,
-            dataset_id=dataset_id,
-            name=name,
-            filename=file.filename,
-            file_path=str(file_path),
-            rows=dataset_info["rows"],
-            columns=dataset_info["columns"],
-            target_column=target_column,
-            metadata=dataset_info
+        staging_path = Path(settings.upload_dir) / f".{dataset_id}{file_extension}"
+        row_index = RowIndexBuilder() if file_extension == ".csv" else None
+        file_size, content_hash = await _stream_upload(file, staging_path, row_index)
+        blob_path, created = dataset_persistence.store_blob(staging_path, content_hash, file_extension)
+        file_path = str(blob_path)
+        logger.info(f"Stored upload {file.filename}: {file_size} bytes, sha256 {content_hash}")
+        try:
+            if row_index is not None and created:
+                await run_in_threadpool(row_index_store.save, file_path, row_index.finish())
+            
+            # Generate dataset name if not provided
+            if not name:
+                name = Path(file.filename).stem
+            
+            # An identical earlier upload already has a profile, columnar copy
+            # and row index; reuse them instead of loading the file again
+            source = None if created else dataset_persistence.find_profiled_dataset(db, file_path)
+            if source is not None and exact_profile and (source.dataset_metadata or {}).get("profile_mode") != "exact":
+                source = None
+            
+            if source is not None:
+                dataset = dataset_persistence.save_dataset_metadata(
+                    db=db,
+                    dataset_id=dataset_id,
+                    name=name,
+                    filename=file.filename,
+                    file_path=file_path,
+                    rows=source.rows,
+                    columns=source.columns,
+                    target_column=target_column,
+                    metadata=dict(source.dataset_metadata),
+                    content_hash=content_hash,
+                    status="ready"
+                )
+                preview = (await run_in_threadpool(previewer.head, file_path))["rows"]
+                logger.info(f"Dataset {dataset_id} reuses the profile of dataset {source.id}")
+            else:
+                # Load the dataset; profiling happens in the background.
+                # Workbooks are parsed in worker processes off the event loop
+                # and converted to a columnar copy once. Other files are read
+                # in the threadpool; those too large for memory are
+                # registered from their first chunk, and the profiling job
+                # counts their rows.
+                if file_extension != ".csv" and not (columnar_store.enabled and columnar_store.exists(file_path)):
+                    df = await excel_ingestor.ingest(file_path)
+                    rows = len(df)
+                elif preprocessor.needs_chunked_load(file_path):
+                    df = await run_in_threadpool(_read_first_chunk, file_path)
+                    rows = 0
+                else:
+                    df = await run_in_threadpool(preprocessor.load_dataset, file_path)
+                    rows = len(df)
+                dataset_info = {
+                    "rows": rows,
+                    "columns": len(df.columns),
+                    "column_names": list(df.columns),
+                    "column_types": df.dtypes.astype(str).to_dict()
+                }
+                
+                # Save dataset metadata
+                dataset = dataset_persistence.save_dataset_metadata(
+                    db=db,
+                    dataset_id=dataset_id,
+                    name=name,
+                    filename=file.filename,
+                    file_path=file_path,
+                    rows=dataset_info["rows"],
+                    columns=dataset_info["columns"],
+                    target_column=target_column,
+                    metadata=dataset_info,
+                    content_hash=content_hash,
+                    status="profiling"
+                )
+                background_tasks.add_task(run_profiling_job, dataset_id=dataset_id, exact=exact_profile)
+                
+                # Get dataset preview
+                preview = preprocessor.get_dataset_preview(df)
+            
+            logger.info(f"Dataset uploaded successfully: {dataset_id}")
+            
+            return DatasetUploadResponse(
+                id=dataset.id,
+                name=dataset.name,
+                filename=dataset.filename,
+                file_path=dataset.file_path,
+                rows=dataset.rows,
+                columns=dataset.columns,
+                target_column=dataset.target_column,
+                created_at=dataset.created_at,
+                updated_at=dataset.updated_at,
+                is_processed=dataset.is_processed,
+                status=dataset.status,
+                metadata=dataset.dataset_metadata,
+                preview=preview
+            )
+        finally:
+            # Until the dataset row is committed, only the pin keeps a
+            # concurrent delete of another dataset from removing the blob
+            dataset_persistence.unpin_blob(db, file_path)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading dataset: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload dataset"
         )
+
+
+@router.post("/{dataset_id}/profile", response_model=DatasetSchema)
+async def profile_dataset(
+    dataset_id: str,
+    background_tasks: BackgroundTasks,
+    exact: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Recompute a dataset's profile in the background.
+    
+    ``exact=true`` computes exact distinct counts, quantiles and
+    duplicates instead of sketch estimates.
+    """
+    try:
+        dataset = dataset_persistence.get_dataset(db, dataset_id)
+        if not dataset:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dataset not found"
+            )
+        if dataset.status == "profiling":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Dataset is already being profiled"
+            )
         
-        # Get dataset preview
-        preview = preprocessor.get_dataset_preview(df)
-        
-        logger.info(f"Dataset uploaded successfully: {dataset_id}")
-        
-        return DatasetUploadResponse(
-            id=dataset.id,
-            name=dataset.name,
-            rows=dataset.rows,
-            columns=dataset.columns,
-            target_column=dataset.target_column,
-            created_at=dataset.created_at,
-            updated_at=dataset.updated_at,
-            is_processed=dataset.is_processed,
-            metadata=dataset.dataset_metadata,
-            preview=preview
-        )
+        dataset.status = "profiling"
+        db.commit()
+        db.refresh(dataset)
+        background_tasks.add_task(run_profiling_job, dataset_id=dataset_id, exact=exact)
         
+        logger.info(f"Dataset profiling started: {dataset_id} ({'exact' if exact else 'approximate'})")
+        return dataset
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uploading dataset: {str(e)}")
+        logger.error(f"Error starting dataset profiling {dataset_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload dataset"
+            detail="Failed to start dataset profiling"
         )
 
 
+def run_profiling_job(dataset_id: str, exact: bool = False) -> None:
+    """Profile a dataset in background.
+    
+    Runs in the threadpool. Stores the profile and, with compact dtypes
+    enabled, the compact schema and memory report in the dataset
+    metadata, then marks the dataset ``ready`` (or ``failed``). Files
+    over ``CHUNKED_LOAD_THRESHOLD`` are profiled in one streaming pass
+    over chunks, which also records their row count.
+    """
+    from ..core.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        dataset = dataset_persistence.get_dataset(db, dataset_id)
+        if not dataset:
+            return
+        
+        try:
+            content_hash = dataset_persistence.get_content_hash(db, dataset)
+            if preprocessor.needs_chunked_load(dataset.file_path):
+                # One streaming pass; exact statistics would need the whole frame
+                if exact:
+                    logger.warning(f"Dataset {dataset_id} is read in chunks; profiling approximately")
+                dataset_info = DatasetProfiler().profile_chunks(preprocessor.iter_chunks(dataset.file_path))
+                dataset.rows = dataset_info["rows"]
+                dataset_stats.put_profile(content_hash, dataset_info)
+                df = None
+            else:
+                df = preprocessor.load_dataset(dataset.file_path)
+                dataset_info = DatasetProfiler(exact=exact).profile(df)
+                
+                # Fill the stats cache while the frame is loaded anyway
+                cached = dataset_stats.get(content_hash)
+                if cached is None or cached.get("stale"):
+                    dataset_stats.put(content_hash, df)
+            
+            # Record the compact dtypes so later loads can use them directly
+            if settings.compact_dtypes and df is not None:
+                schema = preprocessor.infer_compact_schema(df)
+                dataset_info["compact_schema"] = schema
+                dataset_info["memory_report"] = preprocessor.get_memory_report(
+                    df, preprocessor.compact_dtypes(df, schema)
+                )
+            
+            metadata = {
+                k: v for k, v in (dataset.dataset_metadata or {}).items()
+                if k not in ("profile_error", "stale_stats")
+            }
+            dataset.dataset_metadata = {**metadata, **dataset_info}
+            dataset.status = "ready"
+            logger.info(f"Dataset profiled: {dataset_id}")
+        except Exception as e:
+            logger.error(f"Dataset profiling failed {dataset_id}: {str(e)}")
+            dataset.dataset_metadata = {**(dataset.dataset_metadata or {}), "profile_error": str(e)}
+            dataset.status = "failed"
+        db.commit()
+    finally:
+        db.close()
+
+
+def _file_too_large() -> HTTPException:
+    """Error for uploads over the configured size limit."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size: {settings.max_file_size} bytes"
+    )
+
+
+def _merge_appended_stats(metadata: dict, old_hash: str, new_hash: str, new_rows: pd.DataFrame) -> dict:
+    """Fold appended rows into the cached statistics and the dataset metadata."""
+    dataset_stats.append(old_hash, new_hash, new_rows)
+    metadata = merge_appended_rows(metadata, new_rows)
+    if "compact_schema" in metadata:
+        metadata["compact_schema"] = preprocessor.merge_compact_schema(metadata["compact_schema"], new_rows)
+    return metadata
+
+
+def _read_first_chunk(file_path: str) -> pd.DataFrame:
+    """Read the first chunk of a dataset too large to load whole."""
+    chunks = preprocessor.iter_chunks(file_path)
+    try:
+        return next(chunks)
+    finally:
+        chunks.close()
+
+
+async def _stream_upload(file: UploadFile,
+                         file_path: Path,
+                         row_index: Optional[RowIndexBuilder] = None) -> Tuple[int, str]:
+    """Stream an upload to ``file_path`` in chunks.
+    
+    Chunks go to a temporary file in the same directory, which is renamed
+    into place only once complete, so a partial upload is never visible
+    under its final name. The size limit is checked per chunk, aborting
+    oversized uploads early. Chunks are also fed to ``row_index`` when
+    given. Returns the size and SHA-256 of the contents.
+    """
+    temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.part")
+    sha256 = hashlib.sha256()
+    size = 0
+    
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(settings.upload_chunk_size):
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise _file_too_large()
+                sha256.update(chunk)
+                if row_index is not None:
+                    row_index.update(chunk)
+                await out.write(chunk)
+        await aiofiles.os.replace(temp_path, file_path)
+    except BaseException:
+        if temp_path.exists():
+            await aiofiles.os.remove(temp_path)
+        raise
+    
+    return size, sha256.hexdigest()
+
+
 @router.put("/{dataset_id}", response_model=DatasetSchema)
 async def update_dataset(
     dataset_id: str,
@@ -181,7 +419,7 @@ async def update_dataset(
         
         logger.info(f"Dataset updated: {dataset_id}")
         return dataset
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -195,9 +433,16 @@ async def update_dataset(
 @router.get("/{dataset_id}/info", response_model=DatasetInfo)
 async def get_dataset_info(
     dataset_id: str,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Get detailed dataset information."""
+    """Get detailed dataset information.
+    
+    Statistics come from the per-content stats cache; the dataset file is
+    only loaded the first time its contents are seen. Statistics left
+    stale by appended rows are served as they are while a profiling job
+    recomputes them.
+    """
     try:
         dataset = dataset_persistence.get_dataset(db, dataset_id)
         if not dataset:
@@ -206,9 +451,17 @@ async def get_dataset_info(
                 detail="Dataset not found"
             )
         
-        # Load dataset for detailed analysis
-        df = preprocessor.load_dataset(dataset.file_path)
-        feature_info = preprocessor.get_feature_info(df)
+        stats = dataset_stats.get_or_compute(
+            dataset_persistence.get_content_hash(db, dataset),
+            dataset.file_path
+        )
+        
+        # Recompute what appends could not merge, once someone asks for it
+        stale = stats.get("stale") or (dataset.dataset_metadata or {}).get("stale_stats")
+        if stale and dataset.status != "profiling":
+            dataset.status = "profiling"
+            db.commit()
+            background_tasks.add_task(run_profiling_job, dataset_id=dataset_id)
         
         return DatasetInfo(
             id=dataset.id,
@@ -217,12 +470,15 @@ async def get_dataset_info(
             columns=dataset.columns,
             target_column=dataset.target_column,
             created_at=dataset.created_at,
-            column_names=list(df.columns),
-            column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
-            missing_values=df.isnull().sum().to_dict(),
+            column_names=stats["column_names"],
+            column_types=stats["column_types"],
+            missing_values=stats["missing_values"],
+            feature_ranges=stats["feature_ranges"],
+            feature_stats=stats["feature_stats"],
+            stale_stats=stats.get("stale", []),
             is_processed=dataset.is_processed
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -233,6 +489,200 @@ async def get_dataset_info(
         )
 
 
+@router.get("/{dataset_id}/preview", response_model=DatasetPreview)
+async def get_dataset_preview(
+    dataset_id: str,
+    rows: int = Query(10, ge=1, le=1000, description="Number of rows"),
+    sample: bool = Query(False, description="Return a uniform random sample instead of the first rows"),
+    seed: Optional[int] = Query(None, description="Random seed for the sample"),
+    db: Session = Depends(get_db)
+):
+    """Preview a dataset without loading it.
+    
+    The first rows are read from the head of the file only; a sample is
+    drawn by reservoir sampling in a single pass over the file.
+    """
+    try:
+        dataset = dataset_persistence.get_dataset(db, dataset_id)
+        if not dataset:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dataset not found"
+            )
+        
+        if sample:
+            preview = await run_in_threadpool(previewer.sample, dataset.file_path, rows, random_state=seed)
+        else:
+            preview = await run_in_threadpool(previewer.head, dataset.file_path, rows)
+        
+        return DatasetPreview(dataset_id=dataset_id, sampled=sample, **preview)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting dataset preview {dataset_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve dataset preview"
+        )
+
+
+@router.get("/{dataset_id}/rows", response_model=DatasetRows)
+async def get_dataset_rows(
+    dataset_id: str,
+    offset: int = Query(0, ge=0, description="Zero-based position of the first row"),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum number of rows"),
+    db: Session = Depends(get_db)
+):
+    """Page through a dataset's rows.
+    
+    Rows come from the columnar copy when there is one, otherwise CSV
+    files seek through their row index to the nearest indexed row, so a
+    page costs about ``limit`` rows however deep it is.
+    """
+    try:
+        dataset = dataset_persistence.get_dataset(db, dataset_id)
+        if not dataset:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dataset not found"
+            )
+        
+        if columnar_store.enabled and columnar_store.exists(dataset.file_path):
+            total_rows = columnar_store.get_manifest(dataset.file_path)["rows"]
+            df = columnar_store.read(
+                dataset.file_path,
+                rows=slice(min(offset, total_rows), min(offset + limit, total_rows))
+            )
+        elif Path(dataset.file_path).suffix.lower() == ".csv":
+            df = row_index_store.read_rows(dataset.file_path, offset, limit)
+            total_rows = row_index_store.load(dataset.file_path)["rows"]
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Row access needs a CSV file or a columnar copy"
+            )
+        
+        return DatasetRows(
+            dataset_id=dataset_id,
+            offset=offset,
+            limit=limit,
+            total_rows=total_rows,
+            columns=[str(col) for col in df.columns],
+            rows=format_preview_rows(df)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting dataset rows {dataset_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve dataset rows"
+        )
+
+
+@router.post("/{dataset_id}/rows", response_model=DatasetSchema)
+async def append_dataset_rows(
+    dataset_id: str,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Append the rows of an uploaded CSV to a CSV dataset.
+    
+    The rows must have the dataset's columns, and values of numeric
+    columns must be numbers. Row and missing counts, numeric ranges and
+    category counts are updated incrementally; statistics that cannot be
+    merged exactly are listed as stale and recomputed on next use.
+    """
+    try:
+        dataset = dataset_persistence.get_dataset(db, dataset_id)
+        if not dataset:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dataset not found"
+            )
+        if Path(dataset.file_path).suffix.lower() != ".csv" or Path(file.filename).suffix.lower() != ".csv":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Rows can only be appended from a CSV file to a CSV dataset"
+            )
+        if dataset.status == "profiling":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Dataset is being profiled; retry once it is ready"
+            )
+        
+        temp_path = Path(settings.upload_dir) / f".{dataset_id}.{uuid.uuid4().hex}.append.csv"
+        try:
+            await _stream_upload(file, temp_path)
+            new_rows = await run_in_threadpool(pd.read_csv, temp_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        
+        old_hash = dataset_persistence.get_content_hash(db, dataset)
+        metadata = dataset.dataset_metadata or {}
+        column_types = metadata.get("column_types")
+        if not column_types:
+            stats = await run_in_threadpool(dataset_stats.get_or_compute, old_hash, dataset.file_path)
+            column_types = stats["column_types"]
+        try:
+            new_rows = await run_in_threadpool(preprocessor.conform_to_schema, new_rows, column_types)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e)
+            )
+        
+        old_path = dataset.file_path
+        new_hash, new_path = await run_in_threadpool(
+            dataset_persistence.append_dataset_rows, dataset, new_rows
+        )
+        try:
+            metadata = await run_in_threadpool(
+                _merge_appended_stats, metadata, old_hash, new_hash, new_rows
+            )
+            # Only commit over the version the rows were appended to; a
+            # concurrent append that committed first wins
+            updated = db.query(Dataset).filter(
+                Dataset.id == dataset_id,
+                Dataset.content_hash == old_hash
+            ).update({
+                Dataset.dataset_metadata: metadata,
+                Dataset.rows: metadata["rows"],
+                Dataset.file_path: new_path,
+                Dataset.content_hash: new_hash,
+                Dataset.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            if not updated:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Dataset was modified by another append; retry the request"
+                )
+            db.commit()
+        finally:
+            # Drops the new blob and statistics unless the commit took them
+            dataset_persistence.unpin_blob(db, new_path)
+            dataset_persistence.release_content_hash(db, new_hash)
+        db.refresh(dataset)
+        dataset_persistence.release_file(db, old_path)
+        dataset_persistence.release_content_hash(db, old_hash)
+        
+        logger.info(f"Appended {len(new_rows)} rows to dataset {dataset_id}")
+        return dataset
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error appending rows to dataset {dataset_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to append rows to dataset"
+        )
+
+
 @router.delete("/{dataset_id}", response_model=SuccessResponse)
 async def delete_dataset(
     dataset_id: str,
@@ -249,7 +699,7 @@ async def delete_dataset(
         
         logger.info(f"Dataset deleted: {dataset_id}")
         return SuccessResponse(message="Dataset deleted successfully")
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -1,20 +1,36 @@
 """Model management API endpoints."""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db, Model
 from ..core.logging import get_logger
 from ..ml.persistence import ModelPersistence
 from ..ml.training import MLTrainer
+from ..ml.holdout import (
+    threshold_sweep,
+    precision_recall_curve,
+    calibration_curve,
+    cost_metrics,
+    binary_cost_threshold
+)
+from ..ml.importance import importance_jobs
 from ..schemas.model import (
     Model as ModelSchema,
     ModelMetrics,
     ModelUpdate,
-    ModelInfo
+    ModelInfo,
+    ThresholdSweep,
+    PrecisionRecallCurve,
+    CalibrationCurve,
+    CostMetricsRequest,
+    CostMetrics,
+    PermutationImportanceRequest,
+    PermutationImportanceJob
 )
 from ..schemas.common import SuccessResponse
 
@@ -80,23 +96,15 @@ async def get_model_metrics(
                 detail="Model not found"
             )
         
-        if not model.metrics:
+        model_metrics = _load_model_metrics(model)
+        if model_metrics is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Model metrics not available"
             )
         
-        # Convert metrics to ModelMetrics schema
-        metrics = model.metrics
-        return ModelMetrics(
-            accuracy=metrics.get("accuracy", 0.0),
-            confusion_matrix=metrics.get("confusion_matrix", []),
-            fpr=metrics.get("fpr", []),
-            tpr=metrics.get("tpr", []),
-            feature_importance=metrics.get("feature_importance", []),
-            classification_report=metrics.get("classification_report", {})
-        )
-        
+        return model_metrics
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -127,16 +135,7 @@ async def get_model_info(
         dataset_name = dataset.name if dataset else None
         
         # Convert metrics if available
-        model_metrics = None
-        if model.metrics:
-            model_metrics = ModelMetrics(
-                accuracy=model.metrics.get("accuracy", 0.0),
-                confusion_matrix=model.metrics.get("confusion_matrix", []),
-                fpr=model.metrics.get("fpr", []),
-                tpr=model.metrics.get("tpr", []),
-                feature_importance=model.metrics.get("feature_importance", []),
-                classification_report=model.metrics.get("classification_report", {})
-            )
+        model_metrics = _load_model_metrics(model)
         
         return ModelInfo(
             model_id=model.model_id,
@@ -149,7 +148,7 @@ async def get_model_info(
             is_active=model.is_active,
             dataset_name=dataset_name
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -160,6 +159,296 @@ async def get_model_info(
         )
 
 
+def _load_model_metrics(model: Model) -> Optional[ModelMetrics]:
+    """Combine a model's summary scalars with its metrics sidecar."""
+    summary = model.metrics or {}
+    # Models trained before the sidecar existed keep everything on the row
+    detail = model_persistence.metrics_store.load(model.model_id) or summary
+    if not summary and not detail:
+        return None
+    
+    return ModelMetrics(
+        accuracy=summary.get("accuracy", model.accuracy),
+        roc_auc=summary.get("roc_auc", detail.get("roc_auc")),
+        confusion_matrix=detail.get("confusion_matrix", []),
+        fpr=detail.get("fpr", []),
+        tpr=detail.get("tpr", []),
+        feature_importance=detail.get("feature_importance", []),
+        classification_report=detail.get("classification_report", {})
+    )
+
+
+@router.get("/{model_id}/holdout/thresholds", response_model=ThresholdSweep)
+async def get_threshold_sweep(
+    model_id: str,
+    positive_class: Optional[str] = Query(None, description="Class treated as positive (defaults to the last class)"),
+    points: int = Query(101, ge=2, le=10001, description="Number of evenly spaced thresholds"),
+    db: Session = Depends(get_db)
+):
+    """Get holdout metrics across decision thresholds from stored scores."""
+    try:
+        y_true, scores, classes = _load_holdout(db, model_id)
+        index = _positive_index(classes, positive_class)
+        
+        sweep = threshold_sweep(y_true == index, np.asarray(scores[:, index]), points)
+        return ThresholdSweep(model_id=model_id, positive_class=classes[index], **sweep)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing threshold sweep {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute threshold sweep"
+        )
+
+
+@router.get("/{model_id}/holdout/precision-recall", response_model=PrecisionRecallCurve)
+async def get_precision_recall_curve(
+    model_id: str,
+    positive_class: Optional[str] = Query(None, description="Class treated as positive (defaults to the last class)"),
+    db: Session = Depends(get_db)
+):
+    """Get the holdout precision/recall curve from stored scores."""
+    try:
+        y_true, scores, classes = _load_holdout(db, model_id)
+        index = _positive_index(classes, positive_class)
+        
+        curve = precision_recall_curve(y_true == index, np.asarray(scores[:, index]))
+        return PrecisionRecallCurve(model_id=model_id, positive_class=classes[index], **curve)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing precision/recall curve {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute precision/recall curve"
+        )
+
+
+@router.get("/{model_id}/holdout/calibration", response_model=CalibrationCurve)
+async def get_calibration_curve(
+    model_id: str,
+    positive_class: Optional[str] = Query(None, description="Class treated as positive (defaults to the last class)"),
+    bins: int = Query(10, ge=2, le=100, description="Number of probability bins"),
+    db: Session = Depends(get_db)
+):
+    """Get the holdout calibration curve from stored scores."""
+    try:
+        y_true, scores, classes = _load_holdout(db, model_id)
+        index = _positive_index(classes, positive_class)
+        
+        curve = calibration_curve(y_true == index, np.asarray(scores[:, index], dtype=np.float64), bins)
+        return CalibrationCurve(model_id=model_id, positive_class=classes[index], **curve)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing calibration curve {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute calibration curve"
+        )
+
+
+@router.post("/{model_id}/holdout/cost", response_model=CostMetrics)
+async def get_cost_metrics(
+    model_id: str,
+    request: CostMetricsRequest,
+    db: Session = Depends(get_db)
+):
+    """Get cost-weighted holdout metrics from stored scores.
+    
+    Without a ``cost_matrix``, binary models use the false positive and
+    false negative costs and also report the cost-minimizing threshold.
+    """
+    try:
+        y_true, scores, classes = _load_holdout(db, model_id)
+        n_classes = len(classes)
+        positive = None
+        
+        if request.cost_matrix is not None:
+            cost_matrix = np.asarray(request.cost_matrix, dtype=np.float64)
+            if cost_matrix.shape != (n_classes, n_classes):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cost matrix must be {n_classes}x{n_classes}"
+                )
+        elif n_classes == 2:
+            positive = _positive_index(classes, request.positive_class)
+            cost_matrix = np.zeros((2, 2))
+            cost_matrix[1 - positive, positive] = request.false_positive_cost
+            cost_matrix[positive, 1 - positive] = request.false_negative_cost
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A cost matrix is required for multiclass models"
+            )
+        
+        scores = np.asarray(scores, dtype=np.float64)
+        result = cost_metrics(y_true, scores, cost_matrix)
+        
+        threshold = None
+        if positive is not None:
+            threshold = binary_cost_threshold(
+                y_true == positive, scores[:, positive],
+                request.false_positive_cost, request.false_negative_cost
+            )
+        
+        return CostMetrics(
+            model_id=model_id,
+            classes=classes,
+            cost_matrix=cost_matrix.tolist(),
+            threshold=threshold,
+            **result
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing cost metrics {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute cost metrics"
+        )
+
+
+def _load_holdout(db: Session, model_id: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Load a model's stored holdout labels, scores and class names."""
+    model = model_persistence.get_model(db, model_id)
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found"
+        )
+    
+    holdout = model_persistence.holdout_store.load(model_id)
+    if holdout is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Holdout scores not available for this model"
+        )
+    
+    y_true, scores = holdout
+    detail = model_persistence.metrics_store.load(model_id) or {}
+    classes = detail.get("class_labels") or [str(i) for i in range(scores.shape[1])]
+    return y_true, scores, classes
+
+
+def _positive_index(classes: List[str], positive_class: Optional[str]) -> int:
+    """Resolve the positive class, defaulting to the last class."""
+    if positive_class is None:
+        return len(classes) - 1
+    if positive_class not in classes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown class: {positive_class}"
+        )
+    return classes.index(positive_class)
+
+
+@router.post("/{model_id}/importance", response_model=PermutationImportanceJob)
+async def start_permutation_importance(
+    model_id: str,
+    request: PermutationImportanceRequest = PermutationImportanceRequest(),
+    db: Session = Depends(get_db)
+):
+    """Start a permutation importance job on the stored holdout.
+    
+    Returns the running job or the cached result instead of starting a
+    new job unless ``force`` is set.
+    """
+    try:
+        model = _get_importance_model(db, model_id)
+        job = importance_jobs.start(
+            model_id,
+            model.model_path,
+            n_repeats=request.n_repeats,
+            random_state=request.random_state,
+            force=request.force
+        )
+        return PermutationImportanceJob(**job)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting permutation importance {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start permutation importance"
+        )
+
+
+@router.get("/{model_id}/importance", response_model=PermutationImportanceJob)
+async def get_permutation_importance(
+    model_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get the progress or result of a permutation importance job."""
+    try:
+        _get_importance_model(db, model_id)
+        job = importance_jobs.get(model_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Permutation importance has not been computed for this model"
+            )
+        return PermutationImportanceJob(**job)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting permutation importance {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get permutation importance"
+        )
+
+
+@router.delete("/{model_id}/importance", response_model=SuccessResponse)
+async def cancel_permutation_importance(
+    model_id: str,
+    db: Session = Depends(get_db)
+):
+    """Cancel a running permutation importance job."""
+    try:
+        _get_importance_model(db, model_id)
+        if not importance_jobs.cancel(model_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No permutation importance job is running for this model"
+            )
+        
+        logger.info(f"Permutation importance cancel requested: {model_id}")
+        return SuccessResponse(message="Permutation importance cancellation requested")
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling permutation importance {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel permutation importance"
+        )
+
+
+def _get_importance_model(db: Session, model_id: str) -> Model:
+    """Get a model whose holdout supports permutation importance."""
+    model = model_persistence.get_model(db, model_id)
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found"
+        )
+    if not importance_jobs.is_available(model_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Holdout data not available for this model"
+        )
+    return model
+
+
 @router.put("/{model_id}", response_model=ModelSchema)
 async def update_model(
     model_id: str,
@@ -187,7 +476,7 @@ async def update_model(
         
         logger.info(f"Model updated: {model_id}")
         return model
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -214,7 +503,7 @@ async def delete_model(
         
         logger.info(f"Model deleted: {model_id}")
         return SuccessResponse(message="Model deleted successfully")
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -10,14 +10,16 @@ from ..core.database import get_db, Model
 from ..core.logging import get_logger
 from ..ml.training import MLTrainer
 from ..ml.persistence import ModelPersistence
+from ..ml.drift import drift_monitor
 from ..schemas.prediction import (
     PredictionRequest,
     PredictionResponse,
     BatchPredictionRequest,
     BatchPredictionResponse,
-    PredictionInfo
+    PredictionInfo,
+    DriftReport
 )
-from ..schemas.common import ErrorResponse
+from ..schemas.common import ErrorResponse, SuccessResponse
 
 router = APIRouter(prefix="/predict", tags=["prediction"])
 logger = get_logger(__name__)
@@ -54,6 +56,7 @@ async def predict(
         
         # Make prediction
         results = ml_trainer.predict(model_data, input_df)
+        _track_drift(request.model_id, input_df)
         
         # Get prediction and probability
         prediction = results["predictions"][0]
@@ -81,7 +84,7 @@ async def predict(
             probability=confidence,
             probabilities=prob_dict
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -121,6 +124,7 @@ async def predict_batch(
         
         # Make predictions
         results = ml_trainer.predict(model_data, input_df)
+        _track_drift(request.model_id, input_df)
         
         # Process results
         predictions = [str(pred) for pred in results["predictions"]]
@@ -149,7 +153,7 @@ async def predict_batch(
             probabilities=probabilities,
             all_probabilities=all_probabilities if all_probabilities else None
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -160,6 +164,80 @@ async def predict_batch(
         )
 
 
+def _track_drift(model_id: str, input_df: pd.DataFrame) -> None:
+    """Add prediction inputs to the model's drift sketches."""
+    try:
+        drift_monitor.update(model_id, input_df)
+    except Exception as e:
+        # Monitoring must never fail a prediction
+        logger.warning(f"Failed to update drift sketches for {model_id}: {str(e)}")
+
+
+@router.get("/{model_id}/drift", response_model=DriftReport)
+async def get_prediction_drift(
+    model_id: str,
+    db: Session = Depends(get_db)
+):
+    """Compare prediction inputs with the model's training distribution.
+    
+    Scores every feature by PSI (and binned KS for numeric features)
+    between its training baseline and the inputs seen since the drift
+    window was last reset.
+    """
+    try:
+        model = model_persistence.get_model(db, model_id)
+        if not model:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Model not found"
+            )
+        
+        report = drift_monitor.report(model_id)
+        if report is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Drift baseline not available for this model"
+            )
+        return DriftReport(**report)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting prediction drift {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to compute prediction drift"
+        )
+
+
+@router.delete("/{model_id}/drift", response_model=SuccessResponse)
+async def reset_prediction_drift(
+    model_id: str,
+    db: Session = Depends(get_db)
+):
+    """Reset a model's drift window, e.g. after retraining or a known shift."""
+    try:
+        model = model_persistence.get_model(db, model_id)
+        if not model:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Model not found"
+            )
+        
+        drift_monitor.reset(model_id)
+        logger.info(f"Drift window reset: {model_id}")
+        return SuccessResponse(message="Drift window reset")
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resetting prediction drift {model_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to reset prediction drift"
+        )
+
+
 @router.get("/{model_id}/info", response_model=PredictionInfo)
 async def get_prediction_info(
     model_id: str,
@@ -186,7 +264,7 @@ async def get_prediction_info(
             output_classes=model_data.get("target_classes", []),
             created_at=model.created_at.isoformat()
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -214,7 +292,7 @@ async def get_active_models(db: Session = Depends(get_db)):
             })
         
         return model_list
-        
+    
     except Exception as e:
         logger.error(f"Error getting active models: {str(e)}")
         raise HTTPException(
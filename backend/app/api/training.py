@@ -1,22 +1,39 @@
 """Training job management API endpoints."""
 
 import asyncio
+import json
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db, TrainingJob, Dataset
 from ..core.logging import get_logger
+from ..core.config import settings
+from ..core.progress import progress_broker, is_terminal_event, timed_stage, TERMINAL_STATUSES
 from ..ml.preprocessing import DataPreprocessor
 from ..ml.training import MLTrainer
-from ..ml.persistence import TrainingJobPersistence, ModelPersistence, DatasetPersistence
+from ..ml.racing import AlgorithmRace
+from ..ml.resources import resource_scheduler
+from ..ml.drift import drift_monitor
+from ..ml.persistence import (
+    TrainingJobPersistence,
+    ModelPersistence,
+    DatasetPersistence,
+    training_log_store
+)
 from ..schemas.training import (
     TrainingRequest,
     TrainingJob as TrainingJobSchema,
     TrainingJobCreate,
     TrainingJobUpdate,
+    TrainingLogs,
     TrainingStatus
 )
 from ..schemas.common import SuccessResponse
@@ -29,6 +46,13 @@ dataset_persistence = DatasetPersistence()
 preprocessor = DataPreprocessor()
 ml_trainer = MLTrainer()
 
+# Cancel flags of the training jobs running in this process
+_cancel_events: Dict[str, threading.Event] = {}
+
+
+class JobCancelled(Exception):
+    """Raised inside a training job once it has been cancelled."""
+
 
 @router.post("/start", response_model=TrainingJobSchema)
 async def start_training(
@@ -47,11 +71,42 @@ async def start_training(
             )
         
         # Validate algorithm
-        if request.algorithm not in ml_trainer.get_available_algorithms():
+        auto = request.algorithm == "auto"
+        if not auto and request.algorithm not in ml_trainer.get_available_algorithms():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported algorithm: {request.algorithm}"
             )
+        if auto and request.params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Custom params cannot be used with algorithm 'auto'"
+            )
+        
+        # The deadline runs from the request, so queueing time counts
+        deadline = None
+        if auto:
+            deadline = time.time() + (request.time_budget or settings.auto_time_budget)
+        
+        # Reuse an identical finished or in-flight job unless forced.
+        # Racing depends on wall-clock timings, so "auto" jobs are never reused.
+        fingerprint = None
+        if not auto:
+            fingerprint = ml_trainer.get_training_fingerprint(
+                dataset_hash=dataset_persistence.get_content_hash(db, dataset),
+                target_column=dataset.target_column,
+                algorithm=request.algorithm,
+                params=request.params,
+                test_size=request.test_size,
+                random_state=request.random_state,
+                svm_mode=request.svm_mode,
+                encoding=request.encoding
+            )
+        if fingerprint and not request.force:
+            existing_job = training_persistence.find_reusable_job(db, fingerprint)
+            if existing_job:
+                logger.info(f"Reusing training job {existing_job.job_id} for identical request")
+                return existing_job
         
         # Create training job
         job_id = training_persistence.generate_job_id()
@@ -59,8 +114,10 @@ async def start_training(
             db=db,
             job_id=job_id,
             dataset_id=request.dataset_id,
-            algorithm=request.algorithm
+            algorithm=request.algorithm,
+            fingerprint=fingerprint
         )
+        progress_broker.publish(job_id, "status", status="queued", progress=0)
         
         # Start training in background
         background_tasks.add_task(
@@ -70,12 +127,16 @@ async def start_training(
             algorithm=request.algorithm,
             params=request.params,
             test_size=request.test_size,
-            random_state=request.random_state
+            random_state=request.random_state,
+            svm_mode=request.svm_mode,
+            fingerprint=fingerprint,
+            deadline=deadline,
+            encoding=request.encoding
         )
         
         logger.info(f"Training job started: {job_id}")
         return job
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -89,9 +150,14 @@ async def start_training(
 @router.get("/status", response_model=TrainingStatus)
 async def get_training_status(
     job_id: str,
+    log_offset: int = Query(0, ge=0, description="Byte offset to read logs from"),
     db: Session = Depends(get_db)
 ):
-    """Get training job status."""
+    """Get training job status.
+    
+    Only log lines written after ``log_offset`` are returned; pass back
+    the returned ``log_offset`` to tail the log.
+    """
     try:
         job = training_persistence.get_training_job(db, job_id)
         if not job:
@@ -100,9 +166,12 @@ async def get_training_status(
                 detail="Training job not found"
             )
         
-        # Parse logs if available
+        # Read new log lines, falling back to logs stored on the job row
         logs = None
-        if job.logs:
+        next_offset = log_offset
+        if training_log_store.exists(job_id):
+            logs, next_offset = training_log_store.read(job_id, offset=log_offset)
+        elif job.logs:
             logs = job.logs.split('\n')
         
         return TrainingStatus(
@@ -114,9 +183,10 @@ async def get_training_status(
             updated_at=job.updated_at,
             completed_at=job.completed_at,
             error_message=job.error_message,
-            model_id=job.model_id
+            model_id=job.model_id,
+            log_offset=next_offset
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -145,6 +215,45 @@ async def get_training_jobs(
         )
 
 
+@router.get("/jobs/{job_id}/logs", response_model=TrainingLogs)
+async def get_training_logs(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Byte offset to read from"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Maximum number of lines"),
+    db: Session = Depends(get_db)
+):
+    """Tail a training job's log from a byte offset."""
+    try:
+        job = training_persistence.get_training_job(db, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Training job not found"
+            )
+        
+        lines, next_offset = training_log_store.read(job_id, offset=offset, limit=limit)
+        complete = job.status in ["finished", "failed", "cancelled"] and (
+            limit is None or len(lines) < limit
+        )
+        
+        return TrainingLogs(
+            job_id=job_id,
+            lines=lines,
+            offset=offset,
+            next_offset=next_offset,
+            complete=complete
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting training logs {job_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve training logs"
+        )
+
+
 @router.delete("/jobs/{job_id}", response_model=SuccessResponse)
 async def cancel_training_job(
     job_id: str,
@@ -172,10 +281,18 @@ async def cancel_training_job(
             status="cancelled",
             error_message="Job cancelled by user"
         )
+        progress_broker.publish(
+            job_id, "status", status="cancelled", progress=job.progress,
+            error_message="Job cancelled by user"
+        )
+        # Stop the worker at its next checkpoint
+        cancel_event = _cancel_events.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
         
         logger.info(f"Training job cancelled: {job_id}")
         return SuccessResponse(message="Training job cancelled successfully")
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -186,26 +303,159 @@ async def cancel_training_job(
         )
 
 
-async def run_training_job(
+@router.get("/jobs/{job_id}/events")
+async def stream_training_events(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Stream training job progress as Server-Sent Events.
+    
+    Jobs this process is not running, such as jobs started before a
+    restart, get their stored state and, unless that is final, an
+    ``unknown`` event; the stream then ends.
+    """
+    if not progress_broker.has_job(job_id):
+        job = training_persistence.get_training_job(db, job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Training job not found"
+            )
+        if job.status in TERMINAL_STATUSES:
+            # Job predates this process: replay its stored state once
+            progress_broker.publish(
+                job_id, "status", status=job.status, progress=job.progress,
+                error_message=job.error_message, model_id=job.model_id
+            )
+        else:
+            # No events will follow for a job this process is not running
+            timestamp = datetime.utcnow().isoformat()
+            events = [
+                {"job_id": job_id, "type": "status", "timestamp": timestamp, "status": job.status,
+                 "progress": job.progress, "error_message": job.error_message, "model_id": job.model_id},
+                {"job_id": job_id, "type": "unknown", "timestamp": timestamp,
+                 "message": "Job is not running in this server process; poll its status instead"}
+            ]
+            return StreamingResponse(
+                iter([_format_sse(event) for event in events]),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+    
+    async def event_stream():
+        queue, history = progress_broker.subscribe(job_id)
+        try:
+            for event in history:
+                yield _format_sse(event)
+                if is_terminal_event(event):
+                    return
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield _format_sse(event)
+                if is_terminal_event(event):
+                    return
+        finally:
+            progress_broker.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _format_sse(event: dict) -> str:
+    """Format an event as a Server-Sent Events message."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def _update_job(db: Session, job_id: str, **fields) -> None:
+    """Persist a job update and push it to streaming subscribers.
+    
+    Updates to jobs that already ended, e.g. were cancelled, are dropped.
+    """
+    if not training_persistence.update_training_job(db=db, job_id=job_id, **fields):
+        return
+    
+    event_type = "status" if fields.get("status") else "progress"
+    progress_broker.publish(
+        job_id, event_type, **{k: v for k, v in fields.items() if v is not None}
+    )
+
+
+def run_training_job(
     job_id: str,
     dataset_id: str,
     algorithm: str,
     params: Optional[dict],
     test_size: float,
-    random_state: int
+    random_state: int,
+    svm_mode: str = "auto",
+    fingerprint: Optional[str] = None,
+    deadline: Optional[float] = None,
+    encoding: Optional[str] = None
 ):
-    """Run training job in background."""
+    """Run training job in background.
+    
+    Runs in the threadpool so that the event loop stays free to serve
+    requests and stream progress while the model trains. With
+    ``algorithm="auto"`` the algorithms are raced first and the winner is
+    trained so that the job ends by ``deadline``.
+    """
     from ..core.database import SessionLocal
     
+    emit = partial(progress_broker.publish, job_id)
+    cancel_event = _cancel_events.setdefault(job_id, threading.Event())
+    
+    def log(message: str) -> None:
+        logger.info(f"[{job_id}] {message}")
+        line = f"{datetime.utcnow().isoformat()} {message}"
+        training_log_store.append(job_id, [line])
+        emit("log", message=line)
+    
+    # Fitting spans 30-80% of the job; with algorithm="auto" the race takes
+    # 30-55% and the final fit 55-80%, so progress never goes backwards
+    fit_progress = {"start": 30, "end": 80}
+    race_progress = {"start": 30, "end": 55, "started_at": 0.0, "deadline": 0.0}
+    
+    def on_training_event(event_type: str, **data) -> None:
+        # Progress reports double as cancellation checkpoints
+        if cancel_event.is_set():
+            raise JobCancelled()
+        emit(event_type, **data)
+        if event_type == "trees":
+            span = fit_progress["end"] - fit_progress["start"]
+            emit("progress", progress=fit_progress["start"] + int(span * data["built"] / data["total"]))
+        elif event_type == "race_round":
+            log(f"Race round {data['round']} on {data['rows']} rows, "
+                f"remaining: {', '.join(data['survivors'])}")
+            # Race rounds advance by the share of the time budget used
+            elapsed = time.time() - race_progress["started_at"]
+            budget = max(race_progress["deadline"] - race_progress["started_at"], 1e-9)
+            span = race_progress["end"] - race_progress["start"]
+            emit("progress", progress=race_progress["start"] + int(span * min(elapsed / budget, 1.0)))
+    
     db = SessionLocal()
+    model_id = model_persistence.generate_model_id()
+    
+    def check_cancelled() -> None:
+        """Stop the job if it was cancelled, here or by another server process."""
+        if cancel_event.is_set() or (
+            db.query(TrainingJob.status).filter(TrainingJob.job_id == job_id).scalar() == "cancelled"
+        ):
+            raise JobCancelled()
+    
     try:
         # Update job status to running
-        training_persistence.update_training_job(
-            db=db,
-            job_id=job_id,
-            status="running",
-            progress=10
-        )
+        _update_job(db, job_id, status="running", progress=10)
+        check_cancelled()
         
         # Get dataset
         dataset = dataset_persistence.get_dataset(db, dataset_id)
@@ -213,83 +463,154 @@ async def run_training_job(
             raise Exception("Dataset not found")
         
         # Load and preprocess data
-        df = preprocessor.load_dataset(dataset.file_path)
-        df_clean = preprocessor.clean_dataset(df)
+        with timed_stage(emit, "load"):
+            schema = (dataset.dataset_metadata or {}).get("compact_schema")
+            df = preprocessor.load_dataset(
+                dataset.file_path,
+                compact=settings.compact_dtypes,
+                schema=schema if settings.compact_dtypes else None
+            )
+        log(f"Loaded dataset with {len(df)} rows and {len(df.columns)} columns")
+        check_cancelled()
+        
+        with timed_stage(emit, "clean"):
+            df_clean = preprocessor.clean_dataset(df)
         
         # Prepare features
-        X, y = preprocessor.prepare_features(df_clean, dataset.target_column)
+        with timed_stage(emit, "prepare"):
+            X, y = preprocessor.prepare_features(
+                df_clean,
+                dataset.target_column,
+                dtype="float32" if settings.compact_dtypes else None,
+                encode_categoricals=False
+            )
         
         if y is None:
             raise Exception("No target column specified")
         
         # Update progress
-        training_persistence.update_training_job(
-            db=db,
-            job_id=job_id,
-            progress=30
-        )
+        _update_job(db, job_id, progress=30)
+        check_cancelled()
         
-        # Train model
-        results = ml_trainer.train_model(
-            X=X,
-            y=y,
-            algorithm=algorithm,
-            params=params,
-            test_size=test_size,
-            random_state=random_state
-        )
+        # Train model within the job's core budget
+        with resource_scheduler.allocate(job_id) as cores:
+            log(f"Allocated {cores} core(s)")
+            
+            test_index = None
+            if algorithm == "auto":
+                racer = AlgorithmRace(ml_trainer)
+                race_progress["started_at"] = time.time()
+                race_progress["deadline"] = deadline or race_progress["started_at"] + settings.auto_time_budget
+                with timed_stage(emit, "race"):
+                    race = racer.run(
+                        X=X,
+                        y=y,
+                        deadline=race_progress["deadline"],
+                        test_size=test_size,
+                        random_state=random_state,
+                        n_jobs=cores,
+                        progress_callback=on_training_event,
+                        svm_mode=svm_mode,
+                        encoding=encoding
+                    )
+                for entry in race["leaderboard"]:
+                    log(f"Race: {entry['algorithm']} predicted accuracy {entry['predicted_score']:.4f} "
+                        f"({entry['eliminated'] or 'winner'})")
+                algorithm = race["algorithm"]
+                if race["rows"] < len(X):
+                    # Test on the rows racing held out, not a re-split of the subsample
+                    X, y, test_index = racer.select_rows(X, y, race)
+                _update_job(db, job_id, progress=race_progress["end"])
+                fit_progress["start"] = race_progress["end"]
+            
+            log(f"Training {algorithm} on {len(X)} rows")
+            results = ml_trainer.train_model(
+                X=X,
+                y=y,
+                algorithm=algorithm,
+                params=params,
+                test_size=test_size,
+                random_state=random_state,
+                n_jobs=cores,
+                progress_callback=on_training_event,
+                svm_mode=svm_mode,
+                encoding=encoding,
+                holdout_path=str(model_persistence.holdout_store.get_holdout_path(model_id)),
+                holdout_features_path=str(model_persistence.holdout_store.get_features_path(model_id)),
+                drift_baseline_path=str(drift_monitor.get_baseline_path(model_id)),
+                test_index=test_index
+            )
         
-        # Update progress
-        training_persistence.update_training_job(
-            db=db,
-            job_id=job_id,
-            progress=80
-        )
+        # Update progress; a job cancelled during training is not saved
+        check_cancelled()
+        _update_job(db, job_id, progress=80)
+        if results["encoding"]:
+            log("Encoding: " + ", ".join(f"{col}={strategy}" for col, strategy in results["encoding"].items()))
+        log(f"Accuracy: {results['accuracy']:.4f}")
         
         # Save model
-        model_id = model_persistence.generate_model_id()
-        model_path = ml_trainer.save_model(
-            model=results["model"],
-            scaler=results["scaler"],
-            label_encoder=results["label_encoder"],
-            model_id=model_id,
-            algorithm=algorithm,
-            dataset_id=dataset_id,
-            accuracy=results["accuracy"],
-            metrics=results,
-            params=params or {}
-        )
-        
-        # Save model metadata
-        model_persistence.save_model_metadata(
-            db=db,
-            model_id=model_id,
-            algorithm=algorithm,
-            dataset_id=dataset_id,
-            accuracy=results["accuracy"],
-            model_path=model_path,
-            params=params or {},
-            metrics=results
-        )
+        with timed_stage(emit, "save"):
+            # Full evaluation output goes to a sidecar; the DB keeps scalars
+            metrics_summary = model_persistence.metrics_store.save(model_id, results)
+            
+            model_path = ml_trainer.save_model(
+                model=results["model"],
+                scaler=results["scaler"],
+                label_encoder=results["label_encoder"],
+                model_id=model_id,
+                algorithm=algorithm,
+                dataset_id=dataset_id,
+                accuracy=results["accuracy"],
+                metrics=metrics_summary,
+                params=results["params"],
+                feature_columns=results["feature_columns"],
+                target_classes=results["target_classes"],
+                encoder=results["encoder"],
+                sparse_input=results["sparse"]
+            )
+            
+            # Save model metadata
+            model_persistence.save_model_metadata(
+                db=db,
+                model_id=model_id,
+                algorithm=algorithm,
+                dataset_id=dataset_id,
+                accuracy=results["accuracy"],
+                model_path=model_path,
+                params=results["params"],
+                metrics=metrics_summary,
+                fingerprint=fingerprint
+            )
         
         # Update job status to finished
-        training_persistence.update_training_job(
-            db=db,
-            job_id=job_id,
-            status="finished",
-            progress=100,
-            model_id=model_id
-        )
+        _update_job(db, job_id, status="finished", progress=100, model_id=model_id)
         
         logger.info(f"Training job completed successfully: {job_id}")
-        
+    
+    except JobCancelled:
+        logger.info(f"Training job stopped after cancellation: {job_id}")
+        db.rollback()
+        _discard_unsaved_model(db, model_id)
     except Exception as e:
         logger.error(f"Training job failed {job_id}: {str(e)}")
-        training_persistence.update_training_job(
-            db=db,
-            job_id=job_id,
-            status="failed",
-            error_message=str(e)
-        )
+        log(f"Training failed: {str(e)}")
+        db.rollback()
+        _discard_unsaved_model(db, model_id)
+        _update_job(db, job_id, status="failed", error_message=str(e))
     finally:
+        _cancel_events.pop(job_id, None)
+        # Log lines written after the job ended may have reopened its writer
+        training_log_store.close(job_id)
         db.close()
+
+
+def _discard_unsaved_model(db: Session, model_id: str) -> None:
+    """Delete the files a job wrote for a model whose row was never committed."""
+    if model_persistence.get_model(db, model_id) is not None:
+        return
+    model_persistence.holdout_store.delete(model_id)
+    drift_monitor.delete(model_id)
+    model_persistence.metrics_store.delete(model_id)
+    model_path = Path(settings.models_dir) / f"{model_id}.joblib"
+    if model_path.exists():
+        model_path.unlink()
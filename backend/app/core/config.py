@@ -48,16 +48,64 @@ class Settings(BaseSettings):
     
     # ML settings
     max_file_size: int = 50 * 1024 * 1024  # 50MB
+    upload_chunk_size: int = 1024 * 1024  # Bytes read per chunk when streaming uploads
     supported_file_types: list[str] = [".csv", ".xlsx", ".xls"]
     default_test_size: float = 0.2
     default_random_state: int = 42
+    compact_dtypes: bool = True  # Load datasets with downcast numerics and categories
+    dtype_inference_sample_rows: int = 10000
+    chunked_load_threshold: int = 200 * 1024 * 1024  # Files larger than this are read in chunks, never whole
+    load_chunk_rows: int = 100000  # Rows per chunk when reading datasets in chunks
+    duplicate_buffer_rows: int = 5000000  # Row hashes kept in memory before spilling to disk
+    profile_chunk_rows: int = 100000  # Rows per chunk when profiling uploads
+    profile_hll_precision: int = 14  # HyperLogLog registers = 2 ** precision
+    profile_quantile_size: int = 256  # Items per quantile sketch level
+    row_index_every: int = 10000  # Rows between byte offsets in a CSV dataset's row index
+    preview_chunk_rows: int = 50000  # Rows per chunk when sampling previews
+    columnar_format: str = "auto"  # Dataset copy read by loaders: auto (parquet if pyarrow), parquet, npy or none
+    excel_workers: Optional[int] = None  # Processes parsing Excel sheets; defaults to cpu_cores
+    category_max_unique: int = 1000
+    category_max_ratio: float = 0.5  # Max distinct/rows ratio for category columns
+    categorical_encoding: str = "auto"  # auto, label, onehot, hash or target
+    hash_buckets: int = 1024  # Buckets per hashed column
+    onehot_max_categories: int = 50
+    onehot_min_frequency: int = 5  # Rarer categories go to the "other" column
+    target_encoding_folds: int = 5
+    target_encoding_smoothing: float = 10.0
+    sparse_density_threshold: float = 0.1  # Non-zero share below which features stay sparse
+    sparse_scaler: str = "standard"  # standard (without centering) or maxabs
+    roc_curve_max_points: int = 200
+    roc_curve_tolerance: float = 0.001  # Max distance of dropped ROC points
+    evaluation_chunk_rows: int = 100000  # Larger holdouts are evaluated in chunks
+    evaluation_score_bins: int = 10000  # Score histogram resolution for chunked ROC
+    importance_repeats: int = 5  # Shuffles per feature for permutation importance
+    drift_histogram_bins: int = 20  # Bins over each numeric feature's training range
+    drift_max_categories: int = 50  # Training categories tracked per column; rest count as other
+    drift_flush_interval: float = 60.0  # Seconds between writes of prediction sketches
+    drift_psi_threshold: float = 0.2  # PSI at or above which a feature is flagged as drifted
+    svm_approximation_threshold: int = 20000  # Training rows above which "auto" approximates
+    svm_approximation_components: int = 500
+    svm_kernel_approximation: str = "nystroem"  # nystroem or rbf_sampler
+    svm_calibration_size: float = 0.1
+    auto_time_budget: float = 300.0  # Default seconds for algorithm="auto"
+    race_initial_rows: int = 500
+    race_growth_factor: float = 3.0
+    race_elimination_margin: float = 0.02  # Accuracy gap before an algorithm is dropped
+    race_validation_size: float = 0.2
     
     # Logging
     log_level: str = "INFO"
     log_format: str = "json"
+    job_log_flush_interval: float = 1.0  # Seconds between training log flushes
     
     # Model persistence
     model_retention_days: int = 30
+    
+    # Resource scheduling
+    cpu_cores: Optional[int] = None  # Defaults to os.cpu_count()
+    serving_reserved_cores: int = 1
+    max_cores_per_job: Optional[int] = None
+    expected_training_jobs: int = 2  # Concurrent jobs the training pool is split between
 
 
 # Global settings instance
@@ -12,12 +12,17 @@ from sqlalchemy import (
     String,
     Text,
     create_engine,
+    inspect,
+    text,
     JSON,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from .config import settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
 
 # Database setup
 engine = create_engine(
@@ -38,12 +43,14 @@ class Dataset(Base):
     name = Column(String, nullable=False)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    content_hash = Column(String, nullable=True, index=True)  # SHA-256 of the file contents
     rows = Column(Integer, nullable=False)
     columns = Column(Integer, nullable=False)
     target_column = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_processed = Column(Boolean, default=False)
+    status = Column(String, nullable=True, default="ready")  # profiling, ready, failed
     dataset_metadata = Column(JSON, nullable=True)  # Store additional dataset info
 
 
@@ -62,6 +69,7 @@ class Model(Base):
     params = Column(JSON, nullable=True)
     metrics = Column(JSON, nullable=True)
     is_active = Column(Boolean, default=True)
+    fingerprint = Column(String, nullable=True, index=True)  # Training inputs hash
 
 
 class TrainingJob(Base):
@@ -80,12 +88,50 @@ class TrainingJob(Base):
     completed_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
     model_id = Column(String, nullable=True)
+    fingerprint = Column(String, nullable=True, index=True)  # Training inputs hash
+
+
+# Columns added to existing tables, with the value existing rows get
+ADDED_COLUMNS = {
+    "datasets": {"content_hash": None, "status": "ready"},
+    "models": {"fingerprint": None},
+    "training_jobs": {"fingerprint": None},
+}
 
 
 # Create all tables
 def create_tables():
-    """Create all database tables."""
+    """Create all database tables and add columns missing from existing ones."""
     Base.metadata.create_all(bind=engine)
+    migrate_tables()
+
+
+def migrate_tables():
+    """Add ``ADDED_COLUMNS`` to tables created before them.
+    
+    ``create_all`` never alters a table that already exists. Missing
+    columns are added with their indexes and backfilled; columns that
+    exist are left alone, so this is safe to run on every startup.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table_name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table_name)}
+            table = Base.metadata.tables[table_name]
+            
+            for name, backfill in columns.items():
+                if name in existing:
+                    continue
+                column_type = table.c[name].type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+                if backfill is not None:
+                    conn.execute(text(f"UPDATE {table_name} SET {name} = :value"), {"value": backfill})
+                for index in table.indexes:
+                    if name in [c.name for c in index.columns]:
+                        index.create(bind=conn)
+                logger.info(f"Added column {table_name}.{name}")
 
 
 # Dependency to get database session
@@ -0,0 +1,117 @@
+"""In-memory fan-out of training progress events."""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = ("finished", "failed", "cancelled")
+
+
+class ProgressBroker:
+    """Publishes training job events to streaming subscribers.
+
+    Events are published from worker threads and delivered to asyncio
+    queues owned by the event loop of each subscriber. A bounded history is
+    kept per job so late subscribers can catch up without touching the
+    database.
+    """
+
+    def __init__(self, history_size: int = 500, max_jobs: int = 200):
+        self.history_size = history_size
+        self.max_jobs = max_jobs
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, event_type: str, **data: Any) -> Dict[str, Any]:
+        """Publish an event for a job to all of its subscribers."""
+        event = {
+            "job_id": job_id,
+            "type": event_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            **data
+        }
+
+        with self._lock:
+            history = self._history.get(job_id)
+            if history is None:
+                history = deque(maxlen=self.history_size)
+                self._history[job_id] = history
+                # Forget the oldest jobs once the history is full
+                while len(self._history) > self.max_jobs:
+                    self._history.popitem(last=False)
+            history.append(event)
+            subscribers = list(self._subscribers.get(job_id, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's event loop has already been closed
+                pass
+
+        return event
+
+    def subscribe(self, job_id: str) -> Tuple[asyncio.Queue, List[Dict[str, Any]]]:
+        """Subscribe to a job's events.
+
+        Returns the queue new events are delivered to and the events
+        published so far.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((loop, queue))
+            history = list(self._history.get(job_id, []))
+
+        return queue, history
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue."""
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [s for s in subscribers if s[1] is not queue]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def has_job(self, job_id: str) -> bool:
+        """Check whether any events have been published for a job."""
+        with self._lock:
+            return job_id in self._history
+
+    def get_latest(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent event published for a job."""
+        with self._lock:
+            history = self._history.get(job_id)
+            return history[-1] if history else None
+
+
+def is_terminal_event(event: Dict[str, Any]) -> bool:
+    """Check whether an event ends a job's stream."""
+    return event.get("type") == "status" and event.get("status") in TERMINAL_STATUSES
+
+
+@contextmanager
+def timed_stage(emit: Optional[Callable[..., Any]], stage: str):
+    """Time a job stage and report its start and duration through ``emit``."""
+    if emit is None:
+        yield
+        return
+
+    emit("stage", stage=stage, state="started")
+    start = time.perf_counter()
+    yield
+    emit("stage", stage=stage, state="completed", seconds=round(time.perf_counter() - start, 4))
+
+
+# Global broker shared by training workers and streaming endpoints
+progress_broker = ProgressBroker()
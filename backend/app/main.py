@@ -8,7 +8,10 @@ from fastapi.responses import JSONResponse
 from .core.config import settings
 from .core.logging import setup_logging, get_logger
 from .core.database import create_tables
-from .api import datasets, models, training, prediction
+from .api import datasets, models, training, prediction, admin
+from .ml.drift import drift_monitor
+from .ml.excel import excel_ingestor
+from .ml.resources import resource_scheduler
 from .schemas.common import ErrorResponse
 
 # Setup logging
@@ -23,10 +26,13 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ML Workbench API")
     create_tables()
     logger.info("Database tables created")
+    resource_scheduler.limit_process_threads()
     
     yield
     
     # Shutdown
+    drift_monitor.flush()
+    excel_ingestor.shutdown()
     logger.info("Shutting down ML Workbench API")
 
 
@@ -54,6 +60,7 @@ app.include_router(datasets.router, prefix=settings.api_v1_prefix)
 app.include_router(models.router, prefix=settings.api_v1_prefix)
 app.include_router(training.router, prefix=settings.api_v1_prefix)
 app.include_router(prediction.router, prefix=settings.api_v1_prefix)
+app.include_router(admin.router, prefix=settings.api_v1_prefix)
 
 
 @app.get("/", response_model=dict)
@@ -0,0 +1,197 @@
+"""Columnar on-disk copies of uploaded datasets."""
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # Parquet needs pyarrow; fall back to .npy columns
+    pyarrow = None
+
+logger = get_logger(__name__)
+
+COLUMNAR_FORMATS = ("auto", "parquet", "npy", "none")
+
+MANIFEST = "manifest.json"
+
+
+class ColumnarStore:
+    """Stores a dataset as binary columns next to its uploaded file.
+    
+    A dataset file ``uploads/blobs/{sha256}.csv`` gets a directory
+    ``uploads/blobs/{sha256}.columns/`` holding either one Parquet file (when
+    pyarrow is installed) or one ``.npy`` array per column, plus a
+    manifest with column names and dtypes. Loading reads only the
+    requested columns and skips text parsing entirely.
+    
+    In the ``.npy`` layout numeric, boolean and datetime columns are
+    stored as their raw arrays. String and categorical columns are stored
+    as integer codes with their distinct values in the manifest, so no
+    column ever needs pickling.
+    """
+    
+    def __init__(self, storage_format: Optional[str] = None):
+        self.storage_format = storage_format or settings.columnar_format
+        if self.storage_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {self.storage_format}")
+        if self.storage_format == "auto":
+            self.storage_format = "parquet" if pyarrow is not None else "npy"
+        if self.storage_format == "parquet" and pyarrow is None:
+            raise ValueError("The parquet columnar format requires pyarrow")
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether datasets are converted to a columnar copy."""
+        return self.storage_format != "none"
+    
+    def get_columnar_path(self, file_path: str) -> Path:
+        """Get the columnar directory of a dataset file."""
+        return Path(file_path).with_suffix(".columns")
+    
+    def exists(self, file_path: str) -> bool:
+        """Check whether a dataset file has a columnar copy."""
+        return (self.get_columnar_path(file_path) / MANIFEST).exists()
+    
+    def write(self, df: pd.DataFrame, file_path: str) -> Path:
+        """Write a DataFrame as the columnar copy of a dataset file.
+        
+        Columns are written to a temporary directory that is renamed into
+        place once complete, so concurrent readers never see a partial copy.
+        Dataset files never change under the same path, so an existing
+        copy is kept as it is; of concurrent writers, the first to finish
+        wins and the others discard their copies.
+        """
+        target = self.get_columnar_path(file_path)
+        if self.exists(file_path):
+            return target
+        
+        temp_dir = target.with_name(f".{target.name}.{uuid.uuid4().hex}")
+        temp_dir.mkdir(parents=True)
+        
+        try:
+            if self.storage_format == "parquet":
+                df.to_parquet(temp_dir / "data.parquet", index=False)
+                columns = [{"name": str(col), "dtype": str(df[col].dtype)} for col in df.columns]
+            else:
+                columns = [
+                    self._write_column(df[col], temp_dir / f"{i}.npy")
+                    for i, col in enumerate(df.columns)
+                ]
+            
+            manifest = {"format": self.storage_format, "rows": int(len(df)), "columns": columns}
+            with open(temp_dir / MANIFEST, "w") as f:
+                json.dump(manifest, f, default=str)
+            
+            if target.exists() and not self.exists(file_path):
+                # Leftover without a manifest, which readers never use
+                shutil.rmtree(target, ignore_errors=True)
+            try:
+                os.replace(temp_dir, target)
+            except OSError:
+                # Another writer finished first
+                if not self.exists(file_path):
+                    raise
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return target
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        
+        logger.info(f"Wrote {self.storage_format} columns for {Path(file_path).name}")
+        return target
+    
+    def get_manifest(self, file_path: str) -> Dict[str, Any]:
+        """Read the manifest of a dataset's columnar copy."""
+        with open(self.get_columnar_path(file_path) / MANIFEST) as f:
+            return json.load(f)
+    
+    def read(self,
+             file_path: str,
+             columns: Optional[List[str]] = None,
+             rows: Optional[Any] = None) -> pd.DataFrame:
+        """Read a dataset's columnar copy, optionally only some columns.
+        
+        ``rows`` (a slice or sorted array of row positions) selects rows;
+        ``.npy`` columns are then memory-mapped so only those rows are read.
+        """
+        path = self.get_columnar_path(file_path)
+        manifest = self.get_manifest(file_path)
+        
+        names = [column["name"] for column in manifest["columns"]]
+        if columns is not None:
+            unknown = [col for col in columns if col not in names]
+            if unknown:
+                raise ValueError(f"Columns not found: {unknown}")
+        
+        if manifest["format"] == "parquet":
+            df = pd.read_parquet(path / "data.parquet", columns=columns)
+            return df.iloc[rows].reset_index(drop=True) if rows is not None else df
+        
+        selected = columns if columns is not None else names
+        positions = {name: i for i, name in enumerate(names)}
+        data = {
+            name: self._read_column(manifest["columns"][positions[name]], path / f"{positions[name]}.npy", rows)
+            for name in selected
+        }
+        return pd.DataFrame(data, columns=selected)
+    
+    def delete(self, file_path: str) -> None:
+        """Delete a dataset's columnar copy."""
+        path = self.get_columnar_path(file_path)
+        if path.exists():
+            shutil.rmtree(path)
+    
+    def _write_column(self, series: pd.Series, path: Path) -> Dict[str, Any]:
+        """Write one column as an ``.npy`` array and describe it for the manifest."""
+        column: Dict[str, Any] = {"name": str(series.name), "dtype": str(series.dtype)}
+        
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            column["categories"] = series.cat.categories.tolist()
+            values = series.cat.codes.to_numpy()
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            codes, uniques = pd.factorize(series)
+            column["categories"] = uniques.tolist()
+            values = codes
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable integers and booleans: missing values become NaN
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = series.to_numpy()
+        
+        np.save(path, values, allow_pickle=False)
+        return column
+    
+    def _read_column(self, column: Dict[str, Any], path: Path, rows: Optional[Any] = None) -> Any:
+        """Rebuild one column (or some of its rows) from its ``.npy`` array."""
+        if rows is None:
+            values = np.load(path, allow_pickle=False)
+        else:
+            values = np.array(np.load(path, mmap_mode="r", allow_pickle=False)[rows])
+        dtype = column["dtype"]
+        
+        if "categories" in column:
+            categories = column["categories"]
+            if dtype == "category":
+                return pd.Categorical.from_codes(values, categories=categories)
+            # Strings: code -1 marks a missing value
+            lookup = np.array(categories + [np.nan], dtype=object)
+            return pd.array(lookup[values], dtype=dtype) if dtype != "object" else lookup[values]
+        
+        if str(values.dtype) != dtype:
+            # Nullable extension dtypes were stored as floats
+            return pd.Series(values).astype(dtype).array
+        return values
+
+
+# Shared store used by the loader and the dataset endpoints
+columnar_store = ColumnarStore()
@@ -0,0 +1,328 @@
+"""Streaming drift monitoring of prediction inputs."""
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .preprocessing import DataPreprocessor
+
+logger = get_logger(__name__)
+
+# Floor for empty buckets so PSI stays finite
+PSI_EPSILON = 1e-4
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """Column values as floats, with anything non-numeric as NaN."""
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Histogram of present values: underflow, one count per bin, overflow."""
+    bins = len(edges) - 1
+    idx = np.searchsorted(edges, values, side="right")
+    # The training maximum belongs to the last bin, not the overflow
+    idx[values == edges[-1]] = bins
+    return np.bincount(idx, minlength=bins + 2)
+
+
+def _category_counts(series: pd.Series, categories: pd.Index) -> np.ndarray:
+    """Counts of present values per baseline category plus an "other" count."""
+    codes = categories.get_indexer(series.astype("string").to_numpy(dtype=object))
+    codes[codes < 0] = len(categories)
+    return np.bincount(codes, minlength=len(categories) + 1)
+
+
+def build_baseline(X: pd.DataFrame,
+                   bins: Optional[int] = None,
+                   max_categories: Optional[int] = None) -> Dict[str, Any]:
+    """Summarize training features into the sketches used for drift scores.
+    
+    Numeric columns get a fixed-width histogram over the training range
+    reported by ``DataPreprocessor.get_feature_info``, with underflow and
+    overflow buckets for values outside it. Categorical columns count
+    their ``max_categories`` most frequent training values plus "other".
+    """
+    bins = bins or settings.drift_histogram_bins
+    max_categories = max_categories or settings.drift_max_categories
+    info = DataPreprocessor().get_feature_info(X)
+    features: Dict[str, Dict[str, Any]] = {}
+    
+    for col in info["numeric_features"]:
+        ranges = info["feature_ranges"][col]
+        low, high = ranges["min"], ranges["max"]
+        if not np.isfinite(low) or not np.isfinite(high):
+            low, high = 0.0, 1.0
+        if high <= low:
+            high = low + 1.0
+        edges = np.linspace(low, high, bins + 1)
+        values = _numeric_values(X[col])
+        present = values[~np.isnan(values)]
+        features[col] = {
+            "type": "numeric",
+            "edges": edges.tolist(),
+            "counts": _bin_counts(present, edges).tolist(),
+            "missing": int(len(values) - len(present)),
+            "mean": float(present.mean()) if len(present) else 0.0,
+            "std": float(present.std()) if len(present) else 0.0
+        }
+    
+    for col in info["categorical_features"]:
+        series = X[col].dropna()
+        categories = pd.Index(series.astype("string").value_counts().index[:max_categories])
+        features[col] = {
+            "type": "categorical",
+            "categories": categories.tolist(),
+            "counts": _category_counts(series, categories).tolist(),
+            "missing": int(X[col].isna().sum())
+        }
+    
+    return {"rows": int(len(X)), "features": features}
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI between two bucket count vectors."""
+    p = np.maximum(expected / max(expected.sum(), 1), PSI_EPSILON)
+    q = np.maximum(actual / max(actual.sum(), 1), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov statistic between two histograms on the same bins."""
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    cdf_expected = np.cumsum(expected) / expected.sum()
+    cdf_actual = np.cumsum(actual) / actual.sum()
+    return float(np.max(np.abs(cdf_expected - cdf_actual)))
+
+
+class DriftMonitor:
+    """Tracks prediction inputs against a model's training baseline.
+    
+    Every prediction batch updates one fixed-size sketch per feature:
+    histogram counts on the baseline bins (or baseline category counts),
+    a missing count and running mean/variance. Memory per model depends
+    only on the number of features, never on traffic. Sketches are
+    flushed to ``models/{id}.drift.json`` at most every
+    ``drift_flush_interval`` seconds and on shutdown, and compared with
+    the baseline in ``models/{id}.drift_baseline.json`` by PSI and KS.
+    """
+    
+    def __init__(self):
+        self.models_dir = Path(settings.models_dir)
+        self.models_dir.mkdir(exist_ok=True)
+        self._baselines: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._sketches: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set = set()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def get_baseline_path(self, model_id: str) -> Path:
+        """Get the training baseline path for a model."""
+        return self.models_dir / f"{model_id}.drift_baseline.json"
+    
+    def get_sketch_path(self, model_id: str) -> Path:
+        """Get the flushed prediction sketch path for a model."""
+        return self.models_dir / f"{model_id}.drift.json"
+    
+    def update(self, model_id: str, X: pd.DataFrame) -> None:
+        """Add a batch of prediction inputs to a model's sketches."""
+        with self._lock:
+            baseline = self._load_baseline(model_id)
+            if baseline is None:
+                return
+            sketch = self._load_sketch(model_id, baseline)
+            
+            for col, base in baseline["features"].items():
+                state = sketch["features"][col]
+                if col not in X.columns:
+                    state["missing"] += len(X)
+                    continue
+                
+                if base["type"] == "numeric":
+                    values = _numeric_values(X[col])
+                    present = values[~np.isnan(values)]
+                    state["counts"] += _bin_counts(present, base["edges"])
+                    self._merge_moments(state, present)
+                else:
+                    present = X[col].dropna()
+                    state["counts"] += _category_counts(present, base["categories"])
+                state["missing"] += len(X) - len(present)
+            
+            sketch["rows"] += len(X)
+            sketch["batches"] += 1
+            sketch["last_updated"] = datetime.utcnow().isoformat()
+            self._dirty.add(model_id)
+            
+            if time.monotonic() - self._last_flush >= settings.drift_flush_interval:
+                self._flush_locked()
+    
+    def flush(self) -> None:
+        """Write every updated sketch to disk."""
+        with self._lock:
+            self._flush_locked()
+    
+    def report(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Compare a model's prediction sketches with its training baseline."""
+        with self._lock:
+            baseline = self._load_baseline(model_id)
+            if baseline is None:
+                return None
+            sketch = self._load_sketch(model_id, baseline)
+            
+            features: List[Dict[str, Any]] = []
+            for col, base in baseline["features"].items():
+                state = sketch["features"][col]
+                expected = np.append(base["counts"], base["missing"])
+                actual = np.append(state["counts"], state["missing"])
+                
+                entry = {
+                    "feature": col,
+                    "type": base["type"],
+                    "psi": population_stability_index(expected, actual) if sketch["rows"] else 0.0,
+                    "ks": None,
+                    "baseline_missing_rate": float(base["missing"] / max(baseline["rows"], 1)),
+                    "missing_rate": float(state["missing"] / max(sketch["rows"], 1)),
+                    "baseline_mean": None,
+                    "mean": None,
+                    "baseline_std": None,
+                    "std": None,
+                    "out_of_range_rate": None
+                }
+                
+                present = max(int(np.sum(state["counts"])), 1)
+                if base["type"] == "numeric":
+                    entry.update({
+                        "ks": binned_ks(np.asarray(base["counts"]), state["counts"]),
+                        "baseline_mean": base["mean"],
+                        "mean": state["mean"] if state["n"] else None,
+                        "baseline_std": base["std"],
+                        "std": float(np.sqrt(state["m2"] / state["n"])) if state["n"] else None,
+                        "out_of_range_rate": float((state["counts"][0] + state["counts"][-1]) / present)
+                    })
+                else:
+                    # Values never seen among the training categories
+                    entry["out_of_range_rate"] = float(state["counts"][-1] / present)
+                
+                entry["drifted"] = entry["psi"] >= settings.drift_psi_threshold
+                features.append(entry)
+            
+            features.sort(key=lambda f: f["psi"], reverse=True)
+            return {
+                "model_id": model_id,
+                "baseline_rows": baseline["rows"],
+                "rows": sketch["rows"],
+                "batches": sketch["batches"],
+                "started_at": sketch["started_at"],
+                "last_updated": sketch["last_updated"],
+                "psi_threshold": settings.drift_psi_threshold,
+                "drifted_features": [f["feature"] for f in features if f["drifted"]],
+                "features": features
+            }
+    
+    def reset(self, model_id: str) -> None:
+        """Discard a model's prediction sketches and start a new window."""
+        with self._lock:
+            self._sketches.pop(model_id, None)
+            self._dirty.discard(model_id)
+            sketch_path = self.get_sketch_path(model_id)
+            if sketch_path.exists():
+                sketch_path.unlink()
+    
+    def delete(self, model_id: str) -> None:
+        """Delete a model's baseline and sketches."""
+        self.reset(model_id)
+        with self._lock:
+            self._baselines.pop(model_id, None)
+            baseline_path = self.get_baseline_path(model_id)
+            if baseline_path.exists():
+                baseline_path.unlink()
+    
+    def _load_baseline(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Load and cache a baseline, with bins and categories ready for lookups."""
+        if model_id not in self._baselines:
+            path = self.get_baseline_path(model_id)
+            baseline = None
+            if path.exists():
+                with open(path) as f:
+                    baseline = json.load(f)
+                for base in baseline["features"].values():
+                    if base["type"] == "numeric":
+                        base["edges"] = np.asarray(base["edges"])
+                    else:
+                        base["categories"] = pd.Index(base["categories"])
+            # Models trained before drift baselines existed are cached as None
+            self._baselines[model_id] = baseline
+        return self._baselines[model_id]
+    
+    def _load_sketch(self, model_id: str, baseline: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a model's live sketch, resuming from its last flush."""
+        if model_id in self._sketches:
+            return self._sketches[model_id]
+        
+        path = self.get_sketch_path(model_id)
+        if path.exists():
+            with open(path) as f:
+                sketch = json.load(f)
+            for state in sketch["features"].values():
+                state["counts"] = np.asarray(state["counts"], dtype=np.int64)
+        else:
+            sketch = {
+                "rows": 0,
+                "batches": 0,
+                "started_at": datetime.utcnow().isoformat(),
+                "last_updated": None,
+                "features": {
+                    col: {
+                        "counts": np.zeros(len(base["counts"]), dtype=np.int64),
+                        "missing": 0,
+                        "n": 0,
+                        "mean": 0.0,
+                        "m2": 0.0
+                    }
+                    for col, base in baseline["features"].items()
+                }
+            }
+        self._sketches[model_id] = sketch
+        return sketch
+    
+    def _merge_moments(self, state: Dict[str, Any], values: np.ndarray) -> None:
+        """Merge a batch into running count, mean and sum of squared deviations."""
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        total = state["n"] + n
+        delta = batch_mean - state["mean"]
+        state["mean"] += delta * n / total
+        state["m2"] += batch_m2 + delta ** 2 * state["n"] * n / total
+        state["n"] = total
+    
+    def _flush_locked(self) -> None:
+        """Write dirty sketches; the caller holds the lock."""
+        for model_id in self._dirty:
+            sketch = self._sketches[model_id]
+            data = dict(sketch)
+            data["features"] = {
+                col: dict(state, counts=state["counts"].tolist())
+                for col, state in sketch["features"].items()
+            }
+            with open(self.get_sketch_path(model_id), "w") as f:
+                json.dump(data, f)
+        if self._dirty:
+            logger.info(f"Flushed drift sketches for {len(self._dirty)} model(s)")
+        self._dirty.clear()
+        self._last_flush = time.monotonic()
+
+
+# Global monitor shared by prediction and model endpoints
+drift_monitor = DriftMonitor()
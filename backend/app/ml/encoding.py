@@ -0,0 +1,237 @@
+"""Bounded-dimension encoding of categorical features."""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import KFold
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+logger = get_logger(__name__)
+
+ENCODING_STRATEGIES = ("auto", "label", "onehot", "hash", "target")
+
+MISSING = "<missing>"
+
+
+class FeatureEncoder:
+    """Encodes a feature DataFrame into a sparse numeric matrix.
+    
+    Numeric columns pass through unchanged. Categorical columns are
+    encoded with one of:
+    
+    - ``label``: one column of category codes (unknown values become -1)
+    - ``onehot``: one column per frequent category plus an "other" column
+      for rare and unseen values
+    - ``hash``: the hashing trick into a fixed number of signed buckets
+    - ``target``: smoothed per-class target means, computed out-of-fold
+      during fitting so rows never see their own label
+    
+    ``auto`` one-hot encodes columns with at most ``max_categories``
+    distinct values and hashes the rest. The output is always a CSR matrix
+    whose width does not depend on the number of distinct values. The
+    fitted encoder is saved with the model so prediction uses identical
+    encoding.
+    """
+    
+    def __init__(self,
+                 strategy: Optional[str] = None,
+                 hash_buckets: Optional[int] = None,
+                 max_categories: Optional[int] = None,
+                 min_frequency: Optional[int] = None,
+                 target_folds: Optional[int] = None,
+                 smoothing: Optional[float] = None,
+                 random_state: int = 42,
+                 dtype: Any = np.float64):
+        self.strategy = strategy or settings.categorical_encoding
+        if self.strategy not in ENCODING_STRATEGIES:
+            raise ValueError(f"Unsupported encoding strategy: {self.strategy}")
+        self.hash_buckets = hash_buckets or settings.hash_buckets
+        self.max_categories = max_categories or settings.onehot_max_categories
+        self.min_frequency = min_frequency or settings.onehot_min_frequency
+        self.target_folds = target_folds or settings.target_encoding_folds
+        self.smoothing = smoothing if smoothing is not None else settings.target_encoding_smoothing
+        self.random_state = random_state
+        self.dtype = dtype
+        
+        self.columns_: List[str] = []
+        self.numeric_columns_: List[str] = []
+        self.column_strategies_: Dict[str, str] = {}
+        self.state_: Dict[str, Dict[str, Any]] = {}
+        self.feature_names_: List[str] = []
+    
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "FeatureEncoder":
+        """Fit the encoder."""
+        self.fit_transform(X, y)
+        return self
+    
+    def fit_transform(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> sparse.csr_matrix:
+        """Fit the encoder and encode the training rows.
+        
+        Target-encoded columns of the returned matrix are out-of-fold, so
+        they differ from what ``transform`` returns for the same rows.
+        """
+        self.columns_ = list(X.columns)
+        self.numeric_columns_ = [
+            col for col in self.columns_ if pd.api.types.is_numeric_dtype(X[col])
+        ]
+        categorical_columns = [col for col in self.columns_ if col not in self.numeric_columns_]
+        
+        self.column_strategies_ = {col: self._choose_strategy(X[col]) for col in categorical_columns}
+        if "target" in self.column_strategies_.values():
+            if y is None:
+                raise ValueError("Target encoding requires the target column")
+            y_codes, classes = self._encode_target(y)
+        
+        self.state_ = {}
+        self.feature_names_ = list(self.numeric_columns_)
+        blocks = [self._numeric_block(X)]
+        
+        for col in categorical_columns:
+            values = self._as_strings(X[col])
+            strategy = self.column_strategies_[col]
+            
+            if strategy == "label":
+                categories = pd.Index(np.unique(values))
+                self.state_[col] = {"categories": categories}
+                names = [col]
+            elif strategy == "onehot":
+                counts = pd.Series(values).value_counts()
+                kept = counts[counts >= self.min_frequency].index[:self.max_categories]
+                categories = pd.Index(kept)
+                self.state_[col] = {"categories": categories}
+                names = [f"{col}={value}" for value in categories] + [f"{col}=<other>"]
+            elif strategy == "hash":
+                self.state_[col] = {}
+                names = [f"{col}#{i}" for i in range(self.hash_buckets)]
+            else:
+                blocks.append(self._fit_target_encoding(col, values, y_codes, len(classes)))
+                names = self._target_names(col, classes)
+                self.feature_names_.extend(names)
+                continue
+            
+            blocks.append(self._encode_column(col, values))
+            self.feature_names_.extend(names)
+        
+        matrix = sparse.hstack(blocks, format="csr", dtype=self.dtype)
+        logger.info(f"Encoded {len(self.columns_)} columns into {matrix.shape[1]} features "
+                    f"({', '.join(f'{c}: {s}' for c, s in self.column_strategies_.items()) or 'all numeric'})")
+        return matrix
+    
+    def transform(self, X: pd.DataFrame) -> sparse.csr_matrix:
+        """Encode rows with the fitted encoding.
+        
+        Missing columns are treated as missing values.
+        """
+        X = X.reindex(columns=self.columns_)
+        blocks = [self._numeric_block(X)]
+        for col, strategy in self.column_strategies_.items():
+            values = self._as_strings(X[col])
+            if strategy == "target":
+                state = self.state_[col]
+                codes = state["categories"].get_indexer(values)
+                # Unseen categories fall back to the class prior
+                table = np.vstack([state["table"], state["prior"]])
+                blocks.append(sparse.csr_matrix(table[codes]))
+            else:
+                blocks.append(self._encode_column(col, values))
+        return sparse.hstack(blocks, format="csr", dtype=self.dtype)
+    
+    def get_feature_names(self) -> List[str]:
+        """Names of the encoded feature columns."""
+        return list(self.feature_names_)
+    
+    def _choose_strategy(self, series: pd.Series) -> str:
+        """Pick the encoding for one categorical column."""
+        if self.strategy != "auto":
+            return self.strategy
+        return "onehot" if series.nunique(dropna=False) <= self.max_categories else "hash"
+    
+    def _as_strings(self, series: pd.Series) -> np.ndarray:
+        """Convert a column to an object array of strings with missing marked."""
+        return series.astype("string").fillna(MISSING).to_numpy(dtype=object)
+    
+    def _numeric_block(self, X: pd.DataFrame) -> sparse.csr_matrix:
+        """Numeric columns with missing values as zero."""
+        if not self.numeric_columns_:
+            return sparse.csr_matrix((len(X), 0), dtype=self.dtype)
+        numeric = X[self.numeric_columns_].apply(pd.to_numeric, errors="coerce")
+        return sparse.csr_matrix(numeric.fillna(0).to_numpy(dtype=self.dtype))
+    
+    def _encode_column(self, col: str, values: np.ndarray) -> sparse.csr_matrix:
+        """Encode a label, one-hot or hashed column."""
+        strategy = self.column_strategies_[col]
+        n_rows = len(values)
+        
+        if strategy == "label":
+            codes = self.state_[col]["categories"].get_indexer(values)
+            return sparse.csr_matrix(codes.reshape(-1, 1).astype(self.dtype))
+        
+        if strategy == "onehot":
+            categories = self.state_[col]["categories"]
+            codes = categories.get_indexer(values)
+            # Rare and unseen values share the trailing "other" column
+            codes[codes < 0] = len(categories)
+            width = len(categories) + 1
+            data = np.ones(n_rows, dtype=self.dtype)
+        else:
+            hashes = pd.util.hash_array(values)
+            codes = (hashes % np.uint64(self.hash_buckets)).astype(np.int64)
+            # A hash bit picks the sign so collisions cancel out on average
+            data = np.where(hashes >> np.uint64(63), -1, 1).astype(self.dtype)
+            width = self.hash_buckets
+        
+        return sparse.csr_matrix(
+            (data, codes, np.arange(n_rows + 1)),
+            shape=(n_rows, width)
+        )
+    
+    def _encode_target(self, y: pd.Series):
+        """Map target labels to class indices."""
+        classes, y_codes = np.unique(np.asarray(y).astype(str), return_inverse=True)
+        return y_codes, classes
+    
+    def _target_table(self, codes: np.ndarray, y_codes: np.ndarray, n_categories: int, n_classes: int):
+        """Smoothed per-category class frequencies and the class prior."""
+        counts = np.bincount(codes, minlength=n_categories).astype(np.float64)
+        prior = np.bincount(y_codes, minlength=n_classes) / max(len(y_codes), 1)
+        sums = np.column_stack([
+            np.bincount(codes[y_codes == k], minlength=n_categories) for k in range(n_classes)
+        ]).astype(np.float64)
+        table = (sums + self.smoothing * prior) / (counts[:, None] + self.smoothing)
+        # Binary targets only need the positive class
+        if n_classes == 2:
+            return table[:, 1:], prior[1:]
+        return table, prior
+    
+    def _fit_target_encoding(self,
+                             col: str,
+                             values: np.ndarray,
+                             y_codes: np.ndarray,
+                             n_classes: int) -> sparse.csr_matrix:
+        """Fit a target encoding and return its out-of-fold training values."""
+        codes, categories = pd.factorize(values)
+        n_categories = len(categories)
+        table, prior = self._target_table(codes, y_codes, n_categories, n_classes)
+        self.state_[col] = {"categories": pd.Index(categories), "table": table, "prior": prior}
+        
+        encoded = np.empty((len(values), table.shape[1]), dtype=np.float64)
+        folds = KFold(
+            n_splits=min(self.target_folds, len(values)),
+            shuffle=True,
+            random_state=self.random_state
+        )
+        for fit_idx, encode_idx in folds.split(values):
+            fold_table, _ = self._target_table(codes[fit_idx], y_codes[fit_idx], n_categories, n_classes)
+            encoded[encode_idx] = fold_table[codes[encode_idx]]
+        
+        return sparse.csr_matrix(encoded)
+    
+    def _target_names(self, col: str, classes: np.ndarray) -> List[str]:
+        """Feature names of a target-encoded column."""
+        if len(classes) == 2:
+            return [f"{col}~{classes[1]}"]
+        return [f"{col}~{cls}" for cls in classes]
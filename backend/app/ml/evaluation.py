@@ -0,0 +1,265 @@
+"""Single-pass evaluation of classification predictions."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+logger = get_logger(__name__)
+
+
+def confusion_from_codes(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int) -> np.ndarray:
+    """Confusion matrix of class codes from a single ``np.bincount``."""
+    flat = y_true.astype(np.int64) * n_classes + y_pred.astype(np.int64)
+    return np.bincount(flat, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def class_codes(labels: pd.Index, values: Any) -> np.ndarray:
+    """Positions of ``values`` in ``labels``.
+    
+    Raises ``ValueError`` for values that are not labels, rather than
+    mapping them to a neighbouring class.
+    """
+    codes = labels.get_indexer(np.asarray(values))
+    if (codes < 0).any():
+        unknown = pd.unique(np.asarray(values)[codes < 0])
+        raise ValueError(f"Labels not among the model's classes: {list(unknown[:10])}")
+    return codes
+
+
+def report_from_confusion(cm: np.ndarray, labels: Sequence[Any]) -> Dict[str, Any]:
+    """Build a ``classification_report(output_dict=True)`` from a confusion matrix.
+    
+    Undefined precision or recall (no predicted or true samples) is
+    reported as 0, like ``zero_division=0``.
+    """
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    
+    report: Dict[str, Any] = {}
+    for i, label in enumerate(labels):
+        report[str(label)] = {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1-score": float(f1[i]),
+            "support": int(support[i])
+        }
+    
+    total = int(support.sum())
+    weights = support / total if total else np.zeros_like(support, dtype=np.float64)
+    report["accuracy"] = float(tp.sum() / total) if total else 0.0
+    report["macro avg"] = {
+        "precision": float(precision.mean()),
+        "recall": float(recall.mean()),
+        "f1-score": float(f1.mean()),
+        "support": total
+    }
+    report["weighted avg"] = {
+        "precision": float(precision @ weights),
+        "recall": float(recall @ weights),
+        "f1-score": float(f1 @ weights),
+        "support": total
+    }
+    return report
+
+
+def _roc_from_counts(tps: np.ndarray, fps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """ROC curve and AUC from cumulative true/false positive counts."""
+    positives, negatives = tps[-1], fps[-1]
+    if positives == 0 or negatives == 0:
+        # AUC is undefined without both classes
+        return np.array([0.0, 1.0]), np.array([0.0, 1.0]), float("nan")
+    
+    fpr = np.r_[0.0, fps / negatives]
+    tpr = np.r_[0.0, tps / positives]
+    return fpr, tpr, float(np.trapz(tpr, fpr))
+
+
+def roc_from_scores(is_positive: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Exact one-vs-rest ROC curve from one sorted pass over the scores."""
+    order = np.argsort(-scores, kind="mergesort")
+    sorted_scores = scores[order]
+    # Last index of each distinct score is a threshold
+    thresholds = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tps = np.cumsum(is_positive[order])[thresholds]
+    fps = thresholds + 1 - tps
+    return _roc_from_counts(tps.astype(np.float64), fps.astype(np.float64))
+
+
+def roc_from_histograms(positive_counts: np.ndarray, negative_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """ROC curve from per-bin score counts, highest bin first."""
+    tps = np.cumsum(positive_counts[::-1]).astype(np.float64)
+    fps = np.cumsum(negative_counts[::-1]).astype(np.float64)
+    return _roc_from_counts(tps, fps)
+
+
+def macro_average_curve(curves: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Average one-vs-rest ROC curves over a shared false positive grid."""
+    grid = np.unique(np.concatenate([fpr for fpr, _ in curves]))
+    tpr = np.mean([np.interp(grid, fpr, tpr) for fpr, tpr in curves], axis=0)
+    return grid, tpr
+
+
+class Evaluator:
+    """Accumulates classification metrics over chunks of predictions.
+    
+    Every chunk adds to a ``np.bincount`` confusion matrix. ROC curves
+    come either from an exact sorted pass over stored scores (``exact``)
+    or from fixed-width score histograms per class, which keeps memory
+    constant no matter how many rows are evaluated. Multiclass ROC/AUC is
+    one-vs-rest, macro-averaged.
+    """
+    
+    def __init__(self,
+                 labels: Sequence[Any],
+                 exact: bool = True,
+                 score_bins: Optional[int] = None):
+        self.labels = list(labels)
+        self.n_classes = len(self.labels)
+        self.exact = exact
+        self.score_bins = score_bins or settings.evaluation_score_bins
+        self.confusion = np.zeros((self.n_classes, self.n_classes), dtype=np.int64)
+        self.has_scores = True
+        self._true_chunks: List[np.ndarray] = []
+        self._score_chunks: List[np.ndarray] = []
+        self._positive_counts = np.zeros(self.n_classes * self.score_bins, dtype=np.int64)
+        self._negative_counts = np.zeros(self.n_classes * self.score_bins, dtype=np.int64)
+    
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, y_score: Optional[np.ndarray] = None) -> None:
+        """Add a chunk of true codes, predicted codes and class scores."""
+        y_true = np.asarray(y_true, dtype=np.int64)
+        self.confusion += confusion_from_codes(y_true, np.asarray(y_pred), self.n_classes)
+        
+        if y_score is None:
+            self.has_scores = False
+            return
+        
+        y_score = np.asarray(y_score, dtype=np.float32)
+        if self.exact:
+            self._true_chunks.append(y_true)
+            self._score_chunks.append(y_score)
+            return
+        
+        bins = np.clip((y_score * self.score_bins).astype(np.int64), 0, self.score_bins - 1)
+        flat = bins + np.arange(self.n_classes) * self.score_bins
+        is_positive = y_true[:, None] == np.arange(self.n_classes)
+        size = self.n_classes * self.score_bins
+        self._positive_counts += np.bincount(flat[is_positive], minlength=size)
+        self._negative_counts += np.bincount(flat[~is_positive], minlength=size)
+    
+    def scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """True codes and scores collected in exact mode."""
+        if not self._true_chunks:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.n_classes), dtype=np.float32)
+        return np.concatenate(self._true_chunks), np.concatenate(self._score_chunks)
+    
+    def result(self) -> Dict[str, Any]:
+        """Compute accuracy, confusion matrix, report and ROC/AUC."""
+        report = report_from_confusion(self.confusion, self.labels)
+        fpr, tpr, roc_auc, per_class = self._roc()
+        
+        return {
+            "accuracy": report["accuracy"],
+            "confusion_matrix": self.confusion.tolist(),
+            "classification_report": report,
+            "fpr": fpr.tolist(),
+            "tpr": tpr.tolist(),
+            "roc_auc": roc_auc,
+            "roc_auc_per_class": per_class
+        }
+    
+    def _class_curves(self) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+        """One-vs-rest ROC curve of every class."""
+        if self.exact:
+            y_true, y_score = self.scores()
+            return [
+                roc_from_scores(y_true == k, y_score[:, k].astype(np.float64))
+                for k in range(self.n_classes)
+            ]
+        
+        positives = self._positive_counts.reshape(self.n_classes, self.score_bins)
+        negatives = self._negative_counts.reshape(self.n_classes, self.score_bins)
+        return [roc_from_histograms(positives[k], negatives[k]) for k in range(self.n_classes)]
+    
+    def _roc(self) -> Tuple[np.ndarray, np.ndarray, float, Dict[str, float]]:
+        """Overall ROC curve, AUC and per-class AUCs."""
+        if not self.has_scores or self.n_classes < 2:
+            # Fallback for models without probabilities
+            return np.array([0.0, 1.0]), np.array([0.0, 1.0]), 0.5, {}
+        
+        if self.n_classes == 2:
+            # Binary: the curve of the positive class
+            fpr, tpr, roc_auc = self._class_curves()[1]
+            roc_auc = 0.5 if np.isnan(roc_auc) else roc_auc
+            return fpr, tpr, roc_auc, {str(self.labels[1]): roc_auc}
+        
+        curves = self._class_curves()
+        defined = [c for c in curves if not np.isnan(c[2])]
+        per_class = {str(label): c[2] for label, c in zip(self.labels, curves) if not np.isnan(c[2])}
+        if not defined:
+            return np.array([0.0, 1.0]), np.array([0.0, 1.0]), 0.5, {}
+        
+        fpr, tpr = macro_average_curve([(c[0], c[1]) for c in defined])
+        return fpr, tpr, float(np.mean([c[2] for c in defined])), per_class
+
+
+def evaluate_model(model: Any,
+                   X: Any,
+                   y_true: np.ndarray,
+                   chunk_rows: Optional[int] = None,
+                   holdout_path: Optional[str] = None) -> Tuple[Dict[str, Any], Evaluator]:
+    """Predict and evaluate a fitted model in chunks of rows.
+    
+    Test sets up to ``chunk_rows`` rows are scored exactly; larger ones
+    are predicted chunk by chunk into histogram-based ROC accumulators so
+    scores never have to be held in memory at once. Returns the metrics
+    and the evaluator, whose ``scores()`` hold the holdout scores in
+    exact mode.
+    
+    Raises ``ValueError`` when ``y_true`` holds a label the model has no
+    class for. With ``holdout_path``, true class indices and class probabilities are
+    written chunk by chunk to a float32 ``.npy`` array (see
+    ``HoldoutStore``).
+    """
+    chunk_rows = chunk_rows or settings.evaluation_chunk_rows
+    labels = np.asarray(model.classes_)
+    label_index = pd.Index(labels)
+    y_true = np.asarray(y_true)
+    n_rows = X.shape[0]
+    
+    evaluator = Evaluator(labels, exact=n_rows <= chunk_rows)
+    has_proba = hasattr(model, "predict_proba")
+    
+    holdout = None
+    if holdout_path and has_proba:
+        holdout = np.lib.format.open_memmap(
+            holdout_path, mode="w+", dtype=np.float32, shape=(n_rows, 1 + len(labels))
+        )
+    
+    for start in range(0, n_rows, chunk_rows):
+        X_chunk = X[start:start + chunk_rows]
+        true_codes = class_codes(label_index, y_true[start:start + chunk_rows])
+        pred_codes = class_codes(label_index, model.predict(X_chunk))
+        scores = model.predict_proba(X_chunk) if has_proba else None
+        evaluator.update(true_codes, pred_codes, scores)
+        
+        if holdout is not None:
+            holdout[start:start + len(true_codes), 0] = true_codes
+            holdout[start:start + len(true_codes), 1:] = scores
+    
+    if holdout is not None:
+        holdout.flush()
+        del holdout
+    
+    if not evaluator.exact:
+        logger.info(f"Evaluated {n_rows} rows in chunks of {chunk_rows}")
+    return evaluator.result(), evaluator
@@ -0,0 +1,154 @@
+"""Excel workbook parsing in worker processes."""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .columnar import columnar_store
+
+try:
+    import openpyxl
+except ImportError:  # .xlsx files are then read whole by pandas
+    openpyxl = None
+
+logger = get_logger(__name__)
+
+
+def header_names(header: Sequence[Any]) -> List[Any]:
+    """Column names of a header row, naming blank cells like pandas does."""
+    return [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+
+
+def data_sheets(workbook: Any) -> List[int]:
+    """Indexes of the sheets of a read-only workbook that hold the dataset.
+    
+    The first sheet's header defines the columns. Later sheets with the
+    same header continue its rows, as when a table is split across sheets
+    at Excel's row limit; other sheets are ignored.
+    """
+    headers = []
+    for worksheet in workbook.worksheets:
+        header = next(worksheet.iter_rows(max_row=1, values_only=True), None)
+        # Read-only rows are padded to the sheet width
+        while header and header[-1] is None:
+            header = header[:-1]
+        headers.append(header)
+    return [i for i, header in enumerate(headers) if i == 0 or (header and header == headers[0])]
+
+
+def _list_sheets(file_path: str) -> List[Optional[int]]:
+    """Sheets to parse, in order; ``None`` parses the first sheet with pandas."""
+    if Path(file_path).suffix.lower() != ".xlsx" or openpyxl is None:
+        return [None]
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        return data_sheets(workbook)
+    finally:
+        workbook.close()
+
+
+def _read_sheet(file_path: str, sheet: Optional[int], chunk_rows: int) -> pd.DataFrame:
+    """Parse one sheet in a worker process.
+    
+    ``.xlsx`` sheets are streamed in read-only mode, ``chunk_rows`` rows
+    of cell values at a time.
+    """
+    if sheet is None:
+        return pd.read_excel(file_path)
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[sheet].iter_rows(values_only=True)
+        names = header_names(next(rows, ()))
+        frames = []
+        while batch := list(islice(rows, chunk_rows)):
+            frames.append(pd.DataFrame(batch, columns=names))
+    finally:
+        workbook.close()
+    
+    if not frames:
+        return pd.DataFrame(columns=names)
+    # Columns empty in one chunk come out as object; settle dtypes over the sheet
+    return pd.concat(frames, ignore_index=True).infer_objects()
+
+
+class ExcelIngestor:
+    """Parses Excel workbooks in a process pool, one sheet per worker.
+    
+    Parsing workbooks is CPU-bound, so it runs in separate processes
+    rather than on the event loop or in the server's threads. Sheets are
+    streamed with openpyxl in read-only mode, so a worker never holds a
+    workbook's XML tree, only the rows of its sheet. ``ingest`` also
+    writes the result as the dataset's columnar copy, which later loads
+    read instead of the workbook. ``.xls`` files have no streaming reader
+    and are parsed whole by a single worker.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.excel_workers or settings.cpu_cores or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Worker pool, started on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers don't inherit the server's threads and locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def read(self, file_path: str) -> pd.DataFrame:
+        """Parse a workbook, blocking the calling thread until done."""
+        sheets = self.executor.submit(_list_sheets, file_path).result()
+        futures = [
+            self.executor.submit(_read_sheet, file_path, sheet, settings.load_chunk_rows)
+            for sheet in sheets
+        ]
+        return self._combine(file_path, [future.result() for future in futures])
+    
+    async def ingest(self, file_path: str) -> pd.DataFrame:
+        """Parse a workbook and write its columnar copy without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        sheets = await loop.run_in_executor(self.executor, _list_sheets, file_path)
+        frames = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _read_sheet, file_path, sheet, settings.load_chunk_rows)
+            for sheet in sheets
+        ))
+        return await loop.run_in_executor(None, self._store, file_path, frames)
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    def _combine(self, file_path: str, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Stack the sheets of a workbook in order."""
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        logger.info(f"Parsed {len(frames)} sheet(s) of {Path(file_path).name}: {len(df)} rows")
+        return df
+    
+    def _store(self, file_path: str, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine parsed sheets and write them as the columnar copy."""
+        df = self._combine(file_path, frames)
+        if columnar_store.enabled:
+            columnar_store.write(df, file_path)
+        return df
+
+
+# Shared pool used by the upload path and dataset loaders
+excel_ingestor = ExcelIngestor()
@@ -0,0 +1,203 @@
+"""Stored holdout scores and model re-analysis without loading the model."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .metrics import simplify_curve
+
+logger = get_logger(__name__)
+
+
+class HoldoutStore:
+    """Stores a model's holdout labels and class probabilities.
+    
+    Each model gets one float32 ``.npy`` array next to its artifact: the
+    first column holds the true class index and the remaining columns the
+    predicted probability of each class. The array is memory-mapped on
+    load, so threshold and metric questions never touch the model. The
+    holdout's raw feature columns are kept alongside for permutation
+    importance.
+    """
+    
+    def __init__(self):
+        self.models_dir = Path(settings.models_dir)
+        self.models_dir.mkdir(exist_ok=True)
+    
+    def get_holdout_path(self, model_id: str) -> Path:
+        """Get the holdout scores path for a model."""
+        return self.models_dir / f"{model_id}.holdout.npy"
+    
+    def get_features_path(self, model_id: str) -> Path:
+        """Get the holdout feature columns path for a model."""
+        return self.models_dir / f"{model_id}.holdout_features.pkl"
+    
+    def exists(self, model_id: str) -> bool:
+        """Check whether holdout scores are stored for a model."""
+        return self.get_holdout_path(model_id).exists()
+    
+    def load(self, model_id: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Load true class indices and class probabilities, if stored."""
+        path = self.get_holdout_path(model_id)
+        if not path.exists():
+            return None
+        data = np.load(path, mmap_mode="r")
+        return data[:, 0].astype(np.int64), data[:, 1:]
+    
+    def load_features(self, model_id: str) -> Optional[pd.DataFrame]:
+        """Load the holdout's raw feature columns, if stored."""
+        path = self.get_features_path(model_id)
+        if not path.exists():
+            return None
+        return pd.read_pickle(path)
+    
+    def delete(self, model_id: str) -> None:
+        """Delete a model's holdout scores and features."""
+        for path in (self.get_holdout_path(model_id), self.get_features_path(model_id)):
+            if path.exists():
+                path.unlink()
+
+
+def threshold_sweep(is_positive: np.ndarray, scores: np.ndarray, points: int = 101) -> Dict[str, List[float]]:
+    """Confusion counts and metrics at evenly spaced decision thresholds.
+    
+    A row is predicted positive when its score is at least the threshold.
+    """
+    thresholds = np.linspace(0.0, 1.0, points)
+    positive_scores = np.sort(scores[is_positive])
+    negative_scores = np.sort(scores[~is_positive])
+    positives, negatives = len(positive_scores), len(negative_scores)
+    
+    tp = positives - np.searchsorted(positive_scores, thresholds, side="left")
+    fp = negatives - np.searchsorted(negative_scores, thresholds, side="left")
+    fn = positives - tp
+    tn = negatives - fp
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(positives > 0, tp / max(positives, 1), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        fpr = np.where(negatives > 0, fp / max(negatives, 1), 0.0)
+    
+    total = max(positives + negatives, 1)
+    return {
+        "thresholds": thresholds.tolist(),
+        "true_positives": tp.tolist(),
+        "false_positives": fp.tolist(),
+        "true_negatives": tn.tolist(),
+        "false_negatives": fn.tolist(),
+        "precision": precision.tolist(),
+        "recall": recall.tolist(),
+        "f1": f1.tolist(),
+        "fpr": fpr.tolist(),
+        "accuracy": ((tp + tn) / total).tolist()
+    }
+
+
+def precision_recall_curve(is_positive: np.ndarray,
+                           scores: np.ndarray,
+                           max_points: Optional[int] = None) -> Dict[str, Any]:
+    """Precision/recall curve and average precision from one sorted pass."""
+    order = np.argsort(-scores, kind="mergesort")
+    sorted_scores = scores[order]
+    thresholds = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tps = np.cumsum(is_positive[order])[thresholds].astype(np.float64)
+    fps = thresholds + 1 - tps
+    
+    positives = tps[-1] if len(tps) else 0.0
+    if positives == 0:
+        return {"precision": [1.0, 0.0], "recall": [0.0, 1.0], "average_precision": 0.0}
+    
+    precision = tps / (tps + fps)
+    recall = tps / positives
+    average_precision = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+    
+    recall, precision = simplify_curve(
+        np.r_[0.0, recall], np.r_[1.0, precision],
+        max_points or settings.roc_curve_max_points,
+        settings.roc_curve_tolerance
+    )
+    return {
+        "precision": precision.tolist(),
+        "recall": recall.tolist(),
+        "average_precision": average_precision
+    }
+
+
+def calibration_curve(is_positive: np.ndarray, scores: np.ndarray, bins: int = 10) -> Dict[str, Any]:
+    """Reliability diagram over equal-width probability bins.
+    
+    Also returns the Brier score and the expected calibration error.
+    """
+    bin_index = np.clip((scores * bins).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(bin_index, minlength=bins)
+    score_sums = np.bincount(bin_index, weights=scores, minlength=bins)
+    positive_sums = np.bincount(bin_index, weights=is_positive.astype(np.float64), minlength=bins)
+    
+    filled = counts > 0
+    mean_predicted = score_sums[filled] / counts[filled]
+    fraction_positive = positive_sums[filled] / counts[filled]
+    total = max(len(scores), 1)
+    
+    return {
+        "bin_edges": np.linspace(0.0, 1.0, bins + 1).tolist(),
+        "mean_predicted": mean_predicted.tolist(),
+        "fraction_positive": fraction_positive.tolist(),
+        "counts": counts[filled].tolist(),
+        "brier_score": float(np.mean((scores - is_positive) ** 2)) if len(scores) else 0.0,
+        "expected_calibration_error": float(
+            np.sum(counts[filled] / total * np.abs(fraction_positive - mean_predicted))
+        )
+    }
+
+
+def cost_metrics(y_true: np.ndarray, scores: np.ndarray, cost_matrix: np.ndarray) -> Dict[str, Any]:
+    """Average misclassification cost of holdout decisions.
+    
+    ``cost_matrix[i, j]`` is the cost of predicting class ``j`` for a row
+    of class ``i``. Compares the model's most likely class with the
+    decision that minimizes expected cost under its probabilities.
+    """
+    argmax_pred = np.argmax(scores, axis=1)
+    # Expected cost of each decision given the predicted probabilities
+    min_cost_pred = np.argmin(scores @ cost_matrix, axis=1)
+    n_classes = cost_matrix.shape[0]
+    
+    def summarize(pred: np.ndarray) -> Dict[str, Any]:
+        confusion = np.bincount(y_true * n_classes + pred, minlength=n_classes * n_classes)
+        confusion = confusion.reshape(n_classes, n_classes)
+        return {
+            "average_cost": float(cost_matrix[y_true, pred].mean()) if len(pred) else 0.0,
+            "total_cost": float(cost_matrix[y_true, pred].sum()),
+            "accuracy": float(np.mean(pred == y_true)) if len(pred) else 0.0,
+            "confusion_matrix": confusion.tolist()
+        }
+    
+    return {
+        "most_likely_class": summarize(argmax_pred),
+        "minimum_expected_cost": summarize(min_cost_pred)
+    }
+
+
+def binary_cost_threshold(is_positive: np.ndarray,
+                          scores: np.ndarray,
+                          false_positive_cost: float,
+                          false_negative_cost: float,
+                          points: int = 101) -> Dict[str, Any]:
+    """Decision threshold minimizing the cost of false positives and negatives."""
+    sweep = threshold_sweep(is_positive, scores, points)
+    costs = (false_positive_cost * np.asarray(sweep["false_positives"])
+             + false_negative_cost * np.asarray(sweep["false_negatives"]))
+    best = int(np.argmin(costs))
+    total = max(len(scores), 1)
+    
+    return {
+        "optimal_threshold": sweep["thresholds"][best],
+        "optimal_average_cost": float(costs[best] / total),
+        "thresholds": sweep["thresholds"],
+        "average_costs": (costs / total).tolist()
+    }
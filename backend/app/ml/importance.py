@@ -0,0 +1,264 @@
+"""Permutation importance jobs on stored holdouts."""
+
+import json
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .holdout import HoldoutStore
+from .resources import resource_scheduler
+
+logger = get_logger(__name__)
+
+# Per-process state of pool workers, loaded once by the initializer
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(model_path: str, model_id: str) -> None:
+    """Load the model and its holdout once per worker process."""
+    from threadpoolctl import threadpool_limits
+    from .training import MLTrainer
+    
+    # Parallelism comes from the pool; keep each worker single-threaded
+    _worker["limits"] = threadpool_limits(limits=1)
+    store = HoldoutStore()
+    model_data = joblib.load(model_path)
+    if "n_jobs" in model_data["model"].get_params():
+        model_data["model"].set_params(n_jobs=1)
+    
+    y_true, _ = store.load(model_id)
+    _worker.update({
+        "trainer": MLTrainer(),
+        "model_data": model_data,
+        "X": store.load_features(model_id),
+        "y_true": np.asarray(y_true)
+    })
+
+
+def _score_permutation(feature: Optional[str], seed: int) -> float:
+    """Holdout accuracy with one feature column shuffled.
+    
+    ``feature=None`` scores the unshuffled holdout.
+    """
+    X = _worker["X"]
+    if feature is not None:
+        X = X.copy()
+        permutation = np.random.default_rng(seed).permutation(len(X))
+        X[feature] = X[feature].to_numpy()[permutation]
+    
+    model = _worker["model_data"]["model"]
+    predictions = model.predict(_worker["trainer"].transform_features(_worker["model_data"], X))
+    codes = np.searchsorted(model.classes_, predictions)
+    return float(np.mean(codes == _worker["y_true"]))
+
+
+class PermutationImportanceJobs:
+    """Runs and caches permutation importance per model.
+    
+    Each job shuffles every raw feature column of the stored holdout
+    ``n_repeats`` times and measures the drop in accuracy. The
+    (feature, repeat) pairs are spread over a process pool sized to the
+    job's core budget; workers load the model and holdout once. Finished
+    results are cached next to the model artifact, so they survive
+    restarts and are not recomputed.
+    """
+    
+    def __init__(self):
+        self.models_dir = Path(settings.models_dir)
+        self.models_dir.mkdir(exist_ok=True)
+        self.holdout_store = HoldoutStore()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+    
+    def get_cache_path(self, model_id: str) -> Path:
+        """Get the cached importance path for a model."""
+        return self.models_dir / f"{model_id}.importance.json"
+    
+    def is_available(self, model_id: str) -> bool:
+        """Check whether a model has the holdout data importance needs."""
+        return (self.holdout_store.exists(model_id)
+                and self.holdout_store.get_features_path(model_id).exists())
+    
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Get a model's running job or cached result."""
+        with self._lock:
+            job = self._jobs.get(model_id)
+            if job is not None:
+                return dict(job)
+        
+        cache_path = self.get_cache_path(model_id)
+        if cache_path.exists():
+            with open(cache_path) as f:
+                return json.load(f)
+        return None
+    
+    def start(self,
+              model_id: str,
+              model_path: str,
+              n_repeats: Optional[int] = None,
+              random_state: int = 42,
+              force: bool = False) -> Dict[str, Any]:
+        """Start a job, or return the running job or cached result."""
+        n_repeats = n_repeats or settings.importance_repeats
+        
+        existing = self.get(model_id)
+        if existing is not None and not force:
+            if existing["status"] in ("queued", "running"):
+                return existing
+            if existing["status"] == "finished" and existing["n_repeats"] == n_repeats:
+                return existing
+        
+        features = list(self.holdout_store.load_features(model_id).columns)
+        job = {
+            "model_id": model_id,
+            "status": "queued",
+            "progress": 0,
+            "completed_tasks": 0,
+            "total_tasks": len(features) * n_repeats + 1,
+            "n_repeats": n_repeats,
+            "scoring": "accuracy",
+            "baseline_score": None,
+            "importances": None,
+            "error_message": None,
+            "started_at": datetime.utcnow().isoformat(),
+            "completed_at": None
+        }
+        cancel_event = threading.Event()
+        
+        with self._lock:
+            running = self._jobs.get(model_id)
+            if running is not None and running["status"] in ("queued", "running"):
+                return dict(running)
+            self._jobs[model_id] = job
+            self._cancel_events[model_id] = cancel_event
+        
+        thread = threading.Thread(
+            target=self._run,
+            args=(model_id, model_path, features, n_repeats, random_state, cancel_event),
+            name=f"importance-{model_id}",
+            daemon=True
+        )
+        thread.start()
+        return dict(job)
+    
+    def cancel(self, model_id: str) -> bool:
+        """Cancel a running job."""
+        with self._lock:
+            job = self._jobs.get(model_id)
+            if job is None or job["status"] not in ("queued", "running"):
+                return False
+            self._cancel_events[model_id].set()
+        return True
+    
+    def delete(self, model_id: str) -> None:
+        """Cancel any job and drop the cached result."""
+        self.cancel(model_id)
+        cache_path = self.get_cache_path(model_id)
+        if cache_path.exists():
+            cache_path.unlink()
+    
+    def _update(self, model_id: str, **fields: Any) -> None:
+        with self._lock:
+            self._jobs[model_id].update(fields)
+    
+    def _run(self,
+             model_id: str,
+             model_path: str,
+             features: List[str],
+             n_repeats: int,
+             random_state: int,
+             cancel_event: threading.Event) -> None:
+        """Run a job in its own thread, fanning tasks out to a process pool."""
+        job_key = f"importance-{model_id}"
+        scores: Dict[str, List[float]] = {feature: [] for feature in features}
+        baseline = None
+        
+        try:
+            with resource_scheduler.allocate(job_key) as cores:
+                self._update(model_id, status="running")
+                logger.info(f"Computing permutation importance for {model_id} on {cores} core(s)")
+                
+                # Spawned workers don't inherit the server's threads and locks
+                context = multiprocessing.get_context("spawn")
+                executor = ProcessPoolExecutor(
+                    max_workers=cores,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(model_path, model_id)
+                )
+                try:
+                    futures = {executor.submit(_score_permutation, None, random_state): None}
+                    for feature in features:
+                        for repeat in range(n_repeats):
+                            future = executor.submit(_score_permutation, feature, random_state + repeat)
+                            futures[future] = feature
+                    
+                    total = len(futures)
+                    pending = set(futures)
+                    while pending and not cancel_event.is_set():
+                        # Wake up periodically so cancellation is noticed between tasks
+                        done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            feature = futures[future]
+                            if feature is None:
+                                baseline = future.result()
+                            else:
+                                scores[feature].append(future.result())
+                        completed = total - len(pending)
+                        self._update(
+                            model_id,
+                            completed_tasks=completed,
+                            progress=int(100 * completed / total)
+                        )
+                finally:
+                    # On cancel, don't block on tasks already running in workers
+                    executor.shutdown(wait=not cancel_event.is_set(), cancel_futures=True)
+            
+            if cancel_event.is_set():
+                self._update(model_id, status="cancelled",
+                             completed_at=datetime.utcnow().isoformat())
+                logger.info(f"Permutation importance cancelled for {model_id}")
+                return
+            
+            importances = []
+            for feature, feature_scores in scores.items():
+                drops = baseline - np.asarray(feature_scores)
+                importances.append({
+                    "feature": feature,
+                    "importance": float(drops.mean()),
+                    "std": float(drops.std())
+                })
+            importances.sort(key=lambda i: i["importance"], reverse=True)
+            
+            self._update(
+                model_id,
+                status="finished",
+                progress=100,
+                baseline_score=baseline,
+                importances=importances,
+                completed_at=datetime.utcnow().isoformat()
+            )
+            with self._lock:
+                result = dict(self._jobs.pop(model_id))
+                self._cancel_events.pop(model_id, None)
+            with open(self.get_cache_path(model_id), "w") as f:
+                json.dump(result, f)
+            logger.info(f"Permutation importance finished for {model_id}")
+        
+        except Exception as e:
+            logger.error(f"Permutation importance failed for {model_id}: {str(e)}")
+            self._update(model_id, status="failed", error_message=str(e),
+                         completed_at=datetime.utcnow().isoformat())
+
+
+# Global job registry shared by the API
+importance_jobs = PermutationImportanceJobs()
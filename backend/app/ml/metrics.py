@@ -0,0 +1,151 @@
+"""Compact storage for model evaluation metrics."""
+
+import heapq
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+logger = get_logger(__name__)
+
+
+def simplify_curve(x: np.ndarray,
+                   y: np.ndarray,
+                   max_points: int,
+                   tolerance: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsample a curve with top-down Ramer-Douglas-Peucker simplification.
+    
+    Points are added in order of their distance from the current polyline
+    until either ``max_points`` are kept or no dropped point lies further
+    than ``tolerance`` from it. The endpoints are always kept.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max(max_points, 2):
+        return x, y
+    
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    heap = []
+    
+    def push(start: int, end: int) -> None:
+        if end - start < 2:
+            return
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dist = np.hypot(px, py)
+        else:
+            dist = np.abs(dx * py - dy * px) / norm
+        idx = int(np.argmax(dist))
+        heapq.heappush(heap, (-float(dist[idx]), start, end, start + 1 + idx))
+    
+    push(0, n - 1)
+    kept = 2
+    while heap and kept < max_points:
+        neg_dist, start, end, idx = heapq.heappop(heap)
+        if -neg_dist <= tolerance:
+            break
+        keep[idx] = True
+        kept += 1
+        push(start, idx)
+        push(idx, end)
+    
+    return x[keep], y[keep]
+
+
+def summarize_metrics(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the summary scalars stored on the model row."""
+    report = results.get("classification_report") or {}
+    macro = report.get("macro avg", {})
+    weighted = report.get("weighted avg", {})
+    
+    return {
+        "accuracy": float(results["accuracy"]),
+        "roc_auc": float(results.get("roc_auc", 0.0)),
+        "precision_macro": float(macro.get("precision", 0.0)),
+        "recall_macro": float(macro.get("recall", 0.0)),
+        "f1_macro": float(macro.get("f1-score", 0.0)),
+        "f1_weighted": float(weighted.get("f1-score", 0.0)),
+        "test_samples": int(macro.get("support", 0)),
+        "n_classes": len(results.get("confusion_matrix") or []),
+        "n_features": len(results.get("feature_columns") or [])
+    }
+
+
+class MetricsStore:
+    """Stores full evaluation output in a compressed ``.npz`` sidecar.
+    
+    Only summary scalars belong in the database; the confusion matrix,
+    downsampled ROC curve, feature importances and classification report
+    are written next to the model artifact and loaded on demand.
+    """
+    
+    def __init__(self,
+                 max_roc_points: Optional[int] = None,
+                 roc_tolerance: Optional[float] = None):
+        self.models_dir = Path(settings.models_dir)
+        self.models_dir.mkdir(exist_ok=True)
+        self.max_roc_points = max_roc_points or settings.roc_curve_max_points
+        self.roc_tolerance = roc_tolerance if roc_tolerance is not None else settings.roc_curve_tolerance
+    
+    def get_metrics_path(self, model_id: str) -> Path:
+        """Get the sidecar path for a model."""
+        return self.models_dir / f"{model_id}.metrics.npz"
+    
+    def save(self, model_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a model's evaluation output and return its summary."""
+        fpr, tpr = simplify_curve(
+            results.get("fpr", [0.0, 1.0]),
+            results.get("tpr", [0.0, 1.0]),
+            self.max_roc_points,
+            self.roc_tolerance
+        )
+        importance = results.get("feature_importance") or []
+        
+        metrics_path = self.get_metrics_path(model_id)
+        with open(metrics_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                confusion_matrix=np.asarray(results.get("confusion_matrix") or [], dtype=np.int64),
+                fpr=fpr.astype(np.float32),
+                tpr=tpr.astype(np.float32),
+                feature_names=np.array([str(i["feature"]) for i in importance], dtype=str),
+                feature_importance=np.array([i["importance"] for i in importance], dtype=np.float32),
+                classification_report=np.array(json.dumps(results.get("classification_report") or {}, default=float)),
+                class_labels=np.array([str(label) for label in results.get("class_labels") or []], dtype=str)
+            )
+        
+        logger.info(f"Metrics saved to {metrics_path} ({len(fpr)} ROC points)")
+        return summarize_metrics(results)
+    
+    def load(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Load a model's full evaluation output, if stored."""
+        metrics_path = self.get_metrics_path(model_id)
+        if not metrics_path.exists():
+            return None
+        
+        with np.load(metrics_path, allow_pickle=False) as data:
+            return {
+                "confusion_matrix": data["confusion_matrix"].tolist(),
+                "fpr": data["fpr"].astype(float).tolist(),
+                "tpr": data["tpr"].astype(float).tolist(),
+                "feature_importance": [
+                    {"feature": str(name), "importance": float(value)}
+                    for name, value in zip(data["feature_names"], data["feature_importance"])
+                ],
+                "classification_report": json.loads(str(data["classification_report"])),
+                "class_labels": data["class_labels"].tolist() if "class_labels" in data else []
+            }
+    
+    def delete(self, model_id: str) -> None:
+        """Delete a model's metrics sidecar."""
+        metrics_path = self.get_metrics_path(model_id)
+        if metrics_path.exists():
+            metrics_path.unlink()
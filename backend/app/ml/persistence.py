@@ -1,19 +1,38 @@
 """Model persistence and storage utilities."""
 
+import hashlib
 import json
+import os
 import shutil
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import uuid
 
+import pandas as pd
 from ..core.logging import get_logger
 from ..core.config import settings
 from ..core.database import get_db, Dataset, Model, TrainingJob
+from .metrics import MetricsStore
+from .holdout import HoldoutStore
+from .importance import importance_jobs
+from .drift import drift_monitor
+from .columnar import columnar_store
+from .stats import dataset_stats
+from .row_index import row_index_store
 from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
 
+# Blobs stored for a dataset row that is not committed yet, with the
+# number of requests holding each, and the number of times each blob was
+# stored; shared by every DatasetPersistence
+_blob_lock = threading.Lock()
+_pinned_blobs: Dict[str, int] = {}
+_blob_stores: Dict[str, int] = {}
+
 
 class ModelPersistence:
     """Handles model persistence and storage operations."""
@@ -21,6 +40,8 @@ class ModelPersistence:
     def __init__(self):
         self.models_dir = Path(settings.models_dir)
         self.models_dir.mkdir(exist_ok=True)
+        self.metrics_store = MetricsStore()
+        self.holdout_store = HoldoutStore()
     
     def generate_model_id(self) -> str:
         """Generate a unique model ID."""
@@ -34,7 +55,8 @@ class ModelPersistence:
                            accuracy: float,
                            model_path: str,
                            params: Dict[str, Any],
-                           metrics: Dict[str, Any]) -> Model:
+                           metrics: Dict[str, Any],
+                           fingerprint: Optional[str] = None) -> Model:
         """Save model metadata to database."""
         
         model = Model(
@@ -45,7 +67,8 @@ class ModelPersistence:
             model_path=model_path,
             params=params,
             metrics=metrics,
-            is_active=True
+            is_active=True,
+            fingerprint=fingerprint
         )
         
         db.add(model)
@@ -78,6 +101,10 @@ class ModelPersistence:
         if model_path.exists():
             model_path.unlink()
             logger.info(f"Deleted model file: {model_path}")
+        self.metrics_store.delete(model_id)
+        self.holdout_store.delete(model_id)
+        importance_jobs.delete(model_id)
+        drift_monitor.delete(model_id)
         
         # Delete from database
         db.delete(model)
@@ -129,11 +156,20 @@ class ModelPersistence:
 
 
 class DatasetPersistence:
-    """Handles dataset persistence and storage operations."""
+    """Handles dataset persistence and storage operations.
+    
+    Dataset files are stored content-addressed as
+    ``uploads/blobs/{sha256}{ext}``. Datasets with identical contents
+    share one blob, and with it the blob's columnar copy, row index and
+    cached statistics; a blob is deleted with the last dataset that
+    references it.
+    """
     
     def __init__(self):
         self.upload_dir = Path(settings.upload_dir)
         self.upload_dir.mkdir(exist_ok=True)
+        self.blobs_dir = self.upload_dir / "blobs"
+        self.blobs_dir.mkdir(exist_ok=True)
     
     def generate_dataset_id(self) -> str:
         """Generate a unique dataset ID."""
@@ -148,7 +184,9 @@ class DatasetPersistence:
                              rows: int,
                              columns: int,
                              target_column: Optional[str] = None,
-                             metadata: Optional[Dict[str, Any]] = None) -> Dataset:
+                             metadata: Optional[Dict[str, Any]] = None,
+                             content_hash: Optional[str] = None,
+                             status: str = "ready") -> Dataset:
         """Save dataset metadata to database."""
         
         dataset = Dataset(
@@ -156,11 +194,13 @@ class DatasetPersistence:
             name=name,
             filename=filename,
             file_path=file_path,
+            content_hash=content_hash,
             rows=rows,
             columns=columns,
             target_column=target_column,
             dataset_metadata=metadata,
-            is_processed=False
+            is_processed=False,
+            status=status
         )
         
         db.add(dataset)
@@ -178,22 +218,170 @@ class DatasetPersistence:
         """Get all datasets from database."""
         return db.query(Dataset).offset(skip).limit(limit).all()
     
+    def compute_content_hash(self, file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """Compute the SHA-256 of a dataset file."""
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+    
+    def get_content_hash(self, db: Session, dataset: Dataset) -> str:
+        """Get a dataset's content hash, computing and storing it if missing."""
+        if not dataset.content_hash:
+            dataset.content_hash = self.compute_content_hash(dataset.file_path)
+            db.commit()
+        return dataset.content_hash
+    
+    def release_content_hash(self, db: Session, content_hash: Optional[str]) -> None:
+        """Drop cached statistics of contents no dataset references any more.
+        
+        Statistics are shared by datasets with identical contents.
+        """
+        if content_hash and not db.query(Dataset).filter(Dataset.content_hash == content_hash).count():
+            dataset_stats.delete(content_hash)
+    
+    def get_blob_path(self, content_hash: str, extension: str) -> Path:
+        """Get the content-addressed path of a dataset file."""
+        return self.blobs_dir / f"{content_hash}{extension.lower()}"
+    
+    def store_blob(self, temp_path: Path, content_hash: str, extension: str) -> Tuple[Path, bool]:
+        """Move a complete upload into blob storage.
+        
+        When a blob with the same contents exists already the upload is
+        discarded. The blob is pinned so that deleting another dataset
+        sharing it cannot remove it before the new dataset row is
+        committed; callers must ``unpin_blob`` it afterwards, whether or
+        not the commit succeeded. Returns the blob path and whether the
+        blob is new.
+        """
+        blob_path = self.get_blob_path(content_hash, extension)
+        with _blob_lock:
+            created = not blob_path.exists()
+            if created:
+                os.replace(temp_path, blob_path)
+            else:
+                temp_path.unlink()
+                logger.info(f"Reusing stored dataset file {blob_path.name}")
+            _pinned_blobs[str(blob_path)] = _pinned_blobs.get(str(blob_path), 0) + 1
+            _blob_stores[str(blob_path)] = _blob_stores.get(str(blob_path), 0) + 1
+        return blob_path, created
+    
+    def unpin_blob(self, db: Session, file_path: str) -> None:
+        """Release a pin taken by ``store_blob``.
+        
+        The blob is deleted if no committed dataset references it, as when
+        the request that stored it failed.
+        """
+        with _blob_lock:
+            count = _pinned_blobs.pop(file_path, 0) - 1
+            if count > 0:
+                _pinned_blobs[file_path] = count
+        self.release_file(db, file_path)
+    
+    def find_profiled_dataset(self, db: Session, file_path: str) -> Optional[Dataset]:
+        """Find a profiled dataset stored in ``file_path``, whose profile can be reused."""
+        datasets = db.query(Dataset).filter(
+            Dataset.file_path == file_path,
+            Dataset.status == "ready"
+        ).order_by(Dataset.updated_at.desc()).all()
+        
+        for dataset in datasets:
+            # Rows without metadata have no profile to reuse
+            if dataset.dataset_metadata and not dataset.dataset_metadata.get("stale_stats"):
+                return dataset
+        return None
+    
+    def release_file(self, db: Session, file_path: str) -> bool:
+        """Delete a dataset file and its derived files once no dataset references it.
+        
+        Blobs pinned by ``store_blob`` are kept. Returns whether the file
+        was deleted.
+        """
+        with _blob_lock:
+            if _pinned_blobs.get(file_path):
+                return False
+            stores = _blob_stores.get(file_path, 0)
+        
+        # Query without holding the lock; if the blob is stored again
+        # meanwhile, its new dataset may have committed after the query
+        if db.query(Dataset).filter(Dataset.file_path == file_path).count():
+            return False
+        
+        with _blob_lock:
+            if _pinned_blobs.get(file_path) or _blob_stores.get(file_path, 0) != stores:
+                return False
+            _blob_stores.pop(file_path, None)
+            
+            path = Path(file_path)
+            if path.exists():
+                path.unlink()
+                logger.info(f"Deleted dataset file: {path}")
+            columnar_store.delete(file_path)
+            row_index_store.delete(file_path)
+        return True
+    
+    def append_dataset_rows(self, dataset: Dataset, df: pd.DataFrame, chunk_size: int = 1024 * 1024) -> Tuple[str, str]:
+        """Store a dataset's file with rows appended and return its new hash and path.
+        
+        Blobs are never modified, since other datasets may share them: the
+        file is copied with the rows appended, hashing on the way, and the
+        copy is stored under its new hash, pinned as by ``store_blob``. An
+        append therefore costs a read and write of the whole file, so it
+        blocks; call it off the event loop. The row index is extended with
+        just the appended bytes. The new blob has no columnar copy; it is
+        written by the next full load.
+        """
+        file_path = Path(dataset.file_path)
+        work_path = self.blobs_dir / f".{dataset.id}.{uuid.uuid4().hex}{file_path.suffix.lower()}"
+        data = df.to_csv(index=False, header=False).encode()
+        sha256 = hashlib.sha256()
+        last_byte = b"\n"
+        
+        try:
+            with open(file_path, "rb") as src, open(work_path, "wb") as out:
+                for chunk in iter(lambda: src.read(chunk_size), b""):
+                    sha256.update(chunk)
+                    out.write(chunk)
+                    last_byte = chunk[-1:]
+                if last_byte != b"\n":
+                    data = b"\n" + data
+                sha256.update(data)
+                out.write(data)
+            new_hash = sha256.hexdigest()
+            blob_path, created = self.store_blob(work_path, new_hash, file_path.suffix)
+        except BaseException:
+            if work_path.exists():
+                work_path.unlink()
+            raise
+        
+        if created and row_index_store.exists(dataset.file_path):
+            # The blob is pinned now, so don't fail the append over its
+            # row index; a missing index is rebuilt on first use
+            try:
+                index = row_index_store.load(dataset.file_path)
+                row_index_store.save(str(blob_path), index)
+                row_index_store.append(str(blob_path), data)
+            except Exception as e:
+                logger.warning(f"Could not extend the row index of {blob_path.name}: {str(e)}")
+                row_index_store.delete(str(blob_path))
+        
+        logger.info(f"Appended {len(df)} rows to dataset {dataset.id}")
+        return new_hash, str(blob_path)
+    
     def delete_dataset(self, db: Session, dataset_id: str) -> bool:
-        """Delete dataset from database and filesystem."""
+        """Delete dataset from database, and its file once no other dataset uses it."""
         dataset = self.get_dataset(db, dataset_id)
         if not dataset:
             return False
         
-        # Delete dataset file
-        file_path = Path(dataset.file_path)
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"Deleted dataset file: {file_path}")
-        
         # Delete from database
         db.delete(dataset)
         db.commit()
         
+        self.release_file(db, dataset.file_path)
+        self.release_content_hash(db, dataset.content_hash)
+        
         logger.info(f"Dataset deleted: {dataset_id}")
         return True
     
@@ -214,6 +402,107 @@ class DatasetPersistence:
         return True
 
 
+class TrainingLogStore:
+    """Append-only per-job training log files.
+    
+    Lines are written through a buffered file handle that is flushed at
+    most every ``flush_interval`` seconds, and read back from a byte offset
+    so that tailing a job only touches the new part of its log.
+    """
+    
+    def __init__(self, flush_interval: Optional[float] = None, buffer_size: int = 64 * 1024):
+        self.logs_dir = Path(settings.logs_dir) / "jobs"
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval if flush_interval is not None else settings.job_log_flush_interval
+        self.buffer_size = buffer_size
+        self._writers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get_log_path(self, job_id: str) -> Path:
+        """Get the log file path for a job."""
+        return self.logs_dir / f"{job_id}.log"
+    
+    def append(self, job_id: str, lines: List[str]) -> None:
+        """Append lines to a job's log."""
+        with self._lock:
+            writer = self._writers.get(job_id)
+            if writer is None:
+                writer = {
+                    "file": open(self.get_log_path(job_id), "a", encoding="utf-8", buffering=self.buffer_size),
+                    "last_flush": time.monotonic()
+                }
+                self._writers[job_id] = writer
+            
+            for line in lines:
+                writer["file"].write(str(line).replace("\n", " ") + "\n")
+            
+            if time.monotonic() - writer["last_flush"] >= self.flush_interval:
+                writer["file"].flush()
+                writer["last_flush"] = time.monotonic()
+    
+    def flush(self, job_id: str) -> None:
+        """Flush buffered lines for a job to disk."""
+        with self._lock:
+            writer = self._writers.get(job_id)
+            if writer is not None:
+                writer["file"].flush()
+                writer["last_flush"] = time.monotonic()
+    
+    def close(self, job_id: str) -> None:
+        """Flush and close a job's log writer."""
+        with self._lock:
+            writer = self._writers.pop(job_id, None)
+        if writer is not None:
+            writer["file"].close()
+    
+    def read(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[str], int]:
+        """Read complete log lines starting at a byte offset.
+        
+        The file is read in ``buffer_size`` blocks, stopping once ``limit``
+        lines are complete. Returns the lines and the offset to resume from.
+        """
+        self.flush(job_id)
+        
+        log_path = self.get_log_path(job_id)
+        if not log_path.exists():
+            return [], offset
+        
+        lines: List[bytes] = []
+        pending = b""
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            while limit is None or len(lines) < limit:
+                block = f.read(self.buffer_size)
+                if not block:
+                    break
+                # Only hand out complete lines; a partial one waits for the next block
+                data = pending + block
+                end = data.rfind(b"\n") + 1
+                complete = data[:end].splitlines(keepends=True)
+                pending = data[end:]
+                if limit is not None:
+                    complete = complete[:limit - len(lines)]
+                lines.extend(complete)
+        
+        consumed = sum(len(line) for line in lines)
+        return [line.decode("utf-8").rstrip("\n") for line in lines], offset + consumed
+    
+    def exists(self, job_id: str) -> bool:
+        """Check whether a job has a log file."""
+        return self.get_log_path(job_id).exists()
+    
+    def delete(self, job_id: str) -> None:
+        """Delete a job's log file."""
+        self.close(job_id)
+        log_path = self.get_log_path(job_id)
+        if log_path.exists():
+            log_path.unlink()
+
+
+# Shared so that every writer for a job goes through the same buffer
+training_log_store = TrainingLogStore()
+
+
 class TrainingJobPersistence:
     """Handles training job persistence and storage operations."""
     
@@ -225,14 +514,16 @@ class TrainingJobPersistence:
                            db: Session,
                            job_id: str,
                            dataset_id: str,
-                           algorithm: str) -> TrainingJob:
+                           algorithm: str,
+                           fingerprint: Optional[str] = None) -> TrainingJob:
         """Create a new training job."""
         
         job = TrainingJob(
             job_id=job_id,
             dataset_id=dataset_id,
             algorithm=algorithm,
-            status="queued"
+            status="queued",
+            fingerprint=fingerprint
         )
         
         db.add(job)
@@ -250,18 +541,26 @@ class TrainingJobPersistence:
                            logs: Optional[List[str]] = None,
                            error_message: Optional[str] = None,
                            model_id: Optional[str] = None) -> bool:
-        """Update training job status."""
+        """Update training job status.
+        
+        ``logs`` are appended to the job's log file rather than stored on
+        the job row. Jobs that are finished, failed or cancelled are left
+        as they are; returns whether the job was updated.
+        """
         
         job = db.query(TrainingJob).filter(TrainingJob.job_id == job_id).first()
         if not job:
             return False
+        if job.status in ["finished", "failed", "cancelled"]:
+            logger.info(f"Training job {job_id} is already {job.status}; update ignored")
+            return False
         
         if status is not None:
             job.status = status
         if progress is not None:
             job.progress = progress
-        if logs is not None:
-            job.logs = "\n".join(logs)
+        if logs:
+            training_log_store.append(job_id, logs)
         if error_message is not None:
             job.error_message = error_message
         if model_id is not None:
@@ -271,6 +570,8 @@ class TrainingJobPersistence:
         
         if status in ["finished", "failed"]:
             job.completed_at = datetime.utcnow()
+        if status in ["finished", "failed", "cancelled"]:
+            training_log_store.close(job_id)
         
         db.commit()
         
@@ -281,6 +582,23 @@ class TrainingJobPersistence:
         """Get training job from database."""
         return db.query(TrainingJob).filter(TrainingJob.job_id == job_id).first()
     
+    def find_reusable_job(self, db: Session, fingerprint: str) -> Optional[TrainingJob]:
+        """Find an in-flight or finished job with the same training inputs.
+        
+        Finished jobs only count while the model they produced still exists.
+        """
+        jobs = db.query(TrainingJob).filter(
+            TrainingJob.fingerprint == fingerprint,
+            TrainingJob.status.in_(["queued", "running", "finished"])
+        ).order_by(TrainingJob.created_at.desc()).all()
+        
+        for job in jobs:
+            if job.status != "finished":
+                return job
+            if job.model_id and db.query(Model).filter(Model.model_id == job.model_id).first():
+                return job
+        return None
+    
     def get_training_jobs(self, db: Session, skip: int = 0, limit: int = 100) -> List[TrainingJob]:
         """Get all training jobs from database."""
         return db.query(TrainingJob).offset(skip).limit(limit).all()
@@ -295,6 +613,7 @@ class TrainingJobPersistence:
         
         deleted_count = 0
         for job in old_jobs:
+            training_log_store.delete(job.job_id)
             db.delete(job)
             deleted_count += 1
         
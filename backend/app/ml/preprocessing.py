@@ -1,16 +1,182 @@
 """Data preprocessing utilities for ML operations."""
 
+import shutil
+import tempfile
+from itertools import islice
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from pathlib import Path
 import logging
 
 from ..core.logging import get_logger
+from ..core.config import settings
+from .columnar import columnar_store
+from .excel import data_sheets, excel_ingestor, header_names
+
+try:
+    import openpyxl
+except ImportError:  # .xlsx chunks then come from one pandas read
+    openpyxl = None
 
 logger = get_logger(__name__)
 
 
+def format_preview_rows(df: pd.DataFrame) -> List[List[str]]:
+    """Format rows as lists of strings, with missing values as ``""``."""
+    return df.astype(str).mask(df.isna(), "").values.tolist()
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hashes of whole rows.
+    
+    Numeric columns are hashed as float64, so a row hashes the same
+    whether its chunk parsed a column as integers or floats, and with
+    -0.0 folded into 0.0 as ``DataFrame.duplicated`` compares them.
+    """
+    numeric = df.select_dtypes(include=[np.number]).columns
+    if len(numeric):
+        df = df.astype({col: np.float64 for col in numeric})
+        df[numeric] = df[numeric] + 0.0
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class DuplicateCounter:
+    """Counts duplicate rows from row hashes in bounded memory.
+    
+    Hashes are deduplicated in an in-memory buffer of up to
+    ``max_hashes`` values. Once distinct hashes no longer fit, the buffer
+    is spilled to ``partitions`` temporary files by the top bits of each
+    hash, and every partition is deduplicated on its own at the end, so
+    memory stays at about ``max_hashes`` plus one partition.
+    """
+    
+    def __init__(self, max_hashes: Optional[int] = None, partitions: int = 64):
+        self.max_hashes = max_hashes or settings.duplicate_buffer_rows
+        self.partitions = partitions
+        self.rows = 0
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+        self._spill_dir: Optional[Path] = None
+    
+    def add(self, hashes: np.ndarray) -> None:
+        """Add a batch of row hashes."""
+        self.rows += len(hashes)
+        self._buffer.append(np.asarray(hashes, dtype=np.uint64))
+        self._buffered += len(hashes)
+        if self._buffered > self.max_hashes:
+            distinct = np.unique(np.concatenate(self._buffer))
+            self._buffer, self._buffered = [distinct], len(distinct)
+            # Spill once deduplication alone no longer frees enough room
+            if self._buffered > self.max_hashes // 2:
+                self._spill()
+    
+    def count(self) -> int:
+        """Number of rows whose hash was seen on an earlier row."""
+        buffered = np.unique(np.concatenate(self._buffer or [np.empty(0, dtype=np.uint64)]))
+        if self._spill_dir is None:
+            return self.rows - len(buffered)
+        
+        distinct = 0
+        buffered_partitions = self._partition_of(buffered)
+        for partition in range(self.partitions):
+            path = self._spill_dir / f"{partition}.bin"
+            spilled = np.fromfile(path, dtype=np.uint64) if path.exists() else np.empty(0, dtype=np.uint64)
+            distinct += len(np.unique(np.concatenate([spilled, buffered[buffered_partitions == partition]])))
+        return self.rows - distinct
+    
+    def close(self) -> None:
+        """Remove spilled partitions."""
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+    
+    def _partition_of(self, hashes: np.ndarray) -> np.ndarray:
+        return (hashes % np.uint64(self.partitions)).astype(np.int64)
+    
+    def _spill(self) -> None:
+        """Append the buffered hashes to their partition files."""
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="duplicates_"))
+        hashes = self._buffer[0]
+        partitions = self._partition_of(hashes)
+        for partition in np.unique(partitions):
+            with open(self._spill_dir / f"{partition}.bin", "ab") as f:
+                hashes[partitions == partition].tofile(f)
+        self._buffer, self._buffered = [], 0
+
+
+class StreamingValidation:
+    """Streaming version of ``DataPreprocessor.validate_dataset``.
+    
+    Chunks update exact missing counts, numeric min/max (a column is
+    constant when they are equal), memory usage and a ``DuplicateCounter``;
+    no chunk is kept after its update.
+    """
+    
+    def __init__(self):
+        self.rows = 0
+        self.column_types: Dict[str, str] = {}
+        self.numeric_columns: List[str] = []
+        self.missing: Dict[str, int] = {}
+        self.minimum: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+        self.memory_usage = 0
+        self.duplicates = DuplicateCounter()
+    
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        if not self.column_types:
+            self.missing = {col: 0 for col in chunk.columns}
+        self.column_types = chunk.dtypes.astype(str).to_dict()
+        
+        for col, n in chunk.isnull().sum().items():
+            self.missing[col] += int(n)
+        numeric = chunk.select_dtypes(include=[np.number])
+        self.numeric_columns = list(numeric.columns)
+        if len(numeric.columns):
+            for col, value in numeric.min().items():
+                if not pd.isna(value):
+                    self.minimum[col] = min(self.minimum.get(col, np.inf), float(value))
+            for col, value in numeric.max().items():
+                if not pd.isna(value):
+                    self.maximum[col] = max(self.maximum.get(col, -np.inf), float(value))
+        
+        self.memory_usage += int(chunk.memory_usage(deep=True, index=False).sum())
+        self.duplicates.add(hash_rows(chunk))
+        self.rows += len(chunk)
+    
+    def result(self) -> Dict[str, Any]:
+        """Validation info with the same keys as ``validate_dataset``."""
+        try:
+            duplicate_rows = self.duplicates.count()
+        finally:
+            self.duplicates.close()
+        
+        info = {
+            "rows": self.rows,
+            "columns": len(self.column_types),
+            "column_names": list(self.column_types),
+            "column_types": self.column_types,
+            "missing_values": self.missing,
+            "duplicate_rows": duplicate_rows,
+            "memory_usage": self.memory_usage
+        }
+        
+        empty_columns = [col for col, n in self.missing.items() if n == self.rows]
+        if empty_columns:
+            info["empty_columns"] = empty_columns
+        
+        # Numeric columns with at most one distinct value
+        constant_columns = [
+            col for col in self.numeric_columns
+            if self.minimum.get(col) == self.maximum.get(col)
+        ]
+        if constant_columns:
+            info["constant_columns"] = constant_columns
+        return info
+
+
 class DataPreprocessor:
     """Handles data preprocessing for ML operations."""
     
@@ -21,25 +187,278 @@ class DataPreprocessor:
         self.target_column = None
         self.is_fitted = False
     
-    def load_dataset(self, file_path: str) -> pd.DataFrame:
-        """Load dataset from file."""
+    def load_dataset(self,
+                     file_path: str,
+                     compact: bool = False,
+                     schema: Optional[Dict[str, str]] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load dataset from file.
+        
+        Datasets with a columnar copy (see ``ColumnarStore``) are read from
+        it instead of re-parsing the original file; ``columns`` then reads
+        only those columns. CSV/Excel files without one are parsed and, when
+        converted in full, get their columnar copy written for next time.
+        Excel workbooks are parsed in worker processes (see
+        ``ExcelIngestor``), stacking sheets that share the first sheet's
+        header.
+        
+        With ``schema`` (as returned by ``infer_compact_schema``) columns
+        are read straight into those dtypes. With ``compact`` the dtypes are
+        inferred from a sample first: low-cardinality strings are parsed as
+        ``category`` and numerics are downcast once the full file is read.
+        """
         try:
             file_path = Path(file_path)
+            suffix = file_path.suffix.lower()
             
-            if file_path.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
-            elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
-            else:
+            if suffix not in ['.csv', '.xlsx', '.xls']:
                 raise ValueError(f"Unsupported file format: {file_path.suffix}")
             
+            if columnar_store.enabled and columnar_store.exists(str(file_path)):
+                df = columnar_store.read(str(file_path), columns=columns)
+                if schema:
+                    df = self.compact_dtypes(df, schema)
+                elif compact:
+                    df = self.compact_dtypes(df)
+                logger.info(f"Loaded dataset with shape {df.shape} from columnar copy of {file_path}")
+                return df
+            
+            dtype = None
+            if schema:
+                dtype = schema
+            elif compact and suffix == '.csv':
+                sample = pd.read_csv(file_path, nrows=settings.dtype_inference_sample_rows, usecols=columns)
+                # Only string kinds are safe to fix from a sample; numeric
+                # widths depend on the full range
+                dtype = {
+                    col: "category"
+                    for col, col_type in self.infer_compact_schema(sample).items()
+                    if col_type == "category"
+                }
+            
+            if suffix == '.csv':
+                df = pd.read_csv(file_path, dtype=dtype, usecols=columns)
+                
+                # Backfill the columnar copy from a full, uncompacted parse
+                if columnar_store.enabled and columns is None and dtype is None:
+                    columnar_store.write(df, str(file_path))
+            else:
+                # Workbooks are always parsed whole, so the copy is always complete
+                df = excel_ingestor.read(str(file_path))
+                if columnar_store.enabled:
+                    columnar_store.write(df, str(file_path))
+                if columns is not None:
+                    df = df[columns]
+                if dtype:
+                    df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+            
+            if compact and not schema:
+                df = self.compact_dtypes(df)
+            
             logger.info(f"Loaded dataset with shape {df.shape} from {file_path}")
             return df
-            
+        
         except Exception as e:
             logger.error(f"Error loading dataset: {str(e)}")
             raise
     
+    def needs_chunked_load(self, file_path: str) -> bool:
+        """Whether a dataset file is too large to load in one piece."""
+        return Path(file_path).stat().st_size > settings.chunked_load_threshold
+    
+    def iter_chunks(self,
+                    file_path: str,
+                    chunk_rows: Optional[int] = None,
+                    schema: Optional[Dict[str, str]] = None,
+                    columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Read a dataset file as consecutive chunks of ``chunk_rows`` rows.
+        
+        Only one chunk is in memory at a time. Chunks come from the
+        columnar copy when there is one. Dtypes are fixed up front:
+        ``schema`` when given, otherwise inferred from the first
+        ``dtype_inference_sample_rows`` rows, with string columns pinned to
+        ``object`` so a later chunk of digits does not parse as numbers.
+        Numeric columns only ever widen: an integer column that meets a
+        missing value is float64 from that chunk on.
+        """
+        chunk_rows = chunk_rows or settings.load_chunk_rows
+        file_path = Path(file_path)
+        suffix = file_path.suffix.lower()
+        
+        if columnar_store.enabled and columnar_store.exists(str(file_path)):
+            total = columnar_store.get_manifest(str(file_path))["rows"]
+            reader = (
+                columnar_store.read(str(file_path), columns=columns, rows=slice(start, start + chunk_rows))
+                for start in range(0, max(total, 1), chunk_rows)
+            )
+        elif suffix == '.csv':
+            if schema is None:
+                sample = pd.read_csv(file_path, nrows=settings.dtype_inference_sample_rows, usecols=columns)
+                schema = {col: "object" for col in sample.columns if sample[col].dtype == object}
+            reader = pd.read_csv(file_path, chunksize=chunk_rows, dtype=schema, usecols=columns)
+        elif suffix == '.xlsx' and openpyxl is not None:
+            reader = self._iter_xlsx_chunks(file_path, chunk_rows, columns)
+        elif suffix in ['.xlsx', '.xls']:
+            df = pd.read_excel(file_path, usecols=columns)
+            reader = (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+        else:
+            raise ValueError(f"Unsupported file format: {file_path.suffix}")
+        
+        dtypes: Dict[str, Any] = {}
+        try:
+            for chunk in reader:
+                if schema:
+                    chunk = self.compact_dtypes(chunk, schema)
+                if not dtypes:
+                    dtypes = chunk.dtypes.to_dict()
+                widen = {}
+                for col, dtype in dtypes.items():
+                    # Categories may differ between chunks; values still compare
+                    if chunk[col].dtype == dtype or (isinstance(dtype, pd.CategoricalDtype)
+                                                     and isinstance(chunk[col].dtype, pd.CategoricalDtype)):
+                        continue
+                    if pd.api.types.is_numeric_dtype(dtype) and pd.api.types.is_numeric_dtype(chunk[col]):
+                        dtypes[col] = np.result_type(dtype, chunk[col].dtype)
+                        widen[col] = dtypes[col]
+                    else:
+                        widen[col] = object
+                        dtypes[col] = np.dtype(object)
+                yield chunk.astype(widen) if widen else chunk
+        finally:
+            if hasattr(reader, "close"):
+                reader.close()
+    
+    def _iter_xlsx_chunks(self,
+                          file_path: Path,
+                          chunk_rows: int,
+                          columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Stream the data sheets of an ``.xlsx`` file in read-only mode."""
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet in data_sheets(workbook):
+                rows = workbook.worksheets[sheet].iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    continue
+                names = header_names(header)
+                while True:
+                    batch = list(islice(rows, chunk_rows))
+                    if not batch:
+                        break
+                    chunk = pd.DataFrame(batch, columns=names).infer_objects()
+                    yield chunk[columns] if columns is not None else chunk
+        finally:
+            workbook.close()
+    
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """Validate a dataset from its chunks (see ``iter_chunks``).
+        
+        Returns the same information as ``validate_dataset`` in memory
+        bounded by the chunk size and ``DUPLICATE_BUFFER_ROWS``.
+        """
+        validation = StreamingValidation()
+        for chunk in chunks:
+            validation.update(chunk)
+        info = validation.result()
+        logger.info(f"Dataset validation completed: {info['rows']} rows, {info['columns']} columns")
+        return info
+    
+    def infer_compact_schema(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Infer the smallest safe dtype for each column.
+        
+        Integers are downcast to the narrowest width holding their range,
+        floats become float32 and strings with few distinct values become
+        ``category``.
+        """
+        schema = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_bool_dtype(series):
+                schema[col] = "bool"
+            elif pd.api.types.is_integer_dtype(series):
+                schema[col] = str(pd.to_numeric(series, downcast="integer").dtype)
+            elif pd.api.types.is_float_dtype(series):
+                schema[col] = "float32"
+            elif series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+                n_unique = series.nunique(dropna=True)
+                if (n_unique <= settings.category_max_unique
+                        and n_unique <= settings.category_max_ratio * max(len(series), 1)):
+                    schema[col] = "category"
+                else:
+                    schema[col] = "object"
+            else:
+                schema[col] = str(series.dtype)
+        return schema
+    
+    def compact_dtypes(self, df: pd.DataFrame, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Convert a DataFrame to compact dtypes."""
+        if schema is None:
+            schema = self.infer_compact_schema(df)
+        
+        conversions = {
+            col: col_type for col, col_type in schema.items()
+            if col in df.columns and str(df[col].dtype) != col_type
+        }
+        return df.astype(conversions) if conversions else df
+    
+    def merge_compact_schema(self, schema: Dict[str, str], df: pd.DataFrame) -> Dict[str, str]:
+        """Widen a compact schema so it also holds the values of ``df``.
+        
+        Integer widths are promoted to fit the new range, integers meeting
+        floats or missing values become float32, and columns whose kinds
+        no longer agree are left out for pandas to infer.
+        """
+        new_schema = self.infer_compact_schema(df)
+        merged = {}
+        for col, col_type in schema.items():
+            new_type = new_schema.get(col, col_type)
+            if new_type == col_type:
+                merged[col] = col_type
+            elif {col_type, new_type} <= {"category", "object"}:
+                merged[col] = "object" if "object" in (col_type, new_type) else "category"
+            elif pd.api.types.is_integer_dtype(col_type) and pd.api.types.is_integer_dtype(new_type):
+                merged[col] = str(np.promote_types(col_type, new_type))
+            elif (pd.api.types.is_numeric_dtype(col_type) and pd.api.types.is_numeric_dtype(new_type)
+                    and "bool" not in (col_type, new_type)):
+                merged[col] = "float32"
+        return merged
+    
+    def conform_to_schema(self, df: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+        """Check new rows against a dataset's columns and types.
+        
+        Columns must match by name (in any order) and values of numeric
+        columns must parse as numbers. Returns the rows in the dataset's
+        column order; raises ``ValueError`` describing the first mismatch.
+        """
+        missing = [col for col in column_types if col not in df.columns]
+        extra = [col for col in df.columns if col not in column_types]
+        if missing or extra:
+            raise ValueError(f"Columns do not match the dataset: missing {missing}, unexpected {extra}")
+        
+        df = df[list(column_types)].copy()
+        for col, col_type in column_types.items():
+            if col_type == "bool" or not pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(col_type)):
+                continue
+            values = pd.to_numeric(df[col], errors="coerce")
+            invalid = values.isna() & df[col].notna()
+            if invalid.any():
+                raise ValueError(
+                    f"Column '{col}' expects {col_type} values, got {df[col][invalid].iloc[0]!r}"
+                )
+            df[col] = values
+        return df
+    
+    def get_memory_report(self, df: pd.DataFrame, compact_df: pd.DataFrame) -> Dict[str, Any]:
+        """Compare the memory footprint of a DataFrame and its compact form."""
+        original = int(df.memory_usage(deep=True).sum())
+        compact = int(compact_df.memory_usage(deep=True).sum())
+        return {
+            "original_bytes": original,
+            "compact_bytes": compact,
+            "saved_bytes": original - compact,
+            "saved_ratio": round(1 - compact / original, 4) if original else 0.0
+        }
+    
     def validate_dataset(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Validate dataset and return information."""
         info = {
@@ -47,9 +466,9 @@ class DataPreprocessor:
             "columns": len(df.columns),
             "column_names": list(df.columns),
             "column_types": df.dtypes.astype(str).to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "duplicate_rows": df.duplicated().sum(),
-            "memory_usage": df.memory_usage(deep=True).sum(),
+            "missing_values": {col: int(n) for col, n in df.isnull().sum().items()},
+            "duplicate_rows": int(df.duplicated().sum()),
+            "memory_usage": int(df.memory_usage(deep=True).sum()),
         }
         
         # Check for completely empty columns
@@ -92,16 +511,30 @@ class DataPreprocessor:
         elif handle_missing == "fill":
             # Fill numeric columns with median, categorical with mode
             for col in df_clean.columns:
-                if df_clean[col].dtype in ['int64', 'float64']:
+                if pd.api.types.is_numeric_dtype(df_clean[col]):
                     df_clean[col].fillna(df_clean[col].median(), inplace=True)
                 else:
-                    df_clean[col].fillna(df_clean[col].mode()[0] if not df_clean[col].mode().empty else "Unknown", inplace=True)
+                    mode = df_clean[col].mode()
+                    fill_value = mode[0] if not mode.empty else "Unknown"
+                    if (isinstance(df_clean[col].dtype, pd.CategoricalDtype)
+                            and fill_value not in df_clean[col].cat.categories):
+                        df_clean[col] = df_clean[col].cat.add_categories([fill_value])
+                    df_clean[col].fillna(fill_value, inplace=True)
             logger.info("Filled missing values")
         
         return df_clean
     
-    def prepare_features(self, df: pd.DataFrame, target_column: Optional[str] = None) -> Tuple[pd.DataFrame, pd.Series]:
-        """Prepare features and target for ML."""
+    def prepare_features(self,
+                         df: pd.DataFrame,
+                         target_column: Optional[str] = None,
+                         dtype: Optional[str] = None,
+                         encode_categoricals: bool = True) -> Tuple[pd.DataFrame, pd.Series]:
+        """Prepare features and target for ML.
+        
+        ``dtype`` (e.g. ``"float32"``) sets the dtype of the numeric
+        features. With ``encode_categoricals=False`` categorical columns are
+        left as they are for a ``FeatureEncoder`` fitted during training.
+        """
         df_features = df.copy()
         
         if target_column and target_column in df_features.columns:
@@ -116,37 +549,30 @@ class DataPreprocessor:
         # Handle categorical variables
         categorical_columns = df_features.select_dtypes(include=['object', 'category']).columns
         
-        for col in categorical_columns:
-            # Simple label encoding for now
-            df_features[col] = pd.Categorical(df_features[col]).codes
+        if encode_categoricals:
+            for col in categorical_columns:
+                # Simple label encoding for now
+                df_features[col] = pd.Categorical(df_features[col]).codes
+            
+            # Handle any remaining non-numeric columns
+            for col in df_features.columns:
+                if df_features[col].dtype == 'object':
+                    df_features[col] = pd.to_numeric(df_features[col], errors='coerce')
         
-        # Handle any remaining non-numeric columns
-        for col in df_features.columns:
-            if df_features[col].dtype == 'object':
-                df_features[col] = pd.to_numeric(df_features[col], errors='coerce')
+        numeric_columns = [col for col in df_features.columns if col not in categorical_columns or encode_categoricals]
         
         # Fill any NaN values that might have been created
-        df_features = df_features.fillna(0)
+        df_features[numeric_columns] = df_features[numeric_columns].fillna(0)
+        
+        if dtype is not None:
+            df_features = df_features.astype({col: dtype for col in numeric_columns})
         
         logger.info(f"Prepared {len(self.feature_columns)} features for ML")
         return df_features, y
     
     def get_dataset_preview(self, df: pd.DataFrame, n_rows: int = 10) -> List[List[str]]:
         """Get a preview of the dataset."""
-        preview_df = df.head(n_rows)
-        
-        # Convert all values to strings and handle NaN
-        preview_data = []
-        for _, row in preview_df.iterrows():
-            row_data = []
-            for value in row:
-                if pd.isna(value):
-                    row_data.append("")
-                else:
-                    row_data.append(str(value))
-            preview_data.append(row_data)
-        
-        return preview_data
+        return format_preview_rows(df.head(n_rows))
     
     def get_feature_info(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Get detailed feature information."""
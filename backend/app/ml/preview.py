@@ -0,0 +1,93 @@
+"""Dataset previews from the head of a file or a streamed random sample."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .columnar import columnar_store
+from .preprocessing import DataPreprocessor, format_preview_rows
+
+logger = get_logger(__name__)
+
+
+class DatasetPreviewer:
+    """Reads preview rows without loading whole datasets.
+    
+    ``head`` parses only the first rows of a file (``nrows`` for CSV, a
+    read-only openpyxl stream for ``.xlsx``). ``sample`` draws a uniform
+    random sample by reservoir sampling in one pass over row chunks,
+    keeping only the formatted sample in memory. Datasets with a columnar
+    copy read just the requested rows from it.
+    """
+    
+    def __init__(self, chunk_rows: Optional[int] = None):
+        self.chunk_rows = chunk_rows or settings.preview_chunk_rows
+        self.preprocessor = DataPreprocessor()
+    
+    def head(self, file_path: str, n_rows: int = 10) -> Dict[str, Any]:
+        """Preview the first ``n_rows`` rows."""
+        if columnar_store.enabled and columnar_store.exists(file_path):
+            total = columnar_store.get_manifest(file_path)["rows"]
+            df = columnar_store.read(file_path, rows=slice(0, min(n_rows, total)))
+        else:
+            # One chunk needs no dtype inference across chunks
+            chunks = self.preprocessor.iter_chunks(file_path, n_rows, schema={})
+            df = next(chunks, pd.DataFrame())
+            chunks.close()
+        
+        return {
+            "columns": [str(col) for col in df.columns],
+            "rows": format_preview_rows(df),
+            "row_numbers": list(range(len(df)))
+        }
+    
+    def sample(self, file_path: str, n_rows: int = 10, random_state: Optional[int] = None) -> Dict[str, Any]:
+        """Preview a uniform random sample of ``n_rows`` rows, in file order."""
+        rng = np.random.default_rng(random_state)
+        
+        if columnar_store.enabled and columnar_store.exists(file_path):
+            total = columnar_store.get_manifest(file_path)["rows"]
+            positions = np.sort(rng.choice(total, size=min(n_rows, total), replace=False))
+            df = columnar_store.read(file_path, rows=positions)
+            return {
+                "columns": [str(col) for col in df.columns],
+                "rows": format_preview_rows(df),
+                "row_numbers": positions.tolist()
+            }
+        
+        columns: List[str] = []
+        reservoir = None
+        positions = np.zeros(n_rows, dtype=np.int64)
+        seen = 0
+        
+        for chunk in self.preprocessor.iter_chunks(file_path, self.chunk_rows):
+            if reservoir is None:
+                columns = [str(col) for col in chunk.columns]
+                reservoir = np.empty((n_rows, len(columns)), dtype=object)
+            
+            # Algorithm R, one chunk at a time: row i takes slot j ~ U[0, i]
+            # when j falls inside the reservoir
+            index = np.arange(seen, seen + len(chunk))
+            slots = np.where(index < n_rows, index, rng.integers(0, index + 1))
+            picked = np.flatnonzero(slots < n_rows)
+            
+            # Later rows overwrite earlier ones drawn for the same slot
+            slots, last = np.unique(slots[picked][::-1], return_index=True)
+            picked = picked[::-1][last]
+            if len(picked):
+                reservoir[slots] = format_preview_rows(chunk.iloc[picked])
+                positions[slots] = index[picked]
+            seen += len(chunk)
+        
+        filled = min(n_rows, seen)
+        order = np.argsort(positions[:filled], kind="stable")
+        logger.info(f"Sampled {filled} of {seen} rows from {Path(file_path).name}")
+        return {
+            "columns": columns,
+            "rows": reservoir[:filled][order].tolist() if reservoir is not None else [],
+            "row_numbers": positions[:filled][order].tolist()
+        }
@@ -0,0 +1,433 @@
+"""One-pass dataset profiling with mergeable sketches."""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .preprocessing import DuplicateCounter, StreamingValidation, hash_rows
+
+logger = get_logger(__name__)
+
+# Quantiles reported for numeric columns
+PROFILE_QUANTILES = {"p1": 0.01, "p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95, "p99": 0.99}
+
+# Most frequent values reported for other columns, and counts kept to find them
+TOP_VALUES = 10
+TOP_VALUES_CAPACITY = 1000
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """64-bit hashes of a column's values, consistent across chunks."""
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def _value_counts(series: pd.Series) -> pd.Series:
+    """Counts of the present values of a column, keyed by their string form."""
+    counts = series.value_counts(sort=False)
+    counts = counts[counts > 0]
+    return counts.groupby(counts.index.astype(str), sort=False).sum()
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """Count leading zero bits of uint64 values, ignoring the low 11 bits.
+    
+    The top 53 bits convert to float64 exactly, so ``frexp`` gives their
+    bit length; values with only low bits set count as 64 zeros.
+    """
+    _, bit_length = np.frexp((x >> np.uint64(11)).astype(np.float64))
+    return np.where(bit_length > 0, 53 - bit_length, 64)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-value counter over 64-bit hashes.
+    
+    Uses ``2 ** precision`` one-byte registers, for a relative standard
+    error of about ``1.04 / sqrt(2 ** precision)`` (0.8% at the default
+    precision of 14, in 16KB). Small cardinalities use linear counting,
+    which is close to exact.
+    """
+    
+    def __init__(self, precision: Optional[int] = None):
+        self.precision = precision or settings.profile_hll_precision
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+    
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add a batch of hashed values."""
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rank = np.minimum(_leading_zeros(hashes << p) + 1, 64 - self.precision + 1)
+        
+        # Highest rank per register from a table of the ranks seen
+        seen = np.zeros((len(self.registers), 64), dtype=bool)
+        seen[index, rank] = True
+        highest = 63 - np.argmax(seen[:, ::-1], axis=1)
+        np.maximum(self.registers, np.where(seen.any(axis=1), highest, 0).astype(np.uint8), out=self.registers)
+    
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another counter of the same precision."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+    
+    def estimate(self) -> int:
+        """Estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch built from a stack of compactors.
+    
+    Level ``h`` holds items of weight ``2 ** h``. When a level exceeds
+    ``size`` items it is sorted and every other item, from a random
+    offset, is promoted to the next level. Memory stays at roughly
+    ``size * log2(n / size)`` items and rank error around ``1 / size``.
+    """
+    
+    def __init__(self, size: Optional[int] = None, random_state: int = 42):
+        self.size = size or settings.profile_quantile_size
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(random_state)
+    
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values, ignoring NaN."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+    
+    def merge(self, other: "QuantileSketch") -> None:
+        """Merge another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compact()
+    
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """Approximate values at the given quantiles."""
+        if self.count == 0:
+            return [None] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="mergesort")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return items[positions].tolist()
+    
+    def _compact(self) -> None:
+        """Halve every level that is over capacity, promoting half upward."""
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.size:
+                items = np.sort(items)
+                # An odd item out stays at this level
+                paired = len(items) - len(items) % 2
+                offset = int(self._rng.integers(2))
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset:paired:2]])
+                self.levels[h] = items[paired:]
+            h += 1
+
+
+class ColumnProfile:
+    """Running statistics of one column."""
+    
+    def __init__(self, numeric: bool):
+        self.numeric = numeric
+        self.missing = 0
+        self.distinct = HyperLogLog()
+        self.quantiles = QuantileSketch() if numeric else None
+        self.top_values: Optional[pd.Series] = None if numeric else pd.Series(dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    def update(self, series: pd.Series) -> None:
+        """Add a chunk of the column."""
+        present = series.dropna()
+        self.missing += len(series) - len(present)
+        self.distinct.add_hashes(hash_values(present))
+        if not self.numeric:
+            # Counts beyond the capacity are dropped, so top values of very
+            # high-cardinality columns are approximate
+            counts = _value_counts(present)
+            self.top_values = self.top_values.add(counts, fill_value=0).astype(np.int64)
+            if len(self.top_values) > TOP_VALUES_CAPACITY:
+                self.top_values = self.top_values.nlargest(TOP_VALUES_CAPACITY)
+            return
+        
+        values = pd.to_numeric(present, errors="coerce").dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.quantiles.update(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        
+        # Merge the chunk's moments into the running ones
+        n = len(values)
+        chunk_mean = float(values.mean())
+        total = self.n + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += float(np.sum((values - chunk_mean) ** 2)) + delta ** 2 * self.n * n / total
+        self.n = total
+    
+    def result(self) -> Dict[str, Any]:
+        """Summary statistics of the column."""
+        stats: Dict[str, Any] = {"distinct": self.distinct.estimate(), "missing": self.missing}
+        if not self.numeric:
+            top = self.top_values.sort_values(ascending=False, kind="stable").head(TOP_VALUES)
+            stats["top_values"] = {str(k): int(v) for k, v in top.items()}
+        elif self.n:
+            stats.update({
+                "min": self.min,
+                "max": self.max,
+                "mean": self.mean,
+                "std": float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else 0.0,
+                "quantiles": dict(zip(PROFILE_QUANTILES, self.quantiles.quantiles(list(PROFILE_QUANTILES.values()))))
+            })
+        return stats
+
+
+class DatasetProfiler:
+    """Profiles a dataset in one pass over row chunks.
+    
+    Distinct counts come from HyperLogLog, quantiles from a KLL-style
+    sketch and duplicate rows from 64-bit row hashes (see
+    ``DuplicateCounter``), so the work per chunk is linear and the state
+    per column is fixed. Missing
+    counts, min/max and moments are exact. ``exact=True`` computes
+    everything with pandas on the full frame instead, for when exact
+    distinct counts and quantiles are worth the time.
+    
+    The result holds the same keys as ``DataPreprocessor.validate_dataset``
+    plus per-column ``column_stats``.
+    """
+    
+    def __init__(self, exact: bool = False, chunk_rows: Optional[int] = None):
+        self.exact = exact
+        self.chunk_rows = chunk_rows or settings.profile_chunk_rows
+    
+    def profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Profile a DataFrame."""
+        numeric_columns = set(df.select_dtypes(include=[np.number]).columns)
+        column_stats = self._exact_stats(df, numeric_columns) if self.exact else self._sketch_stats(df, numeric_columns)
+        
+        info = {
+            "rows": len(df),
+            "columns": len(df.columns),
+            "column_names": list(df.columns),
+            "column_types": df.dtypes.astype(str).to_dict(),
+            "missing_values": {col: stats["missing"] for col, stats in column_stats.items()},
+            "duplicate_rows": self._duplicate_rows(df),
+            "memory_usage": self._memory_usage(df),
+            "column_stats": column_stats,
+            "profile_mode": "exact" if self.exact else "approximate"
+        }
+        
+        empty_columns = [col for col, stats in column_stats.items() if stats["missing"] == len(df)]
+        if empty_columns:
+            info["empty_columns"] = empty_columns
+        constant_columns = [
+            col for col in df.columns
+            if col in numeric_columns and column_stats[col]["distinct"] <= 1
+        ]
+        if constant_columns:
+            info["constant_columns"] = constant_columns
+        
+        logger.info(f"Dataset profiled ({info['profile_mode']}): {info['rows']} rows, {info['columns']} columns")
+        return info
+    
+    def profile_chunks(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """Profile a dataset streamed as chunks (see ``DataPreprocessor.iter_chunks``).
+        
+        Memory stays bounded by the chunk size whatever the dataset size.
+        Validation keys come from ``StreamingValidation`` and are exact;
+        distinct counts, quantiles and top values are always sketched, as
+        exact ones would need the whole frame.
+        """
+        validation = StreamingValidation()
+        profiles: Dict[str, ColumnProfile] = {}
+        for chunk in chunks:
+            if not profiles:
+                numeric_columns = set(chunk.select_dtypes(include=[np.number]).columns)
+                profiles = {col: ColumnProfile(col in numeric_columns) for col in chunk.columns}
+            validation.update(chunk)
+            for col, profile in profiles.items():
+                profile.update(chunk[col])
+        
+        info = validation.result()
+        info["column_stats"] = {col: profile.result() for col, profile in profiles.items()}
+        info["profile_mode"] = "approximate"
+        logger.info(f"Dataset profiled in chunks: {info['rows']} rows, {info['columns']} columns")
+        return info
+    
+    def _chunks(self, df: pd.DataFrame):
+        for start in range(0, len(df), self.chunk_rows):
+            yield df.iloc[start:start + self.chunk_rows]
+    
+    def _sketch_stats(self, df: pd.DataFrame, numeric_columns: set) -> Dict[str, Dict[str, Any]]:
+        profiles = {col: ColumnProfile(col in numeric_columns) for col in df.columns}
+        for chunk in self._chunks(df):
+            for col, profile in profiles.items():
+                profile.update(chunk[col])
+        return {col: profile.result() for col, profile in profiles.items()}
+    
+    def _exact_stats(self, df: pd.DataFrame, numeric_columns: set) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for col in df.columns:
+            series = df[col]
+            column = {"distinct": int(series.nunique(dropna=True)), "missing": int(series.isna().sum())}
+            present = series.dropna()
+            if col not in numeric_columns:
+                top = _value_counts(present).sort_values(ascending=False, kind="stable").head(TOP_VALUES)
+                column["top_values"] = {str(k): int(v) for k, v in top.items()}
+            if col in numeric_columns and len(present):
+                values = present.to_numpy(dtype=np.float64)
+                column.update({
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "mean": float(values.mean()),
+                    "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                    "quantiles": dict(zip(
+                        PROFILE_QUANTILES,
+                        np.quantile(values, list(PROFILE_QUANTILES.values()), method="inverted_cdf").tolist()
+                    ))
+                })
+            stats[col] = column
+        return stats
+    
+    def _duplicate_rows(self, df: pd.DataFrame) -> int:
+        if self.exact:
+            return int(df.duplicated().sum())
+        # Rows sharing a 64-bit hash are treated as duplicates
+        counter = DuplicateCounter()
+        try:
+            for chunk in self._chunks(df):
+                counter.add(hash_rows(chunk))
+            return counter.count()
+        finally:
+            counter.close()
+    
+    def _memory_usage(self, df: pd.DataFrame) -> int:
+        if self.exact or len(df) <= self.chunk_rows:
+            return int(df.memory_usage(deep=True).sum())
+        # Measure string columns deeply on the first chunk and scale up
+        shallow = df.memory_usage(deep=False, index=True)
+        sample = df.iloc[:self.chunk_rows].memory_usage(deep=True, index=False)
+        object_columns = [col for col in df.columns if df[col].dtype == object]
+        estimate = shallow.sum() - shallow[object_columns].sum()
+        estimate += sample[object_columns].sum() * len(df) / self.chunk_rows
+        return int(estimate)
+
+
+# Profile keys that depend on rows a profile does not keep
+NON_MERGEABLE_STATS = ("duplicate_rows", "column_stats", "constant_columns", "memory_report")
+
+
+def merge_moments(left: Dict[str, Any], left_count: int,
+                  right: Dict[str, Any], right_count: int) -> Dict[str, Any]:
+    """Merge min, max, mean and sample std summarizing two sets of values."""
+    if not left_count or left.get("mean") is None:
+        return {**left, **right}
+    if not right_count or right.get("mean") is None:
+        return dict(left)
+    total = left_count + right_count
+    delta = right["mean"] - left["mean"]
+    m2 = ((left.get("std") or 0.0) ** 2 * (left_count - 1)
+          + (right.get("std") or 0.0) ** 2 * (right_count - 1)
+          + delta ** 2 * left_count * right_count / total)
+    return {
+        **left,
+        "min": min(left["min"], right["min"]),
+        "max": max(left["max"], right["max"]),
+        "mean": left["mean"] + delta * right_count / total,
+        "std": float(np.sqrt(m2 / (total - 1)))
+    }
+
+
+def summarize_values(series: pd.Series) -> Tuple[Dict[str, Any], int]:
+    """Min, max, mean and sample std of a column's present values, and their count."""
+    values = pd.to_numeric(series, errors="coerce").dropna()
+    if len(values) == 0:
+        return {"min": None, "max": None, "mean": None, "std": None}, 0
+    return {
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "std": float(values.std()) if len(values) > 1 else 0.0
+    }, len(values)
+
+
+def merge_column_types(column_types: Dict[str, str], df: pd.DataFrame) -> Dict[str, str]:
+    """Column types after appending ``df``: numeric columns widen as needed."""
+    merged = dict(column_types)
+    for col, col_type in column_types.items():
+        new_type = df[col].dtype
+        if (col_type != str(new_type) and col_type != "bool" and pd.api.types.is_numeric_dtype(new_type)
+                and pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(col_type))):
+            merged[col] = str(np.promote_types(col_type, new_type))
+    return merged
+
+
+def merge_appended_rows(profile: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    """Update a dataset profile for rows appended to the dataset.
+    
+    Row and missing counts, memory usage, empty columns and numeric
+    min/max/mean/std are merged exactly. Duplicates, distinct counts,
+    quantiles and top values depend on rows the profile does not keep, so
+    those keys are listed under ``stale_stats`` until the next profiling
+    run recomputes them.
+    """
+    profile = dict(profile)
+    old_rows = profile.get("rows", 0)
+    rows = old_rows + len(df)
+    missing = df.isnull().sum()
+    old_missing = profile.get("missing_values", {})
+    
+    profile["rows"] = rows
+    if "column_types" in profile:
+        profile["column_types"] = merge_column_types(profile["column_types"], df)
+    if "missing_values" in profile:
+        profile["missing_values"] = {col: int(n + missing.get(col, 0)) for col, n in old_missing.items()}
+        empty_columns = [col for col, n in profile["missing_values"].items() if n == rows]
+        profile.pop("empty_columns", None)
+        if empty_columns:
+            profile["empty_columns"] = empty_columns
+    if "memory_usage" in profile:
+        profile["memory_usage"] += int(df.memory_usage(deep=True, index=False).sum())
+    
+    if "column_stats" in profile:
+        numeric_columns = set(df.select_dtypes(include=[np.number]).columns)
+        column_stats = {}
+        for col, stats in profile["column_stats"].items():
+            stats = dict(stats, missing=int(stats["missing"] + missing.get(col, 0)))
+            if "top_values" not in stats and col in numeric_columns:
+                stats = merge_moments(stats, old_rows - old_missing.get(col, 0), *summarize_values(df[col]))
+            column_stats[col] = stats
+        profile["column_stats"] = column_stats
+    
+    stale = set(profile.get("stale_stats", []))
+    stale.update(key for key in NON_MERGEABLE_STATS if key in profile)
+    profile["stale_stats"] = sorted(stale)
+    return profile
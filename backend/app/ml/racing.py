@@ -0,0 +1,336 @@
+"""Time-budgeted algorithm selection by racing on growing subsamples."""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import accuracy_score
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .encoding import FeatureEncoder
+
+logger = get_logger(__name__)
+
+
+def stratified_order(y: pd.Series, random_state: int = 42) -> np.ndarray:
+    """Order rows so that every prefix is an approximately stratified sample.
+    
+    Rows of each class are shuffled and spread evenly over the unit
+    interval; sorting by that position interleaves the classes in
+    proportion to their frequency. Prefixes of the order are nested, so
+    growing subsamples reuse the rows of smaller ones.
+    """
+    rng = np.random.default_rng(random_state)
+    codes = pd.factorize(np.asarray(y))[0]
+    position = np.empty(len(codes), dtype=np.float64)
+    
+    for code in np.unique(codes):
+        idx = rng.permutation(np.flatnonzero(codes == code))
+        position[idx] = (np.arange(len(idx)) + rng.random()) / len(idx)
+    
+    return np.argsort(position, kind="stable")
+
+
+@dataclass
+class RaceCandidate:
+    """Observed learning and timing curve of one algorithm."""
+    algorithm: str
+    rows: List[int] = field(default_factory=list)
+    scores: List[float] = field(default_factory=list)
+    seconds: List[float] = field(default_factory=list)
+    eliminated: Optional[str] = None
+    
+    def predict_score(self, n_rows: int) -> float:
+        """Extrapolate accuracy to ``n_rows`` with a power-law error curve."""
+        if not self.scores:
+            return 0.0
+        errors = np.maximum(1.0 - np.asarray(self.scores), 1e-6)
+        if len(errors) < 2:
+            return self.scores[-1]
+        
+        # log(error) is linear in log(rows); clamp to a non-increasing curve
+        slope = np.polyfit(np.log(self.rows), np.log(errors), 1)[0]
+        slope = float(np.clip(slope, -1.0, 0.0))
+        error = errors[-1] * (n_rows / self.rows[-1]) ** slope
+        return float(1.0 - error)
+    
+    def time_exponent(self, default: float = 1.0) -> float:
+        """Estimate how fit time scales with rows from the last two fits."""
+        if len(self.rows) < 2 or self.seconds[-2] <= 0:
+            return default
+        exponent = math.log(self.seconds[-1] / self.seconds[-2]) / math.log(self.rows[-1] / self.rows[-2])
+        # Small fits are overhead-dominated, so never assume sublinear growth
+        return float(np.clip(exponent, default, 2.5))
+    
+    def predict_seconds(self, n_rows: int, default_exponent: float = 1.0) -> float:
+        """Extrapolate fit time to ``n_rows``."""
+        if not self.seconds:
+            return 0.0
+        exponent = self.time_exponent(default_exponent)
+        return self.seconds[-1] * (n_rows / self.rows[-1]) ** exponent
+    
+    def rows_within(self, seconds: float, default_exponent: float = 1.0) -> int:
+        """Largest number of rows predicted to fit in ``seconds``."""
+        if not self.seconds or self.seconds[-1] <= 0:
+            return self.rows[-1] if self.rows else 0
+        exponent = self.time_exponent(default_exponent)
+        return int(self.rows[-1] * (seconds / self.seconds[-1]) ** (1.0 / exponent))
+    
+    def to_dict(self, n_rows: int) -> Dict[str, Any]:
+        """Summarize the candidate for logs and events."""
+        return {
+            "algorithm": self.algorithm,
+            "rows": self.rows,
+            "scores": [round(s, 4) for s in self.scores],
+            "seconds": [round(s, 4) for s in self.seconds],
+            "predicted_score": round(self.predict_score(n_rows), 4),
+            "eliminated": self.eliminated
+        }
+
+
+class AlgorithmRace:
+    """Races ``MLTrainer`` algorithms against a wall-clock deadline.
+    
+    Surviving algorithms are fitted on nested stratified subsamples that
+    grow geometrically and are scored on a fixed validation split. After
+    each round, learning curves are extrapolated to the full training size
+    and algorithms that are clearly behind are dropped. Racing stops when
+    one algorithm is left, the full size is reached, or the time left is
+    needed for the final fit of the leader, which is then trained on as
+    many rows as the remaining budget allows.
+    """
+    
+    # Headroom for evaluation and saving on top of the predicted fit time
+    safety_factor = 1.5
+    
+    def __init__(self,
+                 trainer: Any,
+                 initial_rows: Optional[int] = None,
+                 growth_factor: Optional[float] = None,
+                 margin: Optional[float] = None,
+                 validation_size: Optional[float] = None):
+        self.trainer = trainer
+        self.initial_rows = initial_rows or settings.race_initial_rows
+        self.growth_factor = max(growth_factor or settings.race_growth_factor, 1.5)
+        self.margin = margin if margin is not None else settings.race_elimination_margin
+        self.validation_size = validation_size or settings.race_validation_size
+    
+    def run(self,
+            X: pd.DataFrame,
+            y: pd.Series,
+            deadline: float,
+            test_size: float = 0.2,
+            random_state: int = 42,
+            n_jobs: Optional[int] = None,
+            progress_callback: Optional[Callable[..., None]] = None,
+            svm_mode: str = "auto",
+            encoding: Optional[str] = None) -> Dict[str, Any]:
+        """Race all algorithms and pick a winner.
+        
+        ``deadline`` is a ``time.time()`` timestamp by which the final fit
+        must be done. Racing only uses the training part of the split that
+        ``train_model`` will make with the same ``test_size`` and
+        ``random_state``, so the reported test metrics stay unbiased.
+        Returns the winning algorithm, the number of rows of ``X`` to train
+        it on, and the per-algorithm learning curves. When that is fewer
+        than all rows, ``select_rows`` gives the rows to train on and the
+        held-out rows to test on.
+        """
+        emit = progress_callback or (lambda *args, **kwargs: None)
+        
+        # Same split as train_model's; only positions are kept
+        train_positions, test_positions = train_test_split(
+            np.arange(len(X)), test_size=test_size, random_state=random_state, stratify=y
+        )
+        X_train, y_train = X.iloc[train_positions], y.iloc[train_positions]
+        final_rows = len(X_train)
+        
+        X_pool, X_val, y_pool, y_val = train_test_split(
+            X_train, y_train,
+            test_size=self.validation_size,
+            random_state=random_state,
+            stratify=y_train
+        )
+        
+        # One encoding fitted on the pool serves every round
+        encoder = FeatureEncoder(strategy=encoding, random_state=random_state)
+        X_pool_encoded = encoder.fit_transform(X_pool, y_pool)
+        X_val = encoder.transform(X_val)
+        
+        label_encoder = LabelEncoder().fit(y)
+        y_pool = label_encoder.transform(y_pool)
+        y_val = label_encoder.transform(y_val)
+        order = stratified_order(y_pool, random_state)
+        X_pool = X_pool_encoded[order]
+        y_pool = y_pool[order]
+        
+        approximate_svm = self.trainer._use_svm_approximation(svm_mode, final_rows)
+        candidates = [RaceCandidate(algorithm) for algorithm in self.trainer.get_available_algorithms()]
+        
+        rows = min(self.initial_rows, len(y_pool))
+        round_number = 0
+        while True:
+            round_number += 1
+            survivors = [c for c in candidates if c.eliminated is None]
+            leader = self._leader(survivors, final_rows)
+            
+            for candidate in sorted(survivors, key=lambda c: c.predict_seconds(rows)):
+                # Keep enough time to train the current leader on everything
+                reserve = self._final_fit_seconds(leader, final_rows, approximate_svm) if leader else 0.0
+                predicted = candidate.predict_seconds(rows, self._default_exponent(candidate.algorithm, approximate_svm))
+                if time.time() + predicted * self.safety_factor + reserve > deadline:
+                    if not candidate.rows:
+                        candidate.eliminated = "out of time"
+                    continue
+                
+                try:
+                    score, seconds = self._fit_and_score(
+                        candidate.algorithm, X_pool[:rows], y_pool[:rows], X_val, y_val,
+                        random_state, n_jobs, approximate_svm
+                    )
+                except Exception as e:
+                    logger.warning(f"Race fit of {candidate.algorithm} on {rows} rows failed: {str(e)}")
+                    candidate.eliminated = "failed"
+                    continue
+                
+                candidate.rows.append(rows)
+                candidate.scores.append(score)
+                candidate.seconds.append(seconds)
+                emit("race", round=round_number, algorithm=candidate.algorithm,
+                     rows=rows, score=round(score, 4), seconds=round(seconds, 4))
+            
+            self._eliminate(candidates, final_rows)
+            survivors = [c for c in candidates if c.eliminated is None]
+            round_rows = [c for c in survivors if c.rows and c.rows[-1] == rows]
+            if not round_rows:
+                # Nothing fitted in time this round
+                break
+            emit("race_round", round=round_number, rows=rows,
+                 survivors=[c.algorithm for c in survivors])
+            
+            if len(survivors) <= 1 or rows >= len(y_pool):
+                break
+            rows = min(int(rows * self.growth_factor), len(y_pool))
+        
+        leader = self._leader([c for c in candidates if c.eliminated is None], final_rows)
+        if leader is None:
+            raise ValueError("No algorithm could be fitted within the time budget")
+        
+        # Shrink the final fit if the leader would not finish in time
+        remaining = deadline - time.time()
+        train_rows = final_rows
+        if self._final_fit_seconds(leader, final_rows, approximate_svm) > remaining:
+            exponent = self._default_exponent(leader.algorithm, approximate_svm)
+            train_rows = max(leader.rows[-1], min(final_rows, leader.rows_within(remaining / self.safety_factor, exponent)))
+        
+        for candidate in candidates:
+            if candidate is not leader and candidate.eliminated is None:
+                candidate.eliminated = "lost"
+        
+        leaderboard = sorted(
+            (c.to_dict(final_rows) for c in candidates),
+            key=lambda c: c["predicted_score"],
+            reverse=True
+        )
+        # A shrunk final fit keeps the whole held-out test set
+        train_index = np.sort(train_positions[stratified_order(y_train, random_state)[:train_rows]])
+        total_rows = len(train_index) + len(test_positions)
+        emit("race_winner", algorithm=leader.algorithm, rows=total_rows,
+             predicted_score=round(leader.predict_score(train_rows), 4))
+        
+        logger.info(f"Race won by {leader.algorithm} on {leader.rows[-1]} rows; "
+                    f"training on {total_rows} of {len(X)} rows")
+        return {
+            "algorithm": leader.algorithm,
+            "rows": total_rows,
+            "train_index": train_index,
+            "test_index": np.sort(test_positions),
+            "leaderboard": leaderboard
+        }
+    
+    def select_rows(self,
+                    X: pd.DataFrame,
+                    y: pd.Series,
+                    race: Dict[str, Any]) -> Tuple[pd.DataFrame, pd.Series, np.ndarray]:
+        """Rows of a race's shrunk final fit and the positions of its test rows.
+        
+        The training rows are a stratified subsample of the race's training
+        part and the test rows are its whole held-out part, which racing
+        never saw. Pass the positions as ``train_model(test_index=...)``;
+        re-splitting the subsample at random would mix rows used to pick
+        the winner into the test set.
+        """
+        rows = np.concatenate([race["train_index"], race["test_index"]])
+        test_index = np.arange(len(race["train_index"]), len(rows))
+        return X.iloc[rows], y.iloc[rows], test_index
+    
+    def _fit_and_score(self,
+                       algorithm: str,
+                       X: sparse.csr_matrix,
+                       y: np.ndarray,
+                       X_val: sparse.csr_matrix,
+                       y_val: np.ndarray,
+                       random_state: int,
+                       n_jobs: Optional[int],
+                       approximate_svm: bool) -> Tuple[float, float]:
+        """Fit one algorithm on a subsample; return validation accuracy and seconds.
+        
+        Sparse or dense input is chosen the same way ``train_model`` does.
+        """
+        params = self.trainer.get_algorithm_params(algorithm)
+        if n_jobs is not None:
+            params = self.trainer._apply_core_budget(self.trainer.models[algorithm], params, n_jobs)
+        
+        start = time.perf_counter()
+        use_sparse = self.trainer._use_sparse(X, algorithm)
+        if not use_sparse:
+            X, X_val = X.toarray(), X_val.toarray()
+        scaler = self.trainer._make_scaler(use_sparse)
+        X_scaled = scaler.fit_transform(X)
+        if algorithm == "svm" and approximate_svm:
+            model = self.trainer._fit_approximate_svm(X_scaled, y, params, random_state)
+        else:
+            model = self.trainer.models[algorithm](**params)
+            model.fit(X_scaled, y)
+        seconds = time.perf_counter() - start
+        
+        score = accuracy_score(y_val, model.predict(scaler.transform(X_val)))
+        return float(score), seconds
+    
+    def _eliminate(self, candidates: List[RaceCandidate], final_rows: int) -> None:
+        """Drop candidates whose extrapolated score is clearly behind."""
+        survivors = [c for c in candidates if c.eliminated is None and c.rows]
+        if len(survivors) < 2:
+            return
+        
+        best = max(c.predict_score(final_rows) for c in survivors)
+        for candidate in survivors:
+            # Compare optimistic extrapolations so noisy small fits survive
+            if candidate.predict_score(final_rows) + self.margin < best:
+                candidate.eliminated = "behind"
+    
+    def _leader(self, candidates: List[RaceCandidate], final_rows: int) -> Optional[RaceCandidate]:
+        """Candidate with the best extrapolated score, if any has been fitted."""
+        fitted = [c for c in candidates if c.rows]
+        if not fitted:
+            return None
+        return max(fitted, key=lambda c: (c.predict_score(final_rows), c.rows[-1]))
+    
+    def _final_fit_seconds(self, candidate: RaceCandidate, final_rows: int, approximate_svm: bool) -> float:
+        """Predicted wall time of the final fit, including headroom."""
+        exponent = self._default_exponent(candidate.algorithm, approximate_svm)
+        return candidate.predict_seconds(final_rows, exponent) * self.safety_factor
+    
+    def _default_exponent(self, algorithm: str, approximate_svm: bool) -> float:
+        """Lower bound for how fit time grows with rows."""
+        # Exact kernel SVMs are at least quadratic in the number of rows
+        if algorithm == "svm" and not approximate_svm:
+            return 2.0
+        return 1.0
@@ -0,0 +1,146 @@
+"""CPU core budgeting for concurrent training jobs."""
+
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from threadpoolctl import threadpool_limits
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+logger = get_logger(__name__)
+
+
+class ResourceScheduler:
+    """Hands out CPU core budgets to training jobs.
+
+    A fixed number of cores is kept aside for the serving path; the rest
+    are shared between running training jobs. Each job receives an equal
+    share of the training pool sized for ``expected_jobs`` concurrent jobs
+    (at least one core, at most ``max_cores_per_job``), or what is left
+    of the pool if that is less. The share is passed as the ``n_jobs`` of
+    estimators that accept it. When every core is taken, new jobs wait for
+    one to be released rather than oversubscribing the pool.
+
+    BLAS/OpenMP thread limits are process-wide, so they cannot hold a
+    per-job budget: a limit set by one job would apply to every other job
+    and be undone when that job finished. Instead ``limit_process_threads``
+    caps the thread pools once, at startup, to the training pool size.
+    Concurrent jobs share that cap, and predictions run under it without
+    changing it; only ``n_jobs`` is enforced per job.
+    """
+
+    def __init__(self,
+                 total_cores: Optional[int] = None,
+                 reserved_cores: Optional[int] = None,
+                 max_cores_per_job: Optional[int] = None,
+                 expected_jobs: Optional[int] = None):
+        self.total_cores = total_cores or settings.cpu_cores or os.cpu_count() or 1
+        if reserved_cores is None:
+            reserved_cores = settings.serving_reserved_cores
+        # Always leave at least one core for training
+        self.reserved_cores = max(0, min(reserved_cores, self.total_cores - 1))
+        self.max_cores_per_job = max_cores_per_job or settings.max_cores_per_job
+        self.expected_jobs = max(1, expected_jobs or settings.expected_training_jobs)
+        self._allocations: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._thread_limits: Optional[threadpool_limits] = None
+
+    @property
+    def training_cores(self) -> int:
+        """Number of cores available to training jobs."""
+        return max(1, self.total_cores - self.reserved_cores)
+
+    @property
+    def serving_cores(self) -> int:
+        """Number of cores reserved for prediction requests."""
+        return max(1, self.reserved_cores)
+
+    @property
+    def job_share(self) -> int:
+        """Number of cores a job receives when the pool has them free."""
+        share = max(1, self.training_cores // self.expected_jobs)
+        if self.max_cores_per_job:
+            share = min(share, self.max_cores_per_job)
+        return share
+
+    def _free_cores(self) -> int:
+        return self.training_cores - sum(a["cores"] for a in self._allocations.values())
+
+    def acquire(self, job_id: str) -> int:
+        """Allocate a core budget for a job and return its size.
+
+        Blocks until at least one core of the training pool is free.
+        """
+        with self._released:
+            if job_id in self._allocations:
+                return self._allocations[job_id]["cores"]
+
+            if self._free_cores() < 1:
+                logger.info(f"Job {job_id} is waiting for a free core")
+                self._released.wait_for(lambda: self._free_cores() >= 1)
+            cores = min(self.job_share, self._free_cores())
+
+            self._allocations[job_id] = {
+                "cores": cores,
+                "allocated_at": datetime.utcnow().isoformat()
+            }
+
+        logger.info(f"Allocated {cores} core(s) to job {job_id}")
+        return cores
+
+    def release(self, job_id: str) -> None:
+        """Return a job's cores to the pool."""
+        with self._released:
+            allocation = self._allocations.pop(job_id, None)
+            self._released.notify_all()
+        if allocation:
+            logger.info(f"Released {allocation['cores']} core(s) from job {job_id}")
+
+    @contextmanager
+    def allocate(self, job_id: str) -> Iterator[int]:
+        """Hold a core budget for the duration of a ``with`` block."""
+        cores = self.acquire(job_id)
+        try:
+            yield cores
+        finally:
+            self.release(job_id)
+
+    def limit_process_threads(self) -> None:
+        """Cap this process's BLAS/OpenMP thread pools at the training pool size."""
+        self._thread_limits = threadpool_limits(limits=self.training_cores)
+        logger.info(f"Limited BLAS/OpenMP thread pools to {self.training_cores} thread(s)")
+
+    def get_allocation_summary(self) -> Dict[str, Any]:
+        """Get the current core allocation."""
+        with self._lock:
+            allocations = {job_id: dict(a) for job_id, a in self._allocations.items()}
+        allocated = sum(a["cores"] for a in allocations.values())
+
+        return {
+            "total_cores": self.total_cores,
+            "reserved_serving_cores": self.reserved_cores,
+            "training_cores": self.training_cores,
+            "allocated_cores": allocated,
+            "free_cores": max(0, self.training_cores - allocated),
+            "max_cores_per_job": self.max_cores_per_job,
+            "expected_jobs": self.expected_jobs,
+            "job_share": self.job_share,
+            "jobs": allocations
+        }
+
+
+def supports_n_jobs(model_class: Any) -> bool:
+    """Check whether an estimator class accepts an ``n_jobs`` parameter."""
+    try:
+        return "n_jobs" in model_class().get_params()
+    except Exception:
+        return False
+
+
+# Global scheduler shared by the training and serving paths
+resource_scheduler = ResourceScheduler()
@@ -0,0 +1,190 @@
+"""Sparse byte-offset row indexes for random access into CSV datasets."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+
+logger = get_logger(__name__)
+
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+QUOTE = ord('"')
+
+
+class RowIndexBuilder:
+    """Builds a row index from the bytes of a CSV file, block by block.
+    
+    Records the byte offset of every ``every``-th data row. Newlines
+    inside quoted fields do not end a row (quote parity is carried across
+    blocks) and blank lines are skipped as pandas skips them. The scan
+    state is part of the index, so a builder can resume from a saved
+    index (``RowIndexBuilder(state=index)``) when bytes are appended.
+    """
+    
+    def __init__(self, every: Optional[int] = None, state: Optional[Dict[str, Any]] = None):
+        state = dict(state or {})
+        if state.get("pending"):
+            # The unterminated last line is counted again once its newline is scanned
+            state["rows"] -= 1
+            state["offsets"] = [o for o in state["offsets"] if o != state["line_start"]]
+        self.every = int(state.get("every", every or settings.row_index_every))
+        self.rows = int(state.get("rows", 0))
+        self.size = int(state.get("size", 0))
+        self.header_seen = bool(state.get("header_seen", False))
+        self.in_quotes = bool(state.get("in_quotes", False))
+        self.line_start = int(state.get("line_start", 0))
+        self.last_byte = int(state.get("last_byte", -1))
+        self.offsets: List[int] = list(state.get("offsets", []))
+    
+    def update(self, block: bytes) -> None:
+        """Scan the next block of the file."""
+        if not block:
+            return
+        data = np.frombuffer(block, dtype=np.uint8)
+        
+        # Quote parity after each byte; a newline at even parity ends a line
+        newlines = data == NEWLINE
+        quotes = data == QUOTE
+        if quotes.any():
+            parity = (np.cumsum(quotes, dtype=np.int64) + self.in_quotes) % 2
+            ends = np.flatnonzero(newlines & (parity == 0))
+            self.in_quotes = bool(parity[-1])
+        else:
+            ends = np.flatnonzero(newlines) if not self.in_quotes else np.empty(0, dtype=np.int64)
+        
+        if len(ends):
+            starts = np.concatenate([[self.line_start], ends[:-1] + 1 + self.size])
+            ends_global = ends + self.size
+            # Byte before each newline, which may be the previous block's last byte
+            before = np.where(ends > 0, data[np.maximum(ends - 1, 0)], self.last_byte)
+            lengths = ends_global - starts
+            blank = (lengths == 0) | ((lengths == 1) & (before == CARRIAGE_RETURN))
+            self._add_lines(starts[~blank])
+            self.line_start = int(ends_global[-1]) + 1
+        
+        self.size += len(data)
+        self.last_byte = int(data[-1])
+    
+    def finish(self) -> Dict[str, Any]:
+        """Index of the bytes scanned so far, including a last line without a newline."""
+        index = self.state()
+        remaining = self.size - self.line_start
+        index["pending"] = self.header_seen and (
+            remaining > 1 or (remaining == 1 and self.last_byte != CARRIAGE_RETURN)
+        )
+        if index["pending"]:
+            if self.rows % self.every == 0:
+                index["offsets"].append(self.line_start)
+            index["rows"] += 1
+        return index
+    
+    def state(self) -> Dict[str, Any]:
+        """Index and scan state, as saved by ``RowIndexStore``."""
+        return {
+            "every": self.every,
+            "rows": self.rows,
+            "size": self.size,
+            "header_seen": self.header_seen,
+            "in_quotes": self.in_quotes,
+            "line_start": self.line_start,
+            "last_byte": self.last_byte,
+            "offsets": list(self.offsets)
+        }
+    
+    def _add_lines(self, starts: np.ndarray) -> None:
+        """Count non-blank lines, recording offsets of every ``every``-th row."""
+        if not self.header_seen and len(starts):
+            self.header_seen = True
+            starts = starts[1:]
+        numbers = np.arange(self.rows, self.rows + len(starts))
+        self.offsets.extend(int(offset) for offset in starts[numbers % self.every == 0])
+        self.rows += len(starts)
+
+
+class RowIndexStore:
+    """Persists row indexes next to dataset files and reads rows through them.
+    
+    ``uploads/blobs/{sha256}.csv`` gets ``uploads/blobs/{sha256}.rowindex.npz``.
+    Reading ``limit`` rows from ``offset`` seeks to the nearest indexed
+    row at or before ``offset`` and parses at most ``every + limit`` rows.
+    """
+    
+    def get_index_path(self, file_path: str) -> Path:
+        """Get the row index path of a dataset file."""
+        return Path(file_path).with_suffix(".rowindex.npz")
+    
+    def exists(self, file_path: str) -> bool:
+        """Check whether a dataset file has a row index."""
+        return self.get_index_path(file_path).exists()
+    
+    def save(self, file_path: str, index: Dict[str, Any]) -> None:
+        """Save a row index built by ``RowIndexBuilder``."""
+        path = self.get_index_path(file_path)
+        temp_path = path.with_name(f".{path.name}")
+        with open(temp_path, "wb") as f:
+            np.savez(f, **{key: np.asarray(value, dtype=np.int64 if key == "offsets" else None)
+                           for key, value in index.items()})
+        temp_path.replace(path)
+        logger.info(f"Saved row index for {Path(file_path).name}: {index['rows']} rows")
+    
+    def load(self, file_path: str) -> Dict[str, Any]:
+        """Load a dataset file's row index."""
+        with np.load(self.get_index_path(file_path)) as data:
+            index = {key: data[key].item() for key in data.files if key != "offsets"}
+            index["offsets"] = data["offsets"].tolist()
+        return index
+    
+    def build(self, file_path: str, block_size: Optional[int] = None) -> Dict[str, Any]:
+        """Build and save the row index of an existing CSV file."""
+        block_size = block_size or settings.upload_chunk_size
+        builder = RowIndexBuilder()
+        with open(file_path, "rb") as f:
+            while block := f.read(block_size):
+                builder.update(block)
+        index = builder.finish()
+        self.save(file_path, index)
+        return index
+    
+    def append(self, file_path: str, data: bytes) -> None:
+        """Extend a saved index with bytes appended to its file."""
+        if not self.exists(file_path):
+            return
+        builder = RowIndexBuilder(state=self.load(file_path))
+        builder.update(data)
+        self.save(file_path, builder.finish())
+    
+    def read_rows(self, file_path: str, offset: int, limit: int) -> pd.DataFrame:
+        """Read ``limit`` rows starting at data row ``offset``.
+        
+        The index is built on first use for files ingested without one.
+        """
+        index = self.load(file_path) if self.exists(file_path) else self.build(file_path)
+        columns = pd.read_csv(file_path, nrows=0).columns
+        block = offset // index["every"]
+        if offset >= index["rows"] or block >= len(index["offsets"]):
+            return pd.DataFrame(columns=columns)
+        
+        with open(file_path, "rb") as f:
+            f.seek(index["offsets"][block])
+            return pd.read_csv(
+                f,
+                header=None,
+                names=columns,
+                skiprows=offset - block * index["every"],
+                nrows=limit
+            )
+    
+    def delete(self, file_path: str) -> None:
+        """Delete a dataset file's row index."""
+        path = self.get_index_path(file_path)
+        if path.exists():
+            path.unlink()
+
+
+# Shared store used by the upload path and the dataset endpoints
+row_index_store = RowIndexStore()
@@ -0,0 +1,165 @@
+"""Persistent per-content statistics of uploaded datasets."""
+
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.logging import get_logger
+from ..core.config import settings
+from .preprocessing import DataPreprocessor
+from .profiling import DatasetProfiler, TOP_VALUES, merge_column_types, merge_moments, summarize_values
+
+logger = get_logger(__name__)
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN and infinities, which JSON responses reject, with None."""
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class DatasetStatsCache:
+    """Caches dataset statistics by content hash.
+    
+    Column names and types, missing counts, numeric ranges and top
+    categorical values are computed once per distinct file contents and
+    stored in ``uploads/stats/{sha256}.json``. Dataset files never change
+    under the same hash, so entries only go away when the last dataset
+    with those contents is deleted.
+    """
+    
+    def __init__(self):
+        self.stats_dir = Path(settings.upload_dir) / "stats"
+        self.stats_dir.mkdir(parents=True, exist_ok=True)
+        self.preprocessor = DataPreprocessor()
+    
+    def get_cache_path(self, content_hash: str) -> Path:
+        """Get the cached statistics path for a content hash."""
+        return self.stats_dir / f"{content_hash}.json"
+    
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get cached statistics, or None if not computed yet."""
+        path = self.get_cache_path(content_hash)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+    
+    def put(self, content_hash: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Compute and cache the statistics of a loaded dataset."""
+        feature_info = self.preprocessor.get_feature_info(df)
+        return self._write(content_hash, {
+            "content_hash": content_hash,
+            "rows": int(len(df)),
+            "column_names": [str(col) for col in df.columns],
+            "column_types": {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+            "missing_values": {str(col): int(n) for col, n in df.isnull().sum().items()},
+            "feature_ranges": _finite(feature_info["feature_ranges"]),
+            "feature_stats": feature_info["feature_stats"]
+        })
+    
+    def put_profile(self, content_hash: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache statistics taken from a ``DatasetProfiler`` result.
+        
+        Used for datasets read in chunks, which are never in memory whole.
+        """
+        column_types = {str(col): t for col, t in profile["column_types"].items()}
+        feature_ranges, feature_stats = {}, {}
+        for col, stats in profile["column_stats"].items():
+            if "top_values" in stats:
+                if column_types[str(col)] in ("object", "category"):
+                    feature_stats[str(col)] = {"unique_values": stats["distinct"], "top_values": stats["top_values"]}
+            else:
+                feature_ranges[str(col)] = {key: stats.get(key) for key in ("min", "max", "mean", "std")}
+        
+        return self._write(content_hash, {
+            "content_hash": content_hash,
+            "rows": profile["rows"],
+            "column_names": [str(col) for col in profile["column_names"]],
+            "column_types": column_types,
+            "missing_values": {str(col): int(n) for col, n in profile["missing_values"].items()},
+            "feature_ranges": _finite(feature_ranges),
+            "feature_stats": feature_stats
+        })
+    
+    def append(self, content_hash: str, new_hash: str, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Cache statistics for a dataset after rows ``df`` were appended.
+        
+        Column types, missing counts and numeric ranges are merged exactly
+        from the entry of ``content_hash``. Distinct counts and top values
+        are merged as far as the stored top values allow and listed under
+        ``stale`` until recomputed. Returns None when there is nothing to
+        merge into; the statistics are then computed on next use.
+        """
+        stats = self.get(content_hash)
+        if stats is None:
+            return None
+        
+        missing = df.isnull().sum()
+        feature_ranges = {}
+        for col, ranges in stats["feature_ranges"].items():
+            count = stats["rows"] - stats["missing_values"][col]
+            feature_ranges[col] = merge_moments(ranges, count, *summarize_values(df[col]))
+        
+        feature_stats = {}
+        for col, col_stats in stats["feature_stats"].items():
+            counts = pd.Series(col_stats["top_values"], dtype=np.int64).add(
+                df[col].dropna().astype(str).value_counts(), fill_value=0
+            ).astype(np.int64)
+            top = counts.sort_values(ascending=False, kind="stable").head(TOP_VALUES)
+            feature_stats[col] = {
+                "unique_values": max(col_stats["unique_values"], int(df[col].nunique())),
+                "top_values": {str(k): int(v) for k, v in top.items()}
+            }
+        
+        return self._write(new_hash, {
+            **stats,
+            "content_hash": new_hash,
+            "rows": stats["rows"] + len(df),
+            "column_types": merge_column_types(stats["column_types"], df),
+            "missing_values": {col: int(n + missing.get(col, 0)) for col, n in stats["missing_values"].items()},
+            "feature_ranges": _finite(feature_ranges),
+            "feature_stats": feature_stats,
+            "stale": ["feature_stats"] if feature_stats else []
+        })
+    
+    def get_or_compute(self, content_hash: str, file_path: str) -> Dict[str, Any]:
+        """Get cached statistics, reading the dataset to compute them on a miss."""
+        stats = self.get(content_hash)
+        if stats is None:
+            if self.preprocessor.needs_chunked_load(file_path):
+                profile = DatasetProfiler().profile_chunks(self.preprocessor.iter_chunks(file_path))
+                stats = self.put_profile(content_hash, profile)
+            else:
+                stats = self.put(content_hash, self.preprocessor.load_dataset(file_path))
+        return stats
+    
+    def delete(self, content_hash: str) -> None:
+        """Drop the cached statistics of a content hash."""
+        path = self.get_cache_path(content_hash)
+        if path.exists():
+            path.unlink()
+    
+    def _write(self, content_hash: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+        # Write to a temporary file first so readers never see a partial entry
+        path = self.get_cache_path(content_hash)
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with open(temp_path, "w") as f:
+            json.dump(stats, f)
+        os.replace(temp_path, path)
+        
+        logger.info(f"Cached dataset statistics for {content_hash}")
+        return stats
+
+
+# Shared cache used by the dataset endpoints and background jobs
+dataset_stats = DatasetStatsCache()
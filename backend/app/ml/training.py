@@ -1,26 +1,34 @@
 """ML training utilities and model management."""
 
+import hashlib
+import json
 import joblib
 import numpy as np
 import pandas as pd
+import sklearn
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from scipy import sparse
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 import uuid
 
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.svm import SVC
+from sklearn.svm import SVC, LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import make_pipeline
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import (
-    accuracy_score, classification_report, confusion_matrix,
-    roc_curve, auc, roc_auc_score
-)
+from sklearn.preprocessing import StandardScaler, MaxAbsScaler, LabelEncoder
 
 from ..core.logging import get_logger
 from ..core.config import settings
+from ..core.progress import timed_stage
+from .resources import resource_scheduler, supports_n_jobs
+from .encoding import FeatureEncoder
+from .evaluation import evaluate_model
+from .drift import build_baseline
 
 logger = get_logger(__name__)
 
@@ -36,6 +44,14 @@ class MLTrainer:
             "gradient_boosting": GradientBoostingClassifier,
             "svm": SVC
         }
+        # Algorithms fitted directly on scipy.sparse input
+        self.sparse_algorithms = {
+            "logistic_regression",
+            "random_forest",
+            "decision_tree",
+            "gradient_boosting",
+            "svm"
+        }
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.is_fitted = False
@@ -74,14 +90,77 @@ class MLTrainer:
         }
         return default_params.get(algorithm, {})
     
+    def get_training_fingerprint(self,
+                                 dataset_hash: str,
+                                 target_column: Optional[str],
+                                 algorithm: str,
+                                 params: Optional[Dict[str, Any]],
+                                 test_size: float,
+                                 random_state: int,
+                                 svm_mode: str = "auto",
+                                 encoding: Optional[str] = None) -> str:
+        """Hash everything that determines a training result.
+        
+        Covers the dataset contents, algorithm, effective parameters, split
+        settings and library versions, so identical requests can reuse an
+        earlier model.
+        """
+        effective_params = dict(params if params is not None else self.get_algorithm_params(algorithm))
+        # Parallelism does not change the fitted model
+        effective_params.pop("n_jobs", None)
+        
+        payload = {
+            "dataset": dataset_hash,
+            "target_column": target_column,
+            "algorithm": algorithm,
+            "params": effective_params,
+            "test_size": float(test_size),
+            "random_state": random_state,
+            "svm_mode": svm_mode if algorithm == "svm" else None,
+            "encoding": encoding or settings.categorical_encoding,
+            "versions": {
+                "scikit-learn": sklearn.__version__,
+                "numpy": np.__version__,
+                "pandas": pd.__version__
+            }
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+    
     def train_model(self, 
                    X: pd.DataFrame, 
                    y: pd.Series, 
                    algorithm: str,
                    params: Optional[Dict[str, Any]] = None,
                    test_size: float = 0.2,
-                   random_state: int = 42) -> Dict[str, Any]:
-        """Train a model and return results."""
+                   random_state: int = 42,
+                   n_jobs: Optional[int] = None,
+                   progress_callback: Optional[Callable[..., None]] = None,
+                   svm_mode: str = "auto",
+                   encoding: Optional[str] = None,
+                   holdout_path: Optional[str] = None,
+                   holdout_features_path: Optional[str] = None,
+                   drift_baseline_path: Optional[str] = None,
+                   test_index: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Train a model and return results.
+        
+        ``n_jobs`` is the job's core budget: it is passed to estimators that
+        support parallel fitting. BLAS/OpenMP threads are capped for the
+        whole process instead (see ``ResourceScheduler``).
+        ``progress_callback`` is called as ``callback(event_type, **data)``
+        with per-stage timings and, for tree ensembles, built tree counts.
+        ``svm_mode`` selects the exact kernel SVM ("exact"), the kernel
+        approximation ("approximate"), or picks by training set size ("auto").
+        ``encoding`` is the ``FeatureEncoder`` strategy for categorical
+        columns; the encoder is fitted on the training split only.
+        ``holdout_path`` stores the test set's true labels and predicted
+        probabilities for later threshold and metric analysis;
+        ``holdout_features_path`` stores its raw feature columns for
+        permutation importance. ``drift_baseline_path`` stores sketches of
+        the training features that prediction inputs are compared against.
+        ``test_index`` holds out those row positions as the test set instead
+        of splitting by ``test_size``.
+        """
         
         if algorithm not in self.models:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
@@ -90,103 +169,250 @@ class MLTrainer:
         if params is None:
             params = self.get_algorithm_params(algorithm)
         
+        model_class = self.models[algorithm]
+        if n_jobs is not None:
+            params = self._apply_core_budget(model_class, params, n_jobs)
+        
         logger.info(f"Training {algorithm} with params: {params}")
         
+        # Fresh transformers per call so concurrent jobs don't share state
+        label_encoder = LabelEncoder()
+        
         # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
-        )
+        with timed_stage(progress_callback, "split"):
+            if test_index is not None:
+                is_test = np.zeros(len(X), dtype=bool)
+                is_test[test_index] = True
+                X_train, X_test = X.iloc[~is_test], X.iloc[is_test]
+                y_train, y_test = y.iloc[~is_test], y.iloc[is_test]
+            else:
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=test_size, random_state=random_state, stratify=y
+                )
+        
+        # Encode categorical columns
+        with timed_stage(progress_callback, "encode"):
+            encoder = FeatureEncoder(
+                strategy=encoding,
+                random_state=random_state,
+                dtype=np.float32 if settings.compact_dtypes else np.float64
+            )
+            X_train_encoded = encoder.fit_transform(X_train, y_train)
+            X_test_encoded = encoder.transform(X_test)
+        
+        # Stay sparse when the encoded matrix is mostly zeros
+        use_sparse = self._use_sparse(X_train_encoded, algorithm)
+        if not use_sparse:
+            X_train_encoded = X_train_encoded.toarray()
+            X_test_encoded = X_test_encoded.toarray()
+        logger.info(f"Using {'sparse' if use_sparse else 'dense'} features: {X_train_encoded.shape[1]} columns")
         
         # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        with timed_stage(progress_callback, "scale"):
+            scaler = self._make_scaler(use_sparse)
+            X_train_scaled = scaler.fit_transform(X_train_encoded)
+            X_test_scaled = scaler.transform(X_test_encoded)
         
         # Encode target if needed
-        if y.dtype == 'object':
-            y_train_encoded = self.label_encoder.fit_transform(y_train)
-            y_test_encoded = self.label_encoder.transform(y_test)
+        if not pd.api.types.is_numeric_dtype(y):
+            y_train_encoded = label_encoder.fit_transform(y_train)
+            y_test_encoded = label_encoder.transform(y_test)
         else:
             y_train_encoded = y_train
             y_test_encoded = y_test
         
-        # Train model
-        model_class = self.models[algorithm]
-        model = model_class(**params)
-        model.fit(X_train_scaled, y_train_encoded)
-        
-        # Make predictions
-        y_pred = model.predict(X_test_scaled)
-        y_pred_proba = None
-        
-        # Get probabilities if available
-        if hasattr(model, 'predict_proba'):
-            y_pred_proba = model.predict_proba(X_test_scaled)
+        # Kernel SVMs scale quadratically, so large sets use an approximation
+        approximate_svm = algorithm == "svm" and self._use_svm_approximation(svm_mode, len(X_train))
         
-        # Calculate metrics
-        accuracy = accuracy_score(y_test_encoded, y_pred)
-        
-        # Confusion matrix
-        cm = confusion_matrix(y_test_encoded, y_pred)
-        
-        # ROC curve data
-        fpr, tpr, roc_auc = self._calculate_roc_curve(y_test_encoded, y_pred_proba)
-        
-        # Feature importance
-        feature_importance = self._get_feature_importance(model, X.columns.tolist())
-        
-        # Classification report
-        class_report = classification_report(
-            y_test_encoded, y_pred, 
-            output_dict=True, 
-            zero_division=0
-        )
+        # Train model; the job's core budget is already in ``params``
+        with timed_stage(progress_callback, "fit"):
+            if approximate_svm:
+                model = self._fit_approximate_svm(X_train_scaled, y_train_encoded, params, random_state)
+            else:
+                model = model_class(**params)
+                self._fit_with_progress(model, X_train_scaled, y_train_encoded, progress_callback)
+        
+        # Predict and evaluate the holdout in one pass
+        with timed_stage(progress_callback, "evaluate"):
+            evaluation, _ = evaluate_model(
+                model, X_test_scaled, np.asarray(y_test_encoded), holdout_path=holdout_path
+            )
+            if holdout_features_path:
+                X_test.reset_index(drop=True).to_pickle(holdout_features_path)
+            if drift_baseline_path:
+                with open(drift_baseline_path, "w") as f:
+                    json.dump(build_baseline(X_train), f)
+            
+            # Feature importance
+            feature_importance = self._get_feature_importance(model, encoder.get_feature_names())
+        accuracy = evaluation["accuracy"]
         
         # Prepare results
         results = {
             "model": model,
-            "scaler": self.scaler,
-            "label_encoder": self.label_encoder,
+            "scaler": scaler,
+            "label_encoder": label_encoder,
+            "encoder": encoder,
             "accuracy": float(accuracy),
-            "confusion_matrix": cm.tolist(),
-            "fpr": fpr.tolist(),
-            "tpr": tpr.tolist(),
-            "roc_auc": float(roc_auc),
+            "confusion_matrix": evaluation["confusion_matrix"],
+            "fpr": evaluation["fpr"],
+            "tpr": evaluation["tpr"],
+            "roc_auc": float(evaluation["roc_auc"]),
+            "roc_auc_per_class": evaluation["roc_auc_per_class"],
             "feature_importance": feature_importance,
-            "classification_report": class_report,
+            "classification_report": evaluation["classification_report"],
             "test_size": test_size,
             "random_state": random_state,
             "algorithm": algorithm,
             "params": params,
+            "svm_mode": ("approximate" if approximate_svm else "exact") if algorithm == "svm" else None,
+            "encoding": encoder.column_strategies_,
+            "sparse": use_sparse,
             "feature_columns": X.columns.tolist(),
-            "target_classes": self.label_encoder.classes_.tolist() if hasattr(self.label_encoder, 'classes_') else None
+            "target_classes": label_encoder.classes_.tolist() if hasattr(label_encoder, 'classes_') else None,
+            "class_labels": [
+                str(label) for label in
+                (label_encoder.inverse_transform(model.classes_) if hasattr(label_encoder, 'classes_') else model.classes_)
+            ]
         }
         
+        self.scaler = scaler
+        self.label_encoder = label_encoder
         self.is_fitted = True
         logger.info(f"Training completed. Accuracy: {accuracy:.4f}")
         
         return results
     
-    def _calculate_roc_curve(self, y_true: np.ndarray, y_pred_proba: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, float]:
-        """Calculate ROC curve data."""
-        if y_pred_proba is None or len(y_pred_proba.shape) == 1:
-            # Binary classification or no probabilities
-            if y_pred_proba is not None:
-                fpr, tpr, _ = roc_curve(y_true, y_pred_proba)
-                roc_auc = auc(fpr, tpr)
-            else:
-                # Fallback for models without probabilities
-                fpr = np.array([0, 1])
-                tpr = np.array([0, 1])
-                roc_auc = 0.5
+    def _fit_with_progress(self,
+                          model: Any,
+                          X: np.ndarray,
+                          y: np.ndarray,
+                          progress_callback: Optional[Callable[..., None]],
+                          report_every: int = 10) -> None:
+        """Fit a model, reporting built tree counts for ensembles."""
+        if progress_callback is None:
+            model.fit(X, y)
+            return
+        
+        total = getattr(model, "n_estimators", None)
+        
+        if isinstance(model, RandomForestClassifier) and not model.warm_start:
+            # Grow the forest in batches; warm start keeps the result identical
+            step = max(1, total // report_every)
+            model.set_params(warm_start=True)
+            for built in range(step, total + step, step):
+                model.set_params(n_estimators=min(built, total))
+                model.fit(X, y)
+                progress_callback("trees", built=min(built, total), total=total)
+            model.set_params(warm_start=False)
+        elif isinstance(model, GradientBoostingClassifier):
+            step = max(1, total // report_every)
+            
+            def monitor(i, estimator, local_vars):
+                if (i + 1) % step == 0 or i + 1 == total:
+                    progress_callback("trees", built=i + 1, total=total)
+                return False
+            
+            model.fit(X, y, monitor=monitor)
         else:
-            # Multi-class classification
-            fpr, tpr, _ = roc_curve(y_true, y_pred_proba[:, 1])
-            roc_auc = auc(fpr, tpr)
+            model.fit(X, y)
+    
+    def _use_sparse(self, X: sparse.spmatrix, algorithm: str) -> bool:
+        """Decide whether to train on a sparse encoded matrix.
+        
+        Sparse input is kept for algorithms that accept it when the share
+        of non-zero cells is below ``SPARSE_DENSITY_THRESHOLD``.
+        """
+        if algorithm not in self.sparse_algorithms:
+            return False
+        cells = X.shape[0] * X.shape[1]
+        density = X.nnz / cells if cells else 1.0
+        return density < settings.sparse_density_threshold
+    
+    def _make_scaler(self, sparse_input: bool) -> Any:
+        """Create a feature scaler; centering would densify sparse input."""
+        if not sparse_input:
+            return StandardScaler()
+        if settings.sparse_scaler == "maxabs":
+            return MaxAbsScaler()
+        return StandardScaler(with_mean=False)
+    
+    def _use_svm_approximation(self, svm_mode: str, n_rows: int) -> bool:
+        """Decide whether an SVM should use kernel approximation."""
+        if svm_mode not in ("auto", "exact", "approximate"):
+            raise ValueError(f"Unsupported SVM mode: {svm_mode}")
+        if svm_mode == "auto":
+            return n_rows > settings.svm_approximation_threshold
+        return svm_mode == "approximate"
+    
+    def _fit_approximate_svm(self,
+                            X: np.ndarray,
+                            y: np.ndarray,
+                            params: Dict[str, Any],
+                            random_state: int) -> Any:
+        """Fit a kernel-approximated linear SVM calibrated on a holdout.
+        
+        The kernel map (Nystroem or random Fourier features) is followed by
+        a linear SVM, and probabilities come from a single sigmoid
+        calibration on a holdout split instead of SVC's internal 5-fold CV.
+        """
+        kernel = params.get("kernel", "rbf")
+        gamma = params.get("gamma", "scale")
+        if gamma == "scale":
+            if sparse.issparse(X):
+                variance = X.multiply(X).mean() - X.mean() ** 2
+            else:
+                variance = X.var()
+            gamma = 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+        elif gamma == "auto":
+            gamma = 1.0 / X.shape[1]
+        
+        # Hold out a calibration split before fitting the linear SVM
+        X_fit, X_cal, y_fit, y_cal = train_test_split(
+            X, y,
+            test_size=settings.svm_calibration_size,
+            random_state=random_state,
+            stratify=y
+        )
+        
+        n_components = min(settings.svm_approximation_components, X_fit.shape[0])
+        steps = []
+        if kernel == "rbf" and settings.svm_kernel_approximation == "rbf_sampler":
+            steps.append(RBFSampler(gamma=gamma, n_components=n_components, random_state=random_state))
+        elif kernel != "linear":
+            steps.append(Nystroem(kernel=kernel, gamma=gamma, n_components=n_components, random_state=random_state))
+        steps.append(LinearSVC(C=params.get("C", 1.0), dual="auto", random_state=random_state))
         
-        return fpr, tpr, roc_auc
+        base_model = make_pipeline(*steps)
+        base_model.fit(X_fit, y_fit)
+        
+        model = CalibratedClassifierCV(base_model, method="sigmoid", cv="prefit")
+        model.fit(X_cal, y_cal)
+        
+        logger.info(f"Fitted approximate SVM: {' -> '.join(type(step).__name__ for step in steps)}")
+        return model
+    
+    def _apply_core_budget(self, model_class: Any, params: Dict[str, Any], n_jobs: int) -> Dict[str, Any]:
+        """Set ``n_jobs`` on estimators that support it, capped at the budget."""
+        if not supports_n_jobs(model_class):
+            return params
+        # liblinear is single-threaded and warns when given n_jobs
+        if params.get("solver") == "liblinear":
+            return params
+        
+        params = dict(params)
+        requested = params.get("n_jobs")
+        if requested is None or requested < 1 or requested > n_jobs:
+            params["n_jobs"] = n_jobs
+        return params
     
     def _get_feature_importance(self, model: Any, feature_names: List[str]) -> List[Dict[str, Any]]:
-        """Get feature importance from model."""
+        """Get feature importance from model.
+        
+        Models without built-in importance return an empty list rather
+        than zeros; their importance comes from a permutation importance
+        job on the stored holdout.
+        """
         importance = []
         
         if hasattr(model, 'feature_importances_'):
@@ -194,14 +420,15 @@ class MLTrainer:
             for name, imp in zip(feature_names, model.feature_importances_):
                 importance.append({"feature": name, "importance": float(imp)})
         elif hasattr(model, 'coef_'):
-            # Linear models
-            coef = model.coef_[0] if len(model.coef_.shape) > 1 else model.coef_
+            # Linear models; multiclass averages the magnitude over classes
+            coef = np.abs(np.asarray(model.coef_))
+            if coef.ndim > 1:
+                coef = coef.mean(axis=0)
             for name, coef_val in zip(feature_names, coef):
-                importance.append({"feature": name, "importance": float(abs(coef_val))})
+                importance.append({"feature": name, "importance": float(coef_val)})
         else:
-            # No feature importance available
-            for name in feature_names:
-                importance.append({"feature": name, "importance": 0.0})
+            # No built-in importance (e.g. kernel SVM); use permutation importance
+            return []
         
         # Sort by importance
         importance.sort(key=lambda x: x["importance"], reverse=True)
@@ -216,8 +443,19 @@ class MLTrainer:
                   dataset_id: str,
                   accuracy: float,
                   metrics: Dict[str, Any],
-                  params: Dict[str, Any]) -> str:
-        """Save trained model to disk."""
+                  params: Dict[str, Any],
+                  feature_columns: Optional[List[str]] = None,
+                  target_classes: Optional[List[Any]] = None,
+                  encoder: Optional[FeatureEncoder] = None,
+                  sparse_input: bool = False) -> str:
+        """Save trained model to disk.
+        
+        ``metrics`` should be the summary scalars; full evaluation output
+        lives in the metrics sidecar. ``encoder`` is the fitted
+        ``FeatureEncoder`` applied to raw inputs before scaling;
+        ``sparse_input`` records whether the model was fitted on sparse
+        features.
+        """
         
         # Create models directory
         models_dir = Path(settings.models_dir)
@@ -231,11 +469,15 @@ class MLTrainer:
             "model": model,
             "scaler": scaler,
             "label_encoder": label_encoder,
+            "encoder": encoder,
+            "sparse": sparse_input,
             "algorithm": algorithm,
             "dataset_id": dataset_id,
             "accuracy": accuracy,
             "metrics": metrics,
             "params": params,
+            "feature_columns": feature_columns or [],
+            "target_classes": target_classes or [],
             "created_at": datetime.utcnow().isoformat(),
             "model_id": model_id
         }
@@ -247,26 +489,55 @@ class MLTrainer:
         return str(model_path)
     
     def load_model(self, model_path: str) -> Dict[str, Any]:
-        """Load trained model from disk."""
+        """Load trained model from disk for serving.
+        
+        Estimators that accept ``n_jobs`` are set to the cores reserved for
+        serving here, once, so that ``predict`` never changes the model.
+        BLAS threads are capped process-wide at startup (see
+        ``ResourceScheduler``); limiting them per call would throttle
+        running training jobs too.
+        """
         try:
             model_data = joblib.load(model_path)
+            model = model_data["model"]
+            if "n_jobs" in model.get_params():
+                model.set_params(n_jobs=resource_scheduler.serving_cores)
             logger.info(f"Model loaded from {model_path}")
             return model_data
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
+    def transform_features(self, model_data: Dict[str, Any], X: Any) -> Any:
+        """Apply a saved model's encoder and scaler to input features.
+        
+        ``X`` is either a DataFrame of raw feature columns or an already
+        encoded feature matrix, dense or ``scipy.sparse``.
+        """
+        encoder = model_data.get("encoder")
+        
+        # Models saved before encoders were stored expect numeric inputs
+        if encoder is not None and isinstance(X, pd.DataFrame):
+            X = encoder.transform(X)
+        if sparse.issparse(X) and not model_data.get("sparse", False):
+            X = X.toarray()
+        
+        return model_data["scaler"].transform(X)
+    
     def predict(self, 
                model_data: Dict[str, Any], 
-               X: pd.DataFrame) -> Dict[str, Any]:
-        """Make predictions using a trained model."""
+               X: Any) -> Dict[str, Any]:
+        """Make predictions using a trained model.
+        
+        ``X`` is either a DataFrame of raw feature columns or an already
+        encoded feature matrix, dense or ``scipy.sparse``.
+        """
         
         model = model_data["model"]
-        scaler = model_data["scaler"]
         label_encoder = model_data["label_encoder"]
         
-        # Scale features
-        X_scaled = scaler.transform(X)
+        # Encode and scale features
+        X_scaled = self.transform_features(model_data, X)
         
         # Make predictions
         predictions = model.predict(X_scaled)
@@ -27,8 +27,9 @@ class Dataset(DatasetBase):
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     is_processed: bool = Field(False, description="Whether the dataset has been processed")
+    status: Optional[str] = Field(None, description="Profiling status: profiling, ready or failed")
     metadata: Optional[Dict[str, Any]] = Field(None, alias="dataset_metadata", description="Additional dataset metadata")
-
+    
     model_config = {"from_attributes": True, "populate_by_name": True}
 
 
@@ -37,6 +38,25 @@ class DatasetUploadResponse(Dataset):
     preview: List[List[str]] = Field(..., description="Preview of the dataset (first 10 rows)")
 
 
+class DatasetPreview(BaseModel):
+    """Schema for dataset preview rows."""
+    dataset_id: str = Field(..., description="Dataset identifier")
+    columns: List[str] = Field(..., description="Column names")
+    rows: List[List[str]] = Field(..., description="Row values as strings, with missing values empty")
+    row_numbers: List[int] = Field(..., description="Zero-based position of each row in the dataset")
+    sampled: bool = Field(..., description="Whether rows are a random sample rather than the first rows")
+
+
+class DatasetRows(BaseModel):
+    """Schema for a page of dataset rows."""
+    dataset_id: str = Field(..., description="Dataset identifier")
+    offset: int = Field(..., description="Zero-based position of the first row")
+    limit: int = Field(..., description="Maximum number of rows requested")
+    total_rows: int = Field(..., description="Number of rows in the dataset")
+    columns: List[str] = Field(..., description="Column names")
+    rows: List[List[str]] = Field(..., description="Row values as strings, with missing values empty")
+
+
 class DatasetUpdate(BaseModel):
     """Schema for updating a dataset."""
     name: Optional[str] = Field(None, description="New name for the dataset")
@@ -55,6 +75,9 @@ class DatasetInfo(BaseModel):
     column_names: List[str]
     column_types: Dict[str, str]
     missing_values: Dict[str, int]
+    feature_ranges: Dict[str, Dict[str, Optional[float]]] = Field(default_factory=dict, description="Min, max, mean and std of numeric columns")
+    feature_stats: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Distinct count and top values of categorical columns")
+    stale_stats: List[str] = Field(default_factory=list, description="Statistics predating appended rows, being recomputed")
     is_processed: bool
-
+    
     model_config = {"from_attributes": True}
@@ -25,9 +25,9 @@ class Model(ModelBase):
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     model_path: str = Field(..., description="Path to the saved model file")
-    metrics: Optional[Dict[str, Any]] = Field(None, description="Model evaluation metrics")
+    metrics: Optional[Dict[str, Any]] = Field(None, description="Summary evaluation metrics")
     is_active: bool = Field(True, description="Whether the model is active")
-
+    
     model_config = {
         "protected_namespaces": (),
         "from_attributes": True
@@ -37,6 +37,7 @@ class Model(ModelBase):
 class ModelMetrics(BaseModel):
     """Schema for model evaluation metrics."""
     accuracy: float = Field(..., description="Overall accuracy")
+    roc_auc: Optional[float] = Field(None, description="Area under the ROC curve")
     confusion_matrix: List[List[int]] = Field(..., description="Confusion matrix")
     fpr: List[float] = Field(..., description="False positive rates for ROC curve")
     tpr: List[float] = Field(..., description="True positive rates for ROC curve")
@@ -61,8 +62,106 @@ class ModelInfo(BaseModel):
     metrics: Optional[ModelMetrics]
     is_active: bool
     dataset_name: Optional[str] = None
-
+    
     model_config = {
         "protected_namespaces": (),
         "from_attributes": True
     }
+
+
+class ThresholdSweep(BaseModel):
+    """Schema for holdout metrics across decision thresholds."""
+    model_id: str
+    positive_class: str = Field(..., description="Class treated as positive")
+    thresholds: List[float] = Field(..., description="Decision thresholds on the positive class probability")
+    true_positives: List[int]
+    false_positives: List[int]
+    true_negatives: List[int]
+    false_negatives: List[int]
+    precision: List[float]
+    recall: List[float]
+    f1: List[float]
+    fpr: List[float] = Field(..., description="False positive rate at each threshold")
+    accuracy: List[float]
+    
+    model_config = {"protected_namespaces": ()}
+
+
+class PrecisionRecallCurve(BaseModel):
+    """Schema for a holdout precision/recall curve."""
+    model_id: str
+    positive_class: str = Field(..., description="Class treated as positive")
+    precision: List[float]
+    recall: List[float]
+    average_precision: float
+    
+    model_config = {"protected_namespaces": ()}
+
+
+class CalibrationCurve(BaseModel):
+    """Schema for a holdout reliability diagram."""
+    model_id: str
+    positive_class: str = Field(..., description="Class treated as positive")
+    bin_edges: List[float]
+    mean_predicted: List[float] = Field(..., description="Mean predicted probability of each non-empty bin")
+    fraction_positive: List[float] = Field(..., description="Observed positive rate of each non-empty bin")
+    counts: List[int] = Field(..., description="Rows in each non-empty bin")
+    brier_score: float
+    expected_calibration_error: float
+    
+    model_config = {"protected_namespaces": ()}
+
+
+class CostMetricsRequest(BaseModel):
+    """Schema for a cost-weighted metrics request."""
+    cost_matrix: Optional[List[List[float]]] = Field(
+        None,
+        description="Cost of predicting class j (column) for a row of class i (row), in class order"
+    )
+    false_positive_cost: float = Field(1.0, ge=0, description="Binary: cost of a false positive")
+    false_negative_cost: float = Field(1.0, ge=0, description="Binary: cost of a false negative")
+    positive_class: Optional[str] = Field(None, description="Binary: class treated as positive")
+
+
+class CostMetrics(BaseModel):
+    """Schema for cost-weighted holdout metrics."""
+    model_id: str
+    classes: List[str] = Field(..., description="Class order of the cost matrix")
+    cost_matrix: List[List[float]]
+    most_likely_class: Dict[str, Any] = Field(..., description="Cost of predicting the most likely class")
+    minimum_expected_cost: Dict[str, Any] = Field(..., description="Cost of the decision minimizing expected cost")
+    threshold: Optional[Dict[str, Any]] = Field(None, description="Binary: cost-minimizing decision threshold")
+    
+    model_config = {"protected_namespaces": ()}
+
+
+class PermutationImportanceRequest(BaseModel):
+    """Schema for starting a permutation importance job."""
+    n_repeats: Optional[int] = Field(None, ge=1, le=100, description="Shuffles per feature")
+    random_state: int = Field(42, description="Seed of the first shuffle")
+    force: bool = Field(False, description="Recompute even if a cached result exists")
+
+
+class FeatureImportance(BaseModel):
+    """Schema for one feature's permutation importance."""
+    feature: str
+    importance: float = Field(..., description="Mean drop in holdout accuracy when shuffled")
+    std: float = Field(..., description="Standard deviation of the drop across shuffles")
+
+
+class PermutationImportanceJob(BaseModel):
+    """Schema for a permutation importance job or cached result."""
+    model_id: str
+    status: str = Field(..., description="queued, running, finished, failed or cancelled")
+    progress: int = Field(..., ge=0, le=100)
+    completed_tasks: int
+    total_tasks: int
+    n_repeats: int
+    scoring: str
+    baseline_score: Optional[float] = None
+    importances: Optional[List[FeatureImportance]] = None
+    error_message: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    
+    model_config = {"protected_namespaces": ()}
@@ -43,8 +43,42 @@ class PredictionInfo(BaseModel):
     input_features: List[str]
     output_classes: List[str]
     created_at: str
-
+    
     model_config = {
         "protected_namespaces": (),
         "from_attributes": True
     }
+
+
+class FeatureDrift(BaseModel):
+    """Schema for one feature's drift from its training distribution."""
+    feature: str
+    type: str = Field(..., description="numeric or categorical")
+    psi: float = Field(..., description="Population stability index against the training baseline")
+    ks: Optional[float] = Field(None, description="Numeric: binned Kolmogorov-Smirnov statistic")
+    drifted: bool = Field(..., description="Whether PSI reaches the drift threshold")
+    baseline_missing_rate: float
+    missing_rate: float
+    baseline_mean: Optional[float] = None
+    mean: Optional[float] = None
+    baseline_std: Optional[float] = None
+    std: Optional[float] = None
+    out_of_range_rate: Optional[float] = Field(
+        None,
+        description="Share of values outside the training range, or of unseen categories"
+    )
+
+
+class DriftReport(BaseModel):
+    """Schema for prediction input drift of a model."""
+    model_id: str
+    baseline_rows: int = Field(..., description="Training rows in the baseline")
+    rows: int = Field(..., description="Prediction rows observed since the window started")
+    batches: int
+    started_at: str
+    last_updated: Optional[str] = None
+    psi_threshold: float
+    drifted_features: List[str]
+    features: List[FeatureDrift]
+    
+    model_config = {"protected_namespaces": ()}
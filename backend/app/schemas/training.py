@@ -9,10 +9,27 @@ from pydantic import BaseModel, Field
 class TrainingRequest(BaseModel):
     """Schema for training request."""
     dataset_id: str = Field(..., description="ID of the dataset to train on")
-    algorithm: str = Field(..., description="ML algorithm to use")
+    algorithm: str = Field(..., description="ML algorithm to use, or 'auto' to race all algorithms")
     params: Optional[Dict[str, Any]] = Field(None, description="Algorithm-specific parameters")
     test_size: float = Field(0.2, ge=0.1, le=0.5, description="Test set size (0.1-0.5)")
     random_state: int = Field(42, description="Random state for reproducibility")
+    svm_mode: str = Field(
+        "auto",
+        pattern="^(auto|exact|approximate)$",
+        description="SVM training mode: exact kernel SVM, kernel approximation, or auto by dataset size"
+    )
+    force: bool = Field(False, description="Train even if an identical job already exists")
+    encoding: Optional[str] = Field(
+        None,
+        pattern="^(auto|label|onehot|hash|target)$",
+        description="Categorical encoding: label, frequency-capped one-hot, hashing, out-of-fold target encoding, or auto (defaults to the server setting)"
+    )
+    time_budget: Optional[float] = Field(
+        None,
+        gt=0,
+        le=86400,
+        description="Wall-clock seconds from the request until an 'auto' job must finish"
+    )
 
 
 class TrainingJob(BaseModel):
@@ -28,6 +45,7 @@ class TrainingJob(BaseModel):
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     error_message: Optional[str] = Field(None, description="Error message if failed")
     model_id: Optional[str] = Field(None, description="Created model ID if successful")
+    fingerprint: Optional[str] = Field(None, description="Hash of the training inputs")
 
     model_config = {
         "protected_namespaces": (),
@@ -66,8 +84,18 @@ class TrainingStatus(BaseModel):
     completed_at: Optional[datetime]
     error_message: Optional[str]
     model_id: Optional[str]
+    log_offset: Optional[int] = Field(None, description="Byte offset to request the next log lines from")
 
     model_config = {
         "protected_namespaces": (),
         "from_attributes": True
     }
+
+
+class TrainingLogs(BaseModel):
+    """Schema for a chunk of training job logs."""
+    job_id: str = Field(..., description="Training job identifier")
+    lines: List[str] = Field(..., description="Log lines after the requested offset")
+    offset: int = Field(..., description="Byte offset the lines were read from")
+    next_offset: int = Field(..., description="Byte offset to request the next lines from")
+    complete: bool = Field(..., description="Whether the job has ended and no more lines will be written")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Dataset load benchmark: CSV parsing against the columnar copy.
+
+Writes synthetic datasets as CSV, converts them with ``ColumnarStore``
+and times ``DataPreprocessor.load_dataset`` reading the full CSV, the
+full columnar copy and a projection of a few columns. Every available
+columnar format is measured (``npy`` always, ``parquet`` when pyarrow is
+installed). Each timing is the best of ``--repeats`` runs.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.load_benchmark --rows 100000,1000000 --numeric 50 --categorical 10
+    python -m benchmarks.load_benchmark --project 5 --output benchmarks/load_results.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.training_benchmark import generate_dataset, _int_list
+
+
+def _best_of(repeats: int, func: Callable[[], Any]) -> float:
+    """Fastest wall time of ``repeats`` calls."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings), 4)
+
+
+def _directory_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def run_case(case: Dict[str, Any], repeats: int, project: int) -> List[Dict[str, Any]]:
+    """Time CSV and columnar loads of one synthetic dataset."""
+    from app.ml.columnar import ColumnarStore, pyarrow
+    from app.ml import preprocessing
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="load_benchmark_"))
+    csv_path = work_dir / "dataset.csv"
+    df = generate_dataset(case["rows"], case["numeric"], case["categorical"], classes=2)
+    df.to_csv(csv_path, index=False)
+    columns = list(df.columns[:project])
+    del df
+    
+    preprocessor = preprocessing.DataPreprocessor()
+    formats = ["npy"] + (["parquet"] if pyarrow is not None else [])
+    results = []
+    
+    try:
+        # CSV timings with the columnar copy disabled
+        preprocessing.columnar_store = ColumnarStore("none")
+        csv_full = _best_of(repeats, lambda: preprocessor.load_dataset(str(csv_path)))
+        csv_projected = _best_of(
+            repeats, lambda: preprocessor.load_dataset(str(csv_path), columns=columns)
+        )
+        
+        for storage_format in formats:
+            store = ColumnarStore(storage_format)
+            preprocessing.columnar_store = store
+            parsed = pd.read_csv(csv_path)
+            convert = _best_of(1, partial(store.write, parsed, str(csv_path)))
+            del parsed
+            
+            full = _best_of(repeats, lambda: preprocessor.load_dataset(str(csv_path)))
+            projected = _best_of(
+                repeats, lambda: preprocessor.load_dataset(str(csv_path), columns=columns)
+            )
+            results.append({
+                **case,
+                "format": storage_format,
+                "projected_columns": len(columns),
+                "csv_bytes": csv_path.stat().st_size,
+                "columnar_bytes": _directory_bytes(store.get_columnar_path(str(csv_path))),
+                "csv_seconds": csv_full,
+                "csv_projected_seconds": csv_projected,
+                "convert_seconds": convert,
+                "columnar_seconds": full,
+                "columnar_projected_seconds": projected,
+                "speedup": round(csv_full / full, 2) if full else None,
+                "projected_speedup": round(csv_projected / projected, 2) if projected else None
+            })
+            store.delete(str(csv_path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the load benchmark grid."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=_int_list, default=[100000])
+    parser.add_argument("--numeric", type=_int_list, default=[50])
+    parser.add_argument("--categorical", type=_int_list, default=[10])
+    parser.add_argument("--project", type=int, default=5,
+                        help="Columns read by the projection timings")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="benchmarks/load_results.json")
+    args = parser.parse_args(argv)
+    
+    # Keep the app's storage directories out of the working tree
+    scratch = tempfile.mkdtemp(prefix="load_benchmark_app_")
+    for name in ("MODELS_DIR", "UPLOAD_DIR", "LOGS_DIR"):
+        os.environ[name] = os.path.join(scratch, name.lower())
+    
+    results = []
+    for rows, numeric, categorical in itertools.product(args.rows, args.numeric, args.categorical):
+        case = {"rows": rows, "numeric": numeric, "categorical": categorical}
+        for result in run_case(case, args.repeats, args.project):
+            print(f"rows={rows}/num={numeric}/cat={categorical} [{result['format']}]: "
+                  f"csv {result['csv_seconds']:.3f}s, columnar {result['columnar_seconds']:.3f}s "
+                  f"({result['speedup']}x); {result['projected_columns']} columns: "
+                  f"csv {result['csv_projected_seconds']:.3f}s, "
+                  f"columnar {result['columnar_projected_seconds']:.3f}s ({result['projected_speedup']}x)")
+            results.append(result)
+    shutil.rmtree(scratch, ignore_errors=True)
+    
+    output = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Training performance benchmark on synthetic datasets.
+
+Runs every algorithm in ``MLTrainer.models`` through the real
+``DataPreprocessor`` -> ``train_model`` -> ``save_model`` pipeline for a
+grid of synthetic dataset shapes, and records per-stage wall time, peak
+RSS and artifact size. Each case runs in a fresh process so peak RSS is
+measured per case.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.training_benchmark --rows 1000,10000 --classes 2,5
+    python -m benchmarks.training_benchmark --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def generate_dataset(rows: int,
+                     numeric: int,
+                     categorical: int,
+                     classes: int,
+                     cardinality: int = 10,
+                     random_state: int = 42) -> pd.DataFrame:
+    """Generate a synthetic classification dataset.
+    
+    The target is a noisy linear function of the numeric columns plus
+    per-category offsets, cut into ``classes`` equally sized classes.
+    """
+    rng = np.random.default_rng(random_state)
+    data: Dict[str, Any] = {}
+    score = np.zeros(rows)
+    
+    for i in range(numeric):
+        values = rng.normal(size=rows)
+        data[f"num_{i}"] = values
+        score += rng.normal() * values
+    
+    for i in range(categorical):
+        codes = rng.integers(0, cardinality, size=rows)
+        data[f"cat_{i}"] = np.array([f"c{i}_{k}" for k in range(cardinality)])[codes]
+        score += rng.normal(size=cardinality)[codes]
+    
+    score += rng.normal(scale=0.5, size=rows)
+    edges = np.quantile(score, np.linspace(0, 1, classes + 1)[1:-1])
+    data["target"] = np.array([f"class_{k}" for k in range(classes)])[np.searchsorted(edges, score)]
+    
+    return pd.DataFrame(data)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one algorithm on one synthetic dataset in the current process."""
+    work_dir = tempfile.mkdtemp(prefix="ml_benchmark_")
+    # Settings are read at import time, so point storage at the scratch dir first
+    os.environ["MODELS_DIR"] = os.path.join(work_dir, "models")
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+    os.environ["LOGS_DIR"] = os.path.join(work_dir, "logs")
+    
+    from app.ml.preprocessing import DataPreprocessor
+    from app.ml.training import MLTrainer
+    
+    stages: Dict[str, float] = {}
+    
+    def timed(name, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        stages[name] = round(time.perf_counter() - start, 4)
+        return result
+    
+    def on_training_event(event_type: str, **data) -> None:
+        if event_type == "stage" and data.get("state") == "completed":
+            stages[f"train.{data['stage']}"] = data["seconds"]
+    
+    df = timed("generate", generate_dataset, case["rows"], case["numeric"],
+               case["categorical"], case["classes"])
+    csv_path = Path(os.environ["UPLOAD_DIR"]) / "dataset.csv"
+    df.to_csv(csv_path, index=False)
+    del df
+    
+    preprocessor = DataPreprocessor()
+    trainer = MLTrainer()
+    
+    df = timed("load", preprocessor.load_dataset, str(csv_path))
+    df_clean = timed("clean", preprocessor.clean_dataset, df)
+    X, y = timed("prepare", preprocessor.prepare_features, df_clean, "target",
+                 encode_categoricals=False)
+    results = timed("train", trainer.train_model, X, y, case["algorithm"],
+                    progress_callback=on_training_event)
+    
+    model_id = f"benchmark_{case['algorithm']}"
+    metrics_path = Path(os.environ["MODELS_DIR"]) / f"{model_id}.metrics.npz"
+    
+    def save():
+        from app.ml.metrics import MetricsStore
+        summary = MetricsStore().save(model_id, results)
+        return trainer.save_model(
+            model=results["model"],
+            scaler=results["scaler"],
+            label_encoder=results["label_encoder"],
+            model_id=model_id,
+            algorithm=case["algorithm"],
+            dataset_id="benchmark",
+            accuracy=results["accuracy"],
+            metrics=summary,
+            params=results["params"],
+            feature_columns=results["feature_columns"],
+            target_classes=results["target_classes"],
+            encoder=results["encoder"],
+            sparse_input=results["sparse"]
+        )
+    
+    model_path = timed("save", save)
+    
+    result = {
+        **case,
+        "stages": stages,
+        "total_seconds": round(sum(v for k, v in stages.items() if "." not in k), 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "artifact_bytes": Path(model_path).stat().st_size,
+        "metrics_bytes": metrics_path.stat().st_size if metrics_path.exists() else 0,
+        "accuracy": results["accuracy"]
+    }
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def run_case_safely(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a case, recording a failure instead of aborting the whole run."""
+    try:
+        return run_case(case)
+    except Exception as e:
+        return {**case, "error": f"{type(e).__name__}: {e}"}
+
+
+def case_key(result: Dict[str, Any]) -> str:
+    """Identify a benchmark case across runs."""
+    return (f"{result['algorithm']}/rows={result['rows']}/num={result['numeric']}"
+            f"/cat={result['categorical']}/classes={result['classes']}")
+
+
+def compare_to_baseline(results: List[Dict[str, Any]],
+                        baseline: List[Dict[str, Any]],
+                        tolerance: float) -> List[str]:
+    """List cases that got slower, bigger or hungrier than the baseline."""
+    baseline_by_key = {case_key(r): r for r in baseline}
+    regressions = []
+    
+    for result in results:
+        previous = baseline_by_key.get(case_key(result))
+        if previous is None or "error" in result or "error" in previous:
+            continue
+        for metric in ("total_seconds", "peak_rss_mb", "artifact_bytes"):
+            old, new = previous.get(metric), result.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(
+                    f"{case_key(result)}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)"
+                )
+    
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark grid and optionally compare against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=_int_list, default=[1000, 10000])
+    parser.add_argument("--numeric", type=_int_list, default=[10])
+    parser.add_argument("--categorical", type=_int_list, default=[2])
+    parser.add_argument("--classes", type=_int_list, default=[2, 5])
+    parser.add_argument("--algorithms", default="all",
+                        help="Comma-separated algorithms, or 'all'")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+    
+    from app.ml.training import MLTrainer
+    algorithms = list(MLTrainer().models) if args.algorithms == "all" else args.algorithms.split(",")
+    
+    cases = [
+        {"algorithm": a, "rows": r, "numeric": n, "categorical": c, "classes": k}
+        for r, n, c, k, a in itertools.product(
+            args.rows, args.numeric, args.categorical, args.classes, algorithms
+        )
+    ]
+    
+    # A fresh process per case keeps peak RSS measurements independent
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_case_safely, cases):
+            if "error" in result:
+                print(f"{case_key(result)}: FAILED {result['error']}")
+            else:
+                print(f"{case_key(result)}: {result['total_seconds']:.2f}s, "
+                      f"{result['peak_rss_mb'] or 0:.0f}MB peak, {result['artifact_bytes']} bytes")
+            results.append(result)
+    
+    output = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
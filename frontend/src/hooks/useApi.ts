@@ -70,21 +70,25 @@ export function useApi<T>() {
   };
 }
 
-// Hook for polling training status
+// Hook for following training status, streamed over Server-Sent Events
+// with polling as a fallback when the stream is unavailable
 export function useTrainingPolling() {
   const [pollingJobId, setPollingJobId] = useState<string | null>(null);
   const [pollingInterval, setPollingInterval] = useState<NodeJS.Timeout | null>(null);
+  const [eventSource, setEventSource] = useState<EventSource | null>(null);
 
   const startPolling = useCallback((jobId: string, onUpdate: (job: any) => void, onComplete: (job: any) => void) => {
     setPollingJobId(jobId);
-    
+
+    const isDone = (status: string) => ['finished', 'failed', 'cancelled'].includes(status);
+
     const poll = async () => {
       try {
         const { apiService } = await import('@/services/api');
         const job = await apiService.getTrainingStatus(jobId);
         onUpdate(job);
         
-        if (job.status === 'finished' || job.status === 'failed') {
+        if (isDone(job.status)) {
           stopPolling();
           onComplete(job);
         }
@@ -93,12 +97,57 @@ export function useTrainingPolling() {
       }
     };
 
-    // Poll every 2 seconds
-    const interval = setInterval(poll, 2000);
-    setPollingInterval(interval);
-    
-    // Initial poll
-    poll();
+    const startIntervalPolling = () => {
+      // Poll every 2 seconds
+      const interval = setInterval(poll, 2000);
+      setPollingInterval(interval);
+      
+      // Initial poll
+      poll();
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startIntervalPolling();
+      return;
+    }
+
+    import('@/services/api').then(({ apiService }) => {
+      const source = new EventSource(apiService.getTrainingEventsUrl(jobId));
+      const job: any = { job_id: jobId, status: 'queued', progress: 0, logs: [] };
+      setEventSource(source);
+
+      const update = (event: MessageEvent) => {
+        const data = JSON.parse(event.data);
+        if (data.status) job.status = data.status;
+        if (data.progress !== undefined) job.progress = data.progress;
+        if (data.model_id) job.model_id = data.model_id;
+        if (data.error_message) job.error_message = data.error_message;
+        if (data.type === 'log') job.logs = [...job.logs, data.message];
+        onUpdate({ ...job });
+
+        if (data.type === 'status' && isDone(data.status)) {
+          source.close();
+          setEventSource(null);
+          setPollingJobId(null);
+          onComplete({ ...job });
+        }
+      };
+
+      ['status', 'progress', 'log'].forEach((type) => source.addEventListener(type, update));
+      // The server isn't running this job (e.g. it restarted); poll instead
+      source.addEventListener('unknown', () => {
+        source.close();
+        setEventSource(null);
+        startIntervalPolling();
+      });
+      source.onerror = () => {
+        // Fall back to polling if the stream cannot be established
+        if (source.readyState === EventSource.CLOSED) {
+          setEventSource(null);
+          startIntervalPolling();
+        }
+      };
+    });
   }, []);
 
   const stopPolling = useCallback(() => {
@@ -106,8 +155,12 @@ export function useTrainingPolling() {
       clearInterval(pollingInterval);
       setPollingInterval(null);
     }
+    if (eventSource) {
+      eventSource.close();
+      setEventSource(null);
+    }
     setPollingJobId(null);
-  }, [pollingInterval]);
+  }, [pollingInterval, eventSource]);
 
   return {
     isPolling: pollingJobId !== null,
@@ -115,4 +168,4 @@ export function useTrainingPolling() {
     startPolling,
     stopPolling,
   };
-}
\ No newline at end of file
+}
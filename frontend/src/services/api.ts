@@ -27,9 +27,11 @@ export interface DatasetUploadResponse extends Dataset {
 
 export interface TrainingJob {
   job_id: string;
-  status: 'queued' | 'running' | 'finished' | 'failed';
+  status: 'queued' | 'running' | 'finished' | 'failed' | 'cancelled';
   progress?: number;
   logs?: string[];
+  model_id?: string;
+  error_message?: string;
 }
 
 export interface Model {
@@ -61,6 +63,10 @@ export interface TrainingRequest {
   params: Record<string, any>;
   test_size: number;
   random_state: number;
+  svm_mode?: 'auto' | 'exact' | 'approximate';
+  force?: boolean;
+  time_budget?: number;
+  encoding?: 'auto' | 'label' | 'onehot' | 'hash' | 'target';
 }
 
 export interface PredictionRequest {
@@ -109,6 +115,10 @@ export const apiService = {
     return response.data;
   },
 
+  getTrainingEventsUrl(jobId: string): string {
+    return `${API_BASE_URL}/api/training/jobs/${jobId}/events`;
+  },
+
   async getTrainingJobs(): Promise<TrainingJob[]> {
     const response: AxiosResponse<TrainingJob[]> = await api.get('/training/jobs');
     return response.data;